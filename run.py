@@ -12,8 +12,10 @@ Jüri için hazırlanmıştır.
 
 import os
 import sys
+import argparse
 import subprocess
 import platform
+import socket
 from pathlib import Path
 
 # Renk kodları
@@ -171,19 +173,102 @@ def check_src_directory():
     
     print(f"{Colors.GREEN}✅ Proje dosyaları mevcut{Colors.END}")
 
-def start_server():
+def get_venv_python():
+    """Virtual environment'daki Python yolunu döner"""
+    if platform.system().lower() == "windows":
+        return "btk_env\\Scripts\\python"
+    return "btk_env/bin/python"
+
+def run_benchmark(name, iterations):
+    """src/core/benchmarks.py içindeki bir ölçümü çalıştır"""
+    print(f"{Colors.BLUE}⏱️  Benchmark çalıştırılıyor: {name}{Colors.END}")
+    python_path = str(Path(get_venv_python()).resolve())
+    cmd = [python_path, "-m", "core.benchmarks", name, "--iterations", str(iterations)]
+    return subprocess.run(cmd, cwd="src").returncode
+
+def run_core_module(module, *args):
+    """src/core altındaki bir modülü proje kökünden çalıştır (sunucuyla aynı chat_data/chroma_db yolları)"""
+    python_path = str(Path(get_venv_python()).resolve())
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path("src").resolve()), env.get("PYTHONPATH")]))
+    return subprocess.run([python_path, "-m", module, *args], env=env).returncode
+
+def server_is_running(port=8000):
+    """API sunucusu bu makinede çalışıyor mu (Chroma dizini iki süreçten açılmamalı)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.5)
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+def refuse_if_server_running(command):
+    """Chroma aynı veri dizinini birden fazla süreçten açmayı desteklemez - sunucu açıkken çevrimdışı komutları durdur"""
+    if server_is_running():
+        print(f"{Colors.RED}❌ '{command}' sunucu kapalıyken çalıştırılmalı (localhost:8000 açık). Önce sunucuyu durdurun.{Colors.END}")
+        return True
+    return False
+
+def run_import_docs(chat_id, directory, recursive=False):
+    """Klasördeki dökümanları bir sohbete toplu aktar (src/core/bulk_import.py)"""
+    if refuse_if_server_running("import-docs"):
+        return 1
+    print(f"{Colors.BLUE}📦 Dökümanlar içe aktarılıyor: {directory} → {chat_id}{Colors.END}")
+    args = [chat_id, str(Path(directory).resolve())]
+    if recursive:
+        args.append("--recursive")
+    return run_core_module("core.bulk_import", *args)
+
+def run_reclaim(dry_run=False):
+    """Silinmiş sohbetlerden kalan verileri temizle (src/core/reclaimer.py)"""
+    print(f"{Colors.BLUE}🧹 Disk alanı geri kazanılıyor{' (deneme)' if dry_run else ''}...{Colors.END}")
+    return run_core_module("core.reclaimer", *(["--dry-run"] if dry_run else []))
+
+def run_reindex(chat_ids=None, status=False, force=False, keep_old=False):
+    """Vektör indeksini güncel parçalama/embedding ayarlarıyla yeniden oluştur (src/core/index_migration.py)"""
+    if refuse_if_server_running("reindex"):
+        return 1
+    print(f"{Colors.BLUE}🔁 Vektör indeksi {'durumu' if status else 'yeniden oluşturuluyor'}...{Colors.END}")
+    args = [arg for chat_id in chat_ids or [] for arg in ("--chat", chat_id)]
+    args += [flag for flag, enabled in (("--status", status), ("--force", force), ("--keep-old", keep_old)) if enabled]
+    return run_core_module("core.index_migration", *args)
+
+def report_import_time(module="api.server", top=15):
+    """python -X importtime çıktısından modül import süresini raporla"""
+    print(f"{Colors.BLUE}⏱️  Import süresi ölçülüyor: {module}{Colors.END}")
+    python_path = str(Path(get_venv_python()).resolve())
+    cmd = [python_path, "-X", "importtime", "-c", f"import {module}"]
+    result = subprocess.run(cmd, cwd="src", capture_output=True, text=True)
+    
+    # Satır formatı: "import time: self [us] | cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|", 1).split("|")]
+            timings.append((name, int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    
+    if result.returncode != 0 or not timings:
+        print(f"{Colors.RED}❌ Import başarısız:{Colors.END}")
+        print(result.stderr[-2000:])
+        return 1
+    
+    total = next((cumulative for name, _, cumulative in timings if name == module), max(t[2] for t in timings))
+    print(f"{Colors.GREEN}✅ Toplam import süresi: {total / 1000:.0f}ms{Colors.END}")
+    print(f"\n{Colors.BOLD}En pahalı üst seviye paketler:{Colors.END}")
+    top_level = [t for t in timings if "." not in t[0].strip() and t[0] != module]
+    for name, _, cumulative in sorted(top_level, key=lambda t: t[2], reverse=True)[:top]:
+        print(f"   {cumulative / 1000:8.1f}ms  {name}")
+    return 0
+
+def start_server(preload=False):
     """Sunucuyu başlat"""
     print(f"\n{Colors.GREEN}{Colors.BOLD}🚀 SUNUCU BAŞLATILIYOR...{Colors.END}")
     print(f"{Colors.BLUE}📡 http://localhost:8000 adresinde çalışacak{Colors.END}")
     print(f"{Colors.YELLOW}🛑 Durdurmak için Ctrl+C tuşlayın{Colors.END}\n")
     
     # Virtual environment'daki Python'u kullan
-    system = platform.system().lower()
-    
-    if system == "windows":
-        python_path = "btk_env\\Scripts\\python"
-    else:
-        python_path = "btk_env/bin/python"
+    python_path = get_venv_python()
     
     try:
         # uvicorn ile sunucuyu başlat
@@ -196,7 +281,13 @@ def start_server():
             "--port", "8000"
         ]
         
-        subprocess.run(cmd)
+        env = os.environ.copy()
+        if preload:
+            # Ağır bileşenler sunucu açıldıktan sonra arka planda yüklenir
+            env["PRELOAD"] = "1"
+            print(f"{Colors.BLUE}🔥 Ön yükleme açık - modeller arka planda yüklenecek{Colors.END}")
+        
+        subprocess.run(cmd, env=env)
         
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}🛑 Sunucu durduruldu{Colors.END}")
@@ -233,7 +324,7 @@ def show_instructions():
 """
     print(instructions)
 
-def main():
+def main(preload=False):
     """Ana fonksiyon"""
     try:
         print_logo()
@@ -272,7 +363,7 @@ def main():
             sys.exit(0)
         
         # Sunucuyu başlat
-        start_server()
+        start_server(preload=preload)
         
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}👋 Program sonlandırıldı{Colors.END}")
@@ -280,5 +371,47 @@ def main():
         print(f"{Colors.RED}❌ Beklenmeyen hata: {e}{Colors.END}")
         sys.exit(1)
 
+def parse_args():
+    """Komut satırı argümanlarını ayrıştır - argümansız çalıştırma etkileşimli başlatıcıyı açar"""
+    parser = argparse.ArgumentParser(description="BTK Hackathon AI Asistan başlatıcı")
+    parser.add_argument("--preload", action="store_true",
+                        help="Ağır modelleri (CrewAI, Whisper, ChromaDB) sunucu açılınca arka planda yükle")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    bench_parser = subparsers.add_parser("bench", help="Performans ölçümü çalıştır")
+    bench_parser.add_argument("name", help="Ölçüm adı (ör. dialog, intent, ocr, ocr_pages, ocr_routing)")
+    bench_parser.add_argument("--iterations", type=int, default=20)
+    
+    docs_parser = subparsers.add_parser("import-docs", help="Klasördeki dökümanları bir sohbete toplu aktar (sunucu kapalıyken)")
+    docs_parser.add_argument("chat_id")
+    docs_parser.add_argument("directory")
+    docs_parser.add_argument("--recursive", action="store_true", help="Alt klasörleri de tara")
+    
+    reclaim_parser = subparsers.add_parser("reclaim", help="Silinmiş sohbetlerden kalan verileri temizle")
+    reclaim_parser.add_argument("--dry-run", action="store_true", help="Silmeden yalnızca raporla")
+    
+    reindex_parser = subparsers.add_parser("reindex", help="Vektör indeksini güncel ayarlarla yeniden oluştur (sunucu kapalıyken)")
+    reindex_parser.add_argument("--chat", action="append", help="Sadece bu sohbet (tekrarlanabilir)")
+    reindex_parser.add_argument("--status", action="store_true", help="Sadece sürüm durumunu raporla")
+    reindex_parser.add_argument("--force", action="store_true", help="Güncel görünen sohbetleri de yeniden indeksle")
+    reindex_parser.add_argument("--keep-old", action="store_true", help="Önceki çalışmalardan kalan eski koleksiyonları silme")
+    
+    import_parser = subparsers.add_parser("import-time", help="API sunucusunun import süresini raporla")
+    import_parser.add_argument("--module", default="api.server")
+    import_parser.add_argument("--top", type=int, default=15)
+    
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.command == "bench":
+        sys.exit(run_benchmark(args.name, args.iterations))
+    if args.command == "import-docs":
+        sys.exit(run_import_docs(args.chat_id, args.directory, args.recursive))
+    if args.command == "reclaim":
+        sys.exit(run_reclaim(args.dry_run))
+    if args.command == "reindex":
+        sys.exit(run_reindex(args.chat, args.status, args.force, args.keep_old))
+    if args.command == "import-time":
+        sys.exit(report_import_time(args.module, args.top))
+    main(preload=args.preload)
\ No newline at end of file
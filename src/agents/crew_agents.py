@@ -1,25 +1,88 @@
 # src/agents/crew_agents.py
 
-from crewai import Agent, Task, Crew, Process, LLM
+from crewai import Agent, Task, Crew, Process
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import threading
 from tools.tools import JSONValidatorToolForQuestion
 from core.config import Config
+from core import resource_pool
+from core.llm_governor import create_governed_crew_llm
 
 class CrewAISystem:
+    # Farklı soru türleri için ajan şablonları
+    AGENT_TEMPLATES = {
+        "multiple_choice": {
+            "role": "Çoktan Seçmeli Soru Uzmanı",
+            "goal": "Verilen metin ve tercihlere göre yüksek kaliteli çoktan seçmeli sorular oluşturmak ve JSON formatını doğrulamak.",
+            "backstory": "Sen çoktan seçmeli soru yazma konusunda uzman bir eğitimcisin. Her soru için istenen tüm alanları eksiksiz doldurursun ve JSONValidatorToolForQuestion kullanarak çıktının geçerliliğini kontrol edersin.",
+            "tools": ["json_validator"],
+            "verbose": True
+        },
+        "classic": {
+            "role": "Klasik Soru Uzmanı", 
+            "goal": "Verilen metin ve tercihlere göre düşündürücü ve kapsamlı açık uçlu sorular oluşturmak ve JSON formatını doğrulamak.",
+            "backstory": "Sen açık uçlu sorular konusunda uzman bir akademisyensin. Öğrencilerin analitik düşünme yeteneklerini test eden, derinlemesine sorular hazırlıyorsun ve JSONValidatorToolForQuestion ile çıktılarının doğruluğunu garanti edersin.",
+            "tools": ["json_validator"],
+            "verbose": True
+        },
+        "fill_blank": {
+            "role": "Boşluk Doldurma Uzmanı",
+            "goal": "Verilen metne ve tercihlere göre etkili boşluk doldurma soruları oluşturmak ve JSON formatını doğrulamak.",
+            "backstory": "Sen boşluk doldurma soruları konusunda uzman bir öğretmensin. Anahtar kelime ve kavramları vurgulayan sorular hazırlıyorsun ve JSONValidatorToolForQuestion ile format doğruluğunu sağlıyorsun.",
+            "tools": ["json_validator"],
+            "verbose": True
+        },
+        "true_false": {
+            "role": "Doğru-Yanlış Soru Uzmanı",
+            "goal": "Verilen metne ve tercihlere göre etkili doğru-yanlış soruları oluşturmak ve JSON formatını doğrulamak.",
+            "backstory": "Sen doğru-yanlış soruları konusunda uzman bir öğretmensin. Net ve kesin yargılar içeren, yanıltıcı olmayan sorular hazırlıyorsun ve JSONValidatorToolForQuestion ile format doğruluğunu sağlıyorsun.",
+            "tools": ["json_validator"],
+            "verbose": True
+        },
+        "validator": {
+            "role": "JSON Format Doğrulama Uzmanı",
+            "goal": "Üretilen tüm soruların JSON formatını kontrol etmek ve düzeltmek.",
+            "backstory": "Sen JSON format doğrulama konusunda uzman bir teknisyensin. Diğer ajanlardan gelen çıktıları JSONValidatorToolForQuestion kullanarak kontrol eder ve geçerli JSON formatına dönüştürsün.",
+            "tools": ["json_validator"],
+            "verbose": True
+        },
+        "coordinator": {
+            "role": "Test Koordinatörü",
+            "goal": "Tüm soru türlerini koordine etmek, kalite kontrolü yapmak ve tek bir final JSON çıktısı oluşturmak.",
+            "backstory": "Sen deneyimli bir test geliştirme koordinatörüsün. Diğer ajanlardan gelen çıktıları birleştirir, JSONValidatorToolForQuestion ile son formatın doğruluğundan emin olursun.",
+            "tools": ["json_validator"],
+            "verbose": True
+        }
+    }
+
     def __init__(self, api_key: str, websocket_callback=None):
-        self.llm = LLM(
-            model="gemini/gemini-2.5-flash", 
-            api_key=api_key,
-            temperature=0.7
-        )
+        self.api_key = api_key
+        self._llm = None
+        self._agents = None
         self.tools = [JSONValidatorToolForQuestion()]
-        self.agents = self._create_agents()
         self.websocket_callback = websocket_callback
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.executor = resource_pool.get_executor("crew")
+        self.cancel_event = threading.Event()  # Crew thread'lerine iptal sinyali
+
+    @property
+    def llm(self):
+        """LLM istemcisi - varsayılan anahtar için paylaşılan havuzdan alınır"""
+        if self._llm is None:
+            if self.api_key == Config.GOOGLE_API_KEY:
+                self._llm = resource_pool.get_crew_llm(temperature=0.7)
+            else:
+                self._llm = create_governed_crew_llm(model=f"gemini/{Config.GEMINI_MODEL}", api_key=self.api_key, temperature=0.7)
+        return self._llm
+
+    @property
+    def agents(self) -> Dict[str, Agent]:
+        """Ajanlar ilk test üretiminde oluşturulur"""
+        if self._agents is None:
+            self._agents = self._create_agents()
+        return self._agents
 
     async def send_workflow_message(self, agent_name: str, message: str, data: Dict = None):
         """WebSocket üzerinden workflow mesajları gönder"""
@@ -48,57 +111,11 @@ class CrewAISystem:
 
     def _create_agents(self) -> Dict[str, Agent]:
         """Farklı soru türleri için özel ajanlar oluşturur."""
-        
-        return {
-            "multiple_choice": Agent(
-                role="Çoktan Seçmeli Soru Uzmanı",
-                goal="Verilen metin ve tercihlere göre yüksek kaliteli çoktan seçmeli sorular oluşturmak ve JSON formatını doğrulamak.",
-                backstory="Sen çoktan seçmeli soru yazma konusunda uzman bir eğitimcisin. Her soru için istenen tüm alanları eksiksiz doldurursun ve JSONValidatorToolForQuestion kullanarak çıktının geçerliliğini kontrol edersin.",
-                llm=self.llm, 
-                tools=self.tools, 
-                verbose=True
-            ),
-            "classic": Agent(
-                role="Klasik Soru Uzmanı", 
-                goal="Verilen metin ve tercihlere göre düşündürücü ve kapsamlı açık uçlu sorular oluşturmak ve JSON formatını doğrulamak.",
-                backstory="Sen açık uçlu sorular konusunda uzman bir akademisyensin. Öğrencilerin analitik düşünme yeteneklerini test eden, derinlemesine sorular hazırlıyorsun ve JSONValidatorToolForQuestion ile çıktılarının doğruluğunu garanti edersin.",
-                llm=self.llm, 
-                tools=self.tools, 
-                verbose=True
-            ),
-            "fill_blank": Agent(
-                role="Boşluk Doldurma Uzmanı",
-                goal="Verilen metne ve tercihlere göre etkili boşluk doldurma soruları oluşturmak ve JSON formatını doğrulamak.",
-                backstory="Sen boşluk doldurma soruları konusunda uzman bir öğretmensin. Anahtar kelime ve kavramları vurgulayan sorular hazırlıyorsun ve JSONValidatorToolForQuestion ile format doğruluğunu sağlıyorsun.",
-                llm=self.llm, 
-                tools=self.tools, 
-                verbose=True
-            ),
-            "true_false": Agent(
-                role="Doğru-Yanlış Soru Uzmanı",
-                goal="Verilen metne ve tercihlere göre etkili doğru-yanlış soruları oluşturmak ve JSON formatını doğrulamak.",
-                backstory="Sen doğru-yanlış soruları konusunda uzman bir öğretmensin. Net ve kesin yargılar içeren, yanıltıcı olmayan sorular hazırlıyorsun ve JSONValidatorToolForQuestion ile format doğruluğunu sağlıyorsun.",
-                llm=self.llm, 
-                tools=self.tools, 
-                verbose=True
-            ),
-            "validator": Agent(
-                role="JSON Format Doğrulama Uzmanı",
-                goal="Üretilen tüm soruların JSON formatını kontrol etmek ve düzeltmek.",
-                backstory="Sen JSON format doğrulama konusunda uzman bir teknisyensin. Diğer ajanlardan gelen çıktıları JSONValidatorToolForQuestion kullanarak kontrol eder ve geçerli JSON formatına dönüştürsün.",
-                llm=self.llm,
-                tools=self.tools,
-                verbose=True
-            ),
-            "coordinator": Agent(
-                role="Test Koordinatörü",
-                goal="Tüm soru türlerini koordine etmek, kalite kontrolü yapmak ve tek bir final JSON çıktısı oluşturmak.",
-                backstory="Sen deneyimli bir test geliştirme koordinatörüsün. Diğer ajanlardan gelen çıktıları birleştirir, JSONValidatorToolForQuestion ile son formatın doğruluğundan emin olursun.",
-                llm=self.llm, 
-                tools=self.tools, 
-                verbose=True
-            )
-        }
+        return resource_pool.build_agents(
+            self.AGENT_TEMPLATES,
+            llms={"default": self.llm},
+            tools={"json_validator": self.tools[0]}
+        )
 
     def _calculate_question_distribution(self, preferences: Dict[str, Any]) -> Dict[str, int]:
         """Soru türlerine göre soru sayısı dağılımını hesaplar."""
@@ -391,18 +408,31 @@ class CrewAISystem:
         tasks.append(coordination_task)
         return tasks
 
-    def run_crew_sync(self, crew):
+    def _check_cancelled(self, *_, cancel_event: Optional[threading.Event] = None):
+        """Crew adımları arasında iptal sinyalini kontrol eder"""
+        if (cancel_event or self.cancel_event).is_set():
+            raise InterruptedError("İşlem kullanıcı tarafından iptal edildi")
+
+    def run_crew_sync(self, crew, cancel_event: Optional[threading.Event] = None):
         """Senkron crew çalıştırma fonksiyonu"""
+        # Çalıştırmanın başladığı andaki olay kullanılır; sonraki çalıştırma yeni olay alır
+        cancel_event = cancel_event or self.cancel_event
+        if cancel_event.is_set():
+            return {"success": False, "error": "İşlem kullanıcı tarafından iptal edildi", "cancelled": True}
         try:
+            # Her ajan adımından sonra iptal kontrolü yapılır
+            crew.step_callback = lambda *args: self._check_cancelled(*args, cancel_event=cancel_event)
             result = crew.kickoff()
             return {"success": True, "result": result}
+        except InterruptedError as e:
+            return {"success": False, "error": str(e), "cancelled": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     async def run_crew_async(self, crew):
         """Asenkron crew çalıştırma fonksiyonu"""
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(self.executor, self.run_crew_sync, crew)
+        result = await loop.run_in_executor(self.executor, self.run_crew_sync, crew, self.cancel_event)
         return result
 
     def _extract_crew_output_content(self, crew_output):
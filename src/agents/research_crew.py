@@ -3,19 +3,19 @@
 import os
 import json
 import asyncio
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
 import aiofiles
 from dotenv import load_dotenv
-from crewai import LLM, Agent, Task, Crew, Process
-from langchain_google_genai import ChatGoogleGenerativeAI
-from crewai_tools import SerperDevTool
-from faster_whisper import WhisperModel
-from concurrent.futures import ThreadPoolExecutor
+from crewai import Task, Crew, Process
 from tools.custom_tools import YouTubeSearchTool, YouTubeTranscriptTool, JSONValidatorTool, JSONSaverTool, FileReaderTool
 from core.config import Config
+from core import resource_pool
+from core.research_cache import research_cache, ResearchCache
 
 # .env dosyasını yükle
 load_dotenv()
@@ -31,12 +31,70 @@ class ResearchStep:
     agent: Optional[str] = None
 
 class AsyncCrewAIResearchTool:
+    # Ajan şablonları - LLM ve araçlar isimle paylaşılan kaynak havuzundan bağlanır
+    AGENT_TEMPLATES = {
+        "web_researcher": {
+            "role": 'Kıdemli Web Araştırma Uzmanı',
+            "goal": 'Verilen konuda kapsamlı web araştırması yaparak detaylı bilgi toplamak',
+            "backstory": "Web'deki en güncel ve güvenilir kaynakları bulma konusunda uzman bir araştırmacı.",
+            "verbose": True,
+            "allow_delegation": True,
+            "tools": ["web_search"],
+            "llm": "default"
+        },
+        "youtube_analyst": {
+            "role": 'YouTube İçerik Analisti',
+            "goal": 'Konuyla ilgili en iyi YouTube videolarını bulup analiz etmek',
+            "backstory": "Video içeriklerindeki değerli bilgileri çıkarma konusunda uzman analist.",
+            "verbose": True,
+            "allow_delegation": False,
+            "tools": ["youtube_search", "youtube_transcript"],
+            "llm": "default"
+        },
+        "report_processor": {
+            "role": 'Rapor Yapılandırma Uzmanı',
+            "goal": 'Araştırma sonuçlarını yapılandırılmış alt başlıklara böler',
+            "backstory": "Karmaşık bilgileri organize etme ve yapılandırma konusunda uzman.",
+            "verbose": True,
+            "allow_delegation": False,
+            "tools": [],
+            "llm": "pro"
+        },
+        "json_converter": {
+            "role": 'JSON Dönüştürme Uzmanı',
+            "goal": 'Yapılandırılmış içeriği hatasız JSON formatına dönüştürür',
+            "backstory": "Veri formatlaması ve JSON yapıları konusunda uzman geliştirici.",
+            "verbose": True,
+            "allow_delegation": False,
+            "tools": ["json_validator"],
+            "llm": "default"
+        },
+        "detail_researcher": {
+            "role": 'Detay Araştırma Uzmanı',
+            "goal": 'Belirlenen alt başlıkları derinlemesine araştırır',
+            "backstory": "Spesifik konularda derinlemesine araştırma yapma uzmanı.",
+            "verbose": True,
+            "allow_delegation": False,
+            "tools": ["web_search"],
+            "llm": "pro"
+        },
+        "json_manager": {
+            "role": 'Veri Yöneticisi',
+            "goal": 'JSON verilerini güvenli şekilde dosyalara kaydeder',
+            "backstory": "Veri yönetimi ve dosya işlemleri uzmanı.",
+            "verbose": True,
+            "allow_delegation": False,
+            "tools": ["json_saver", "file_reader"],
+            "llm": "default"
+        },
+    }
+
     def __init__(self, websocket_callback=None):
         self.websocket_callback = websocket_callback
         self.research_steps = []
-        self.executor = ThreadPoolExecutor(max_workers=4)
-        self.setup_llm_and_tools()
-        self.setup_agents()
+        self.executor = resource_pool.get_executor("crew")
+        self.cancel_event = threading.Event()  # Crew thread'lerine iptal sinyali
+        self._agents_ready = False
 
     async def send_workflow_message(self, agent_name: str, message: str, data: Dict = None):
         if self.websocket_callback:
@@ -50,27 +108,23 @@ class AsyncCrewAIResearchTool:
             await self.websocket_callback(json.dumps(workflow_message))
             print(f"📡 Workflow Message Sent: {agent_name} -> {message}")
 
+    def ensure_ready(self):
+        """LLM, araç ve ajanları ilk araştırmada hazırlar"""
+        if not self._agents_ready:
+            self.setup_llm_and_tools()
+            self.setup_agents()
+            self._agents_ready = True
+
     def setup_llm_and_tools(self):
-        """LLM ve araçları ayarla"""
+        """LLM ve araçları paylaşılan kaynak havuzundan ayarla"""
         try:
-            self.gemini_llm = LLM(
-                model="gemini/gemini-2.5-flash",
-                api_key=Config.GOOGLE_API_KEY,
-                temperature=0.6
-            )
-            self.gemini_llm_pro = LLM(
-                model="gemini/gemini-2.5-flash",
-                api_key=Config.GOOGLE_API_KEY,
-                temperature=0.6
-            )
-            
-            # Whisper model
-            self.whisper_model = WhisperModel("base", device="cpu", compute_type="int8")
-            
-            # Araçları tanımla
-            self.web_search_tool = SerperDevTool()
+            self.gemini_llm = resource_pool.get_crew_llm(temperature=0.6)
+            self.gemini_llm_pro = resource_pool.get_crew_llm(temperature=0.6)
+
+            # Whisper modeli transkript aracı ilk çalıştığında havuzdan yüklenir
+            self.web_search_tool = resource_pool.get_web_search_tool()
             self.youtube_tool = YouTubeSearchTool(api_key=Config.YOUTUBE_API_KEY)
-            self.youtube_transcript_tool = YouTubeTranscriptTool(model=self.whisper_model)
+            self.youtube_transcript_tool = YouTubeTranscriptTool(on_segment=self._transcript_segment_callback())
             self.json_validator_tool = JSONValidatorTool()
             self.json_saver_tool = JSONSaverTool()
             self.file_reader_tool = FileReaderTool()
@@ -80,61 +134,55 @@ class AsyncCrewAIResearchTool:
         except Exception as e:
             raise ValueError(f"CrewAI setup hatası: {e}")
 
+    def _transcript_segment_callback(self):
+        """Whisper thread'inden gelen segmentleri YouTubeAnalyst ilerlemesi olarak iletir"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        def on_segment(start: float, end: float, text: str, duration: float):
+            if not self.websocket_callback:
+                return
+            position = f"{int(end // 60):02d}:{int(end % 60):02d}"
+            total = f"{int(duration // 60):02d}:{int(duration % 60):02d}" if duration else "?"
+            asyncio.run_coroutine_threadsafe(
+                self.send_progress_update(
+                    f"🎙️ Transkript {position} / {total}: {text[:80]}",
+                    {"segment_start": round(start, 2), "segment_end": round(end, 2), "duration": duration},
+                    agent_name="YouTubeAnalyst"
+                ),
+                loop
+            )
+        return on_segment
+
+    def _agent_tools(self) -> Dict[str, Any]:
+        return {
+            "web_search": self.web_search_tool,
+            "youtube_search": self.youtube_tool,
+            "youtube_transcript": self.youtube_transcript_tool,
+            "json_validator": self.json_validator_tool,
+            "json_saver": self.json_saver_tool,
+            "file_reader": self.file_reader_tool,
+        }
+
     def setup_agents(self):
-        self.web_researcher = Agent(
-            role='Kıdemli Web Araştırma Uzmanı',
-            goal='Verilen konuda kapsamlı web araştırması yaparak detaylı bilgi toplamak',
-            backstory="Web'deki en güncel ve güvenilir kaynakları bulma konusunda uzman bir araştırmacı.",
-            verbose=True,
-            allow_delegation=True,
-            tools=[self.web_search_tool],
-            llm=self.gemini_llm
-        )
-        self.youtube_analyst = Agent(
-            role='YouTube İçerik Analisti',
-            goal='Konuyla ilgili en iyi YouTube videolarını bulup analiz etmek',
-            backstory="Video içeriklerindeki değerli bilgileri çıkarma konusunda uzman analist.",
-            verbose=True,
-            allow_delegation=False,
-            tools=[self.youtube_tool, self.youtube_transcript_tool],
-            llm=self.gemini_llm
-        )
-        self.report_processor = Agent(
-            role='Rapor Yapılandırma Uzmanı',
-            goal='Araştırma sonuçlarını yapılandırılmış alt başlıklara böler',
-            backstory="Karmaşık bilgileri organize etme ve yapılandırma konusunda uzman.",
-            verbose=True,
-            allow_delegation=False,
-            tools=[],
-            llm=self.gemini_llm_pro
-        )
-        self.json_converter = Agent(
-            role='JSON Dönüştürme Uzmanı',
-            goal='Yapılandırılmış içeriği hatasız JSON formatına dönüştürür',
-            backstory="Veri formatlaması ve JSON yapıları konusunda uzman geliştirici.",
-            verbose=True,
-            allow_delegation=False,
-            tools=[self.json_validator_tool],
-            llm=self.gemini_llm
-        )
-        self.detail_researcher = Agent(
-            role='Detay Araştırma Uzmanı',
-            goal='Belirlenen alt başlıkları derinlemesine araştırır',
-            backstory="Spesifik konularda derinlemesine araştırma yapma uzmanı.",
-            verbose=True,
-            allow_delegation=False,
-            tools=[self.web_search_tool],
-            llm=self.gemini_llm_pro
-        )
-        self.json_manager = Agent(
-            role='Veri Yöneticisi',
-            goal='JSON verilerini güvenli şekilde dosyalara kaydeder',
-            backstory="Veri yönetimi ve dosya işlemleri uzmanı.",
-            verbose=True,
-            allow_delegation=False,
-            tools=[self.json_saver_tool, self.file_reader_tool],
-            llm=self.gemini_llm
+        agents = resource_pool.build_agents(
+            self.AGENT_TEMPLATES,
+            llms={"default": self.gemini_llm, "pro": self.gemini_llm_pro},
+            tools=self._agent_tools()
         )
+        for name, agent in agents.items():
+            setattr(self, name, agent)
+
+    def build_agent(self, name: str):
+        """Şablondan yeni bir ajan örneği oluşturur (eşzamanlı crew'lar için)"""
+        self.ensure_ready()
+        return resource_pool.build_agents(
+            {name: self.AGENT_TEMPLATES[name]},
+            llms={"default": self.gemini_llm, "pro": self.gemini_llm_pro},
+            tools=self._agent_tools()
+        )[name]
 
     async def send_progress_update(self, message: str, step_data: Dict = None, agent_name: str = None):
         if self.websocket_callback:
@@ -178,18 +226,53 @@ class AsyncCrewAIResearchTool:
             }
             await self.websocket_callback(json.dumps(update_data))
 
-    def run_crew_sync(self, crew):
+    def _check_cancelled(self, *_, stage_event: Optional[threading.Event] = None,
+                         cancel_event: Optional[threading.Event] = None):
+        """Crew adımları arasında iptal sinyalini kontrol eder"""
+        if (cancel_event or self.cancel_event).is_set():
+            raise InterruptedError("Araştırma kullanıcı tarafından iptal edildi")
+        if stage_event is not None and stage_event.is_set():
+            raise InterruptedError("Aşama zaman aşımına uğradı")
+
+    def run_crew_sync(self, crew, stage_event: Optional[threading.Event] = None,
+                      cancel_event: Optional[threading.Event] = None):
+        # Çalıştırmanın başladığı andaki olay kullanılır; sonraki çalıştırma yeni olay alır
+        cancel_event = cancel_event or self.cancel_event
+        if cancel_event.is_set():
+            return {"success": False, "error": "Araştırma kullanıcı tarafından iptal edildi", "cancelled": True}
         try:
+            # Her ajan adımından sonra iptal kontrolü yapılır
+            crew.step_callback = lambda *args: self._check_cancelled(
+                *args, stage_event=stage_event, cancel_event=cancel_event
+            )
             result = crew.kickoff()
             return {"success": True, "result": result}
+        except InterruptedError as e:
+            return {"success": False, "error": str(e), "cancelled": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    async def run_crew_async(self, crew):
+    async def run_crew_async(self, crew, stage_event: Optional[threading.Event] = None):
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(self.executor, self.run_crew_sync, crew)
+        result = await loop.run_in_executor(
+            self.executor, self.run_crew_sync, crew, stage_event, self.cancel_event
+        )
         return result
 
+    async def run_stage(self, agent_name: str, crew, timeout: float):
+        """Bir araştırma aşamasını zaman aşımıyla çalıştırır; (sonuç, süre) döner"""
+        stage_event = threading.Event()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.run_crew_async(crew, stage_event), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Thread'deki crew bir sonraki adımda durur
+            stage_event.set()
+            result = {"success": False, "error": f"{int(timeout)}s zaman aşımı"}
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        return result, time.perf_counter() - start
+
     async def comprehensive_research(self, topic: str) -> Dict[str, Any]:
         research_data = {
             "topic": topic,
@@ -199,32 +282,59 @@ class AsyncCrewAIResearchTool:
             "final_report": ""
         }
         try:
+            self.ensure_ready()
+            research_start = time.perf_counter()
+
+            # Web ve YouTube aşamaları birbirinden bağımsız - aynı anda başlatılır
             await self.send_workflow_message("WebResearcher", "🔍 Web araştırması başlatılıyor...")
+            await self.send_workflow_message("YouTubeAnalyst", "📹 YouTube analizi başlatılıyor...")
             initial_task = Task(
                 description=f"'{topic}' hakkında kapsamlı bir ön araştırma raporu oluştur.",
                 expected_output="Detaylı, iyi yapılandırılmış ve bilgilendirici ön araştırma raporu.",
                 agent=self.web_researcher
             )
             crew1 = Crew(agents=[self.web_researcher], tasks=[initial_task])
-            result1 = await self.run_crew_async(crew1)
-            if not result1["success"]:
-                raise Exception(f"Web araştırması hatası: {result1['error']}")
-            await self.send_workflow_message("WebResearcher", "✅ Web araştırması tamamlandı")
-
-            await self.send_workflow_message("YouTubeAnalyst", "📹 YouTube analizi başlatılıyor...")
             youtube_task = Task(
                 description=f"'{topic}' hakkında en popüler ve bilgilendirici YouTube videolarını bul. En iyi videonun transkriptini çıkar ve anahtar noktaları özetle.",
                 expected_output="YouTube video analizi, transkript özeti ve önemli bulgular.",
                 agent=self.youtube_analyst
             )
             crew2 = Crew(agents=[self.youtube_analyst], tasks=[youtube_task])
-            result2 = await self.run_crew_async(crew2)
-            if not result2["success"]:
-                raise Exception(f"YouTube analizi hatası: {result2['error']}")
-            await self.send_workflow_message("YouTubeAnalyst", "✅ YouTube analizi tamamlandı")
+
+            (result1, web_seconds), (result2, youtube_seconds) = await asyncio.gather(
+                self.run_stage("WebResearcher", crew1, Config.RESEARCH_WEB_TIMEOUT),
+                self.run_stage("YouTubeAnalyst", crew2, Config.RESEARCH_YOUTUBE_TIMEOUT)
+            )
+            stage_wall_time = time.perf_counter() - research_start
+
+            if result1["success"]:
+                await self.send_workflow_message("WebResearcher", f"✅ Web araştırması tamamlandı ({web_seconds:.1f}s)")
+            if result2["success"]:
+                await self.send_workflow_message("YouTubeAnalyst", f"✅ YouTube analizi tamamlandı ({youtube_seconds:.1f}s)")
+            else:
+                # YouTube yavaş veya hatalıysa yapılandırma sadece web sonuçlarıyla devam eder
+                await self.send_workflow_message("YouTubeAnalyst", f"⚠️ YouTube analizi atlandı: {result2['error']}")
+            if not result1["success"] and not result2["success"]:
+                raise Exception(f"Web araştırması hatası: {result1['error']}")
+            if not result1["success"]:
+                await self.send_workflow_message("WebResearcher", f"⚠️ Web araştırması başarısız, YouTube sonuçlarıyla devam ediliyor: {result1['error']}")
+
+            await self.send_workflow_message(
+                "CrewAI-Manager",
+                f"⏱️ Kaynak toplama {stage_wall_time:.1f}s sürdü (web: {web_seconds:.1f}s, YouTube: {youtube_seconds:.1f}s, "
+                f"sıralı çalışmada ~{web_seconds + youtube_seconds:.1f}s)",
+                {"wall_time": round(stage_wall_time, 2), "web_seconds": round(web_seconds, 2), "youtube_seconds": round(youtube_seconds, 2)}
+            )
+
+            sources = [name for name, result in (("web", result1), ("youtube", result2)) if result["success"]]
+            research_data["sources"] = sources
 
             await self.send_workflow_message("ReportProcessor", "📋 Rapor yapılandırılıyor...")
-            combined_content = f"WEB ARAŞTIRMA SONUÇLARI:\n{result1['result']}\n\nYOUTUBE ANALİZ SONUÇLARI:\n{result2['result']}"
+            combined_content = "\n\n".join(
+                f"{title}:\n{result['result']}"
+                for title, result in (("WEB ARAŞTIRMA SONUÇLARI", result1), ("YOUTUBE ANALİZ SONUÇLARI", result2))
+                if result["success"]
+            )
             structure_result = await self.structure_report_with_retry_async(combined_content, topic)
             if not structure_result:
                 raise Exception("Rapor yapılandırması başarısız oldu.")
@@ -237,10 +347,13 @@ class AsyncCrewAIResearchTool:
             final_report = self.create_presentation_summary(detailed_sections, topic)
             research_data["final_report"] = final_report
 
-            saved_file = await self.save_final_research(detailed_sections, topic)
+            saved_file = await self.save_final_research(detailed_sections, topic, sources=" + ".join(sources))
             if saved_file:
                 research_data["saved_file"] = saved_file
             
+            total_seconds = time.perf_counter() - research_start
+            research_data["wall_time_seconds"] = round(total_seconds, 2)
+            await self.send_workflow_message("CrewAI-Manager", f"⏱️ Araştırma toplam {total_seconds:.1f}s'de tamamlandı")
             return research_data
         except Exception as e:
             error_report = f"Üzgünüm, '{topic}' araştırması sırasında bir hata oluştu: {e}"
@@ -311,48 +424,81 @@ class AsyncCrewAIResearchTool:
         return None
 
     async def detail_each_section_async(self, sections: List[Dict], topic: str) -> List[Dict]:
-        detailed_sections = []
-        for i, section in enumerate(sections, 1):
+        """Alt başlıkları sınırlı eşzamanlılıkla paralel detaylandırır; sonuçlar orijinal sırada döner"""
+        total = len(sections)
+        semaphore = asyncio.Semaphore(Config.RESEARCH_DETAIL_CONCURRENCY)
+        completed = 0
+
+        async def detail_section(i: int, section: Dict) -> Dict:
+            nonlocal completed
             alt_baslik = section['alt_baslik']
             mevcut_aciklama = section['aciklama']
-            
-            await self.send_subtopic_update(alt_baslik, "running")
-            await self.send_agent_message("DetailResearcher", f"🔍 Alt başlık {i}/{len(sections)} detaylandırılıyor: {alt_baslik}")
-            
-            detail_task = Task(
-                description=(
-                    f"'{alt_baslik}' konusunu '{topic}' ana konusu bağlamında detaylandır.\n\n"
-                    f"MEVCUT AÇIKLAMA:\n{mevcut_aciklama}\n\n"
-                    "GÖREV:\n"
-                    "1. Bu alt başlık hakkında ek web araştırması yap\n"
-                    "2. Mevcut açıklamayı genişlet ve derinleştir\n"
-                    "3. Güncel bilgileri, örnekleri ve detayları ekle\n"
-                    "4. Kapsamlı ve anlaşılır bir açıklama oluştur\n"
-                    "5. En az 200 kelimelik detaylı açıklama ver\n\n"
-                    "ÇIKTI: Sadece detaylandırılmış açıklama metnini ver."
-                ),
-                expected_output=f"'{alt_baslik}' için kapsamlı detaylı açıklama",
-                agent=self.detail_researcher
-            )
-            crew = Crew(agents=[self.detail_researcher], tasks=[detail_task])
-            
-            result = await self.run_crew_async(crew)
-            detailed_content = str(result["result"]).strip() if result["success"] else f"Hata: {result['error']}"
-            
-            detailed_sections.append({"alt_baslik": alt_baslik, "aciklama": detailed_content})
-            
+
+            async with semaphore:
+                await self.send_subtopic_update(alt_baslik, "running")
+                await self.send_agent_message("DetailResearcher", f"🔍 Alt başlık {i}/{total} detaylandırılıyor: {alt_baslik}")
+
+                # Eşzamanlı crew'lar aynı Agent örneğini paylaşamaz - her alt başlığa ayrı ajan
+                detail_researcher = self.build_agent("detail_researcher")
+                detail_task = Task(
+                    description=(
+                        f"'{alt_baslik}' konusunu '{topic}' ana konusu bağlamında detaylandır.\n\n"
+                        f"MEVCUT AÇIKLAMA:\n{mevcut_aciklama}\n\n"
+                        "GÖREV:\n"
+                        "1. Bu alt başlık hakkında ek web araştırması yap\n"
+                        "2. Mevcut açıklamayı genişlet ve derinleştir\n"
+                        "3. Güncel bilgileri, örnekleri ve detayları ekle\n"
+                        "4. Kapsamlı ve anlaşılır bir açıklama oluştur\n"
+                        "5. En az 200 kelimelik detaylı açıklama ver\n\n"
+                        "ÇIKTI: Sadece detaylandırılmış açıklama metnini ver."
+                    ),
+                    expected_output=f"'{alt_baslik}' için kapsamlı detaylı açıklama",
+                    agent=detail_researcher
+                )
+                crew = Crew(agents=[detail_researcher], tasks=[detail_task])
+
+                try:
+                    result = await self.run_crew_async(crew)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+
+            if result["success"]:
+                detailed_content = str(result["result"]).strip()
+                status_message = f"✅ '{alt_baslik}' detaylandırıldı"
+            else:
+                # Başarısız alt başlık tüm araştırmayı düşürmez - mevcut açıklama korunur
+                detailed_content = f"{mevcut_aciklama}\n\n⚠️ Detaylandırma başarısız oldu: {result['error']}"
+                status_message = f"⚠️ '{alt_baslik}' detaylandırılamadı, özet açıklama kullanıldı"
+
+            completed += 1
             await self.send_subtopic_update(alt_baslik, "completed", detailed_content)
-            await self.send_agent_message("DetailResearcher", f"✅ '{alt_baslik}' detaylandırıldı ({i}/{len(sections)})")
-            await asyncio.sleep(0.5)
+            await self.send_agent_message("DetailResearcher", f"{status_message} ({completed}/{total})")
+            return {"alt_baslik": alt_baslik, "aciklama": detailed_content}
+
+        results = await asyncio.gather(
+            *(detail_section(i, section) for i, section in enumerate(sections, 1)),
+            return_exceptions=True
+        )
+
+        detailed_sections = []
+        for section, result in zip(sections, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, Exception):
+                result = {
+                    "alt_baslik": section['alt_baslik'],
+                    "aciklama": f"{section['aciklama']}\n\n⚠️ Detaylandırma başarısız oldu: {result}"
+                }
+            detailed_sections.append(result)
         return detailed_sections
 
-    async def save_final_research(self, detailed_sections: List[Dict], topic: str) -> Optional[str]:
+    async def save_final_research(self, detailed_sections: List[Dict], topic: str, sources: str = "web + youtube") -> Optional[str]:
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             safe_topic = "".join(c for c in topic if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')[:30]
             filename = f"crew_research_{safe_topic}_{timestamp}.json"
             
-            research_dir = Path("research_data")
+            research_dir = Path(Config.RESEARCH_DATA_DIR)
             research_dir.mkdir(exist_ok=True)
             file_path = research_dir / filename
             
@@ -365,13 +511,14 @@ class AsyncCrewAIResearchTool:
                 "summary": {
                     "total_subtopics": len(detailed_sections),
                     "research_depth": "detailed",
-                    "sources": "web + youtube"
+                    "sources": sources
                 }
             }
             
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(final_data, ensure_ascii=False, indent=2))
             
+            research_cache.add(topic, str(file_path), final_data["timestamp"])
             return str(file_path)
             
         except Exception as e:
@@ -413,7 +560,12 @@ class AsyncCrewAIA2AHandler:
             }
             await self.websocket_callback(json.dumps(workflow_message))
     
-    async def research_workflow(self, query: str) -> Dict:
+    async def research_workflow(self, query: str, refresh: bool = False) -> Dict:
+        if not refresh:
+            cached = await self.load_cached_research(query)
+            if cached:
+                return cached
+
         await self.send_workflow_message("CrewAI-Manager", "🚀 Asenkron Multi-Agent araştırma sistemi başlatılıyor", {
             "query": query,
             "agents": ["WebResearcher", "YouTubeAnalyst", "ReportProcessor", "DetailResearcher", "DataManager"],
@@ -428,4 +580,42 @@ class AsyncCrewAIA2AHandler:
             "saved_files": result.get("saved_files", [])
         })
         
-        return result
\ No newline at end of file
+        return result
+
+    async def load_cached_research(self, query: str) -> Optional[Dict]:
+        """Aynı veya çok benzer konuda taze bir araştırma varsa pipeline'ı çalıştırmadan döner"""
+        try:
+            hit = await asyncio.to_thread(research_cache.lookup, query)
+        except Exception as e:
+            print(f"⚠️ Araştırma önbelleği kontrol edilemedi: {e}")
+            return None
+        if not hit:
+            return None
+
+        data = hit["data"]
+        detailed_sections = data.get("subtopics", [])
+        age_text = ResearchCache.format_age(hit["age_seconds"])
+        await self.send_workflow_message("CrewAI-Manager", f"♻️ '{hit['matched_topic']}' için {age_text} önce yapılmış araştırma kullanılıyor", {
+            "query": query,
+            "matched_topic": hit["matched_topic"],
+            "similarity": hit["similarity"],
+            "age_seconds": hit["age_seconds"],
+            "cached": True
+        })
+
+        final_report = self.crew_tool.create_presentation_summary(detailed_sections, data.get("topic", query))
+        final_report += (
+            f"\n\n♻️ Bu sonuçlar {age_text} önce yapılan araştırmadan getirildi. "
+            f"Güncel bir araştırma için 'yeniden araştır' yazabilirsin."
+        )
+        return {
+            "topic": data.get("topic", query),
+            "timestamp": data.get("timestamp"),
+            "subtopics": [],
+            "detailed_research": detailed_sections,
+            "final_report": final_report,
+            "saved_file": hit["path"],
+            "sources": data.get("summary", {}).get("sources"),
+            "cached": True,
+            "cache_similarity": hit["similarity"],
+        }
@@ -0,0 +1,226 @@
+# src/api/outbox.py
+
+import asyncio
+import json
+import logging
+import re
+import weakref
+from collections import deque
+from typing import Any, Dict, Optional
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Düşük öncelikli telemetri - kuyruk dolunca atılabilir ve toplu gönderilebilir
+TELEMETRY_TYPES = {"crew_progress", "workflow_message", "a2a_message", "subtopic_progress", "ingestion_progress"}
+
+# subtopic_progress birleştirilir ama atılmaz: 'completed' çerçevesi bölüm içeriğini taşır (App.js updateSubTopicStatus)
+DROPPABLE_TYPES = TELEMETRY_TYPES - {"subtopic_progress"}
+
+# json.dumps "type" anahtarını ilk sıraya yazar; büyük mesajları parse etmeden türü okumak için
+_TYPE_PATTERN = re.compile(r'^\{\s*"type"\s*:\s*"([A-Za-z0-9_]+)"')
+
+
+def _message_type(message: str) -> Optional[str]:
+    """Mesajın "type" alanı (ilk anahtar değilse None)"""
+    match = _TYPE_PATTERN.match(message)
+    return match.group(1) if match else None
+
+# Kapanmış bağlantıların sayaçları /metrics'te kaybolmasın diye toplanır
+_closed_totals: Dict[str, int] = {}
+_open_outboxes: "weakref.WeakSet[WebSocketOutbox]" = weakref.WeakSet()
+
+_COUNTERS = ("enqueued", "sent", "frames", "batches", "coalesced", "dropped", "blocked")
+
+
+class WebSocketOutbox:
+    """Bağlantı başına sınırlı giden mesaj kuyruğu.
+
+    Ajanlar mesajı kuyruğa bırakıp devam eder; tek bir yazıcı task mesajları
+    sırayla gönderir. Aynı konudaki eski ilerleme mesajları yenisiyle
+    birleştirilir, kuyruk dolunca telemetri atılır, önemli mesajlar ise yer
+    açılana kadar bekletilir.
+    """
+
+    def __init__(self, websocket, chat_id: str = "",
+                 max_size: int = None, batch_max_frames: int = None):
+        self.websocket = websocket
+        self.chat_id = chat_id
+        self.max_size = max_size or Config.WS_OUTBOX_MAX_SIZE
+        self.batch_max_frames = batch_max_frames or Config.WS_BATCH_MAX_FRAMES
+
+        # Her eleman: [coalesce_key, message_type, payload(str), parsed(dict|None)]
+        self._queue: deque = deque()
+        self._pending_by_key: Dict[Any, list] = {}
+        self._not_empty = asyncio.Condition()
+        self._not_full = asyncio.Condition()
+        self._closed = False
+        self._in_flight = False
+        self._writer: Optional[asyncio.Task] = None
+
+        self.stats = {name: 0 for name in _COUNTERS}
+        self.stats["max_depth"] = 0
+        _open_outboxes.add(self)
+
+    def start(self):
+        """Yazıcı task'ı başlatır"""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run_writer())
+        return self
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    async def send(self, message: str):
+        """websocket_callback ile uyumlu gönderim - mesajı kuyruğa ekler"""
+        if self._closed:
+            return
+
+        message_type, parsed = self._classify(message)
+        self.stats["enqueued"] += 1
+
+        coalesce_key = self._coalesce_key(message_type, parsed)
+        if coalesce_key is not None:
+            pending = self._pending_by_key.get(coalesce_key)
+            if pending is not None:
+                # Henüz gönderilmemiş eski durumu yenisiyle değiştir (sıra korunur)
+                pending[2], pending[3] = message, parsed
+                self.stats["coalesced"] += 1
+                return
+
+        if len(self._queue) >= self.max_size:
+            if message_type in DROPPABLE_TYPES:
+                self.stats["dropped"] += 1
+                return
+            # Önemli mesaj: yazıcı yer açana kadar üreticiyi beklet
+            self.stats["blocked"] += 1
+            async with self._not_full:
+                await self._not_full.wait_for(lambda: len(self._queue) < self.max_size or self._closed)
+            if self._closed:
+                return
+
+        entry = [coalesce_key, message_type, message, parsed]
+        self._queue.append(entry)
+        if coalesce_key is not None:
+            self._pending_by_key[coalesce_key] = entry
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._queue))
+
+        async with self._not_empty:
+            self._not_empty.notify()
+
+    async def close(self, drain_timeout: float = 1.0):
+        """Kalan mesajları kısa süre içinde göndermeye çalışır ve yazıcıyı durdurur"""
+        if self._writer is not None and not self._closed:
+            try:
+                await asyncio.wait_for(self._wait_drained(), timeout=drain_timeout)
+            except (asyncio.TimeoutError, Exception):
+                pass
+        self._shutdown()
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+        _open_outboxes.discard(self)
+        for name in _COUNTERS:
+            _closed_totals[name] = _closed_totals.get(name, 0) + self.stats[name]
+        _closed_totals["dropped_on_close"] = _closed_totals.get("dropped_on_close", 0) + len(self._queue)
+        self._queue.clear()
+        self._pending_by_key.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "depth": self.depth, "max_size": self.max_size, "chat_id": self.chat_id}
+
+    # --- İç yardımcılar ---
+
+    def _classify(self, message: str):
+        message_type = _message_type(message)
+        parsed = None
+        if message_type in TELEMETRY_TYPES:
+            try:
+                parsed = json.loads(message)
+            except json.JSONDecodeError:
+                parsed = None
+        return message_type, parsed
+
+    @staticmethod
+    def _coalesce_key(message_type: Optional[str], parsed: Optional[dict]):
+        if not parsed:
+            return None
+        if message_type == "crew_progress":
+            return (message_type, parsed.get("agent"))
+        if message_type == "subtopic_progress":
+            return (message_type, parsed.get("subtopic"))
+        if message_type == "ingestion_progress":
+            return (message_type, parsed.get("filename"))
+        return None
+
+    def _pop(self):
+        entry = self._queue.popleft()
+        if entry[0] is not None and self._pending_by_key.get(entry[0]) is entry:
+            del self._pending_by_key[entry[0]]
+        return entry
+
+    async def _wait_drained(self):
+        while self._queue or self._in_flight:
+            await asyncio.sleep(0.01)
+
+    def _shutdown(self):
+        self._closed = True
+
+        async def wake_producers():
+            async with self._not_full:
+                self._not_full.notify_all()
+        asyncio.create_task(wake_producers())
+
+    async def _run_writer(self):
+        try:
+            while True:
+                async with self._not_empty:
+                    await self._not_empty.wait_for(lambda: self._queue)
+
+                self._in_flight = True
+                entry = self._pop()
+                if entry[1] in TELEMETRY_TYPES and entry[3] is not None:
+                    # Art arda bekleyen telemetriyi tek çerçevede gönder
+                    frames = [entry[3]]
+                    while (self._queue and len(frames) < self.batch_max_frames
+                           and self._queue[0][1] in TELEMETRY_TYPES and self._queue[0][3] is not None):
+                        frames.append(self._pop()[3])
+                    if len(frames) > 1:
+                        payload = json.dumps({"type": "batch", "messages": frames}, ensure_ascii=False)
+                        self.stats["batches"] += 1
+                    else:
+                        payload = entry[2]
+                    sent_count = len(frames)
+                else:
+                    payload, sent_count = entry[2], 1
+
+                async with self._not_full:
+                    self._not_full.notify_all()
+
+                await self.websocket.send_text(payload)
+                self._in_flight = False
+                self.stats["sent"] += sent_count
+                self.stats["frames"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Bağlantı koptu - üreticiler artık beklemesin
+            logger.error(f"❌ WebSocket gönderim hatası (Chat: {self.chat_id}): {e}")
+            self._shutdown()
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Tüm bağlantıların kuyruk metriklerini döner"""
+    connections = [outbox.get_stats() for outbox in list(_open_outboxes)]
+    totals = dict(_closed_totals)
+    for conn in connections:
+        for name in _COUNTERS:
+            totals[name] = totals.get(name, 0) + conn[name]
+    return {
+        "open_connections": len(connections),
+        "queue_depth": sum(conn["depth"] for conn in connections),
+        "totals": totals,
+        "connections": connections,
+    }
@@ -1,20 +1,35 @@
 # src/api/server.py
 import asyncio
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Header
+from typing import List, Optional
 from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import json
+import hmac
 from datetime import datetime
 import uvicorn
 import logging
 from fastapi.middleware.cors import CORSMiddleware
-from langchain_core.messages import HumanMessage  # Bu satırı ekledim
-from core.conversation import AsyncLangGraphDialog
 from core.config import Config
 from core.vector_store import VectorStore
 from core.chat_manager import ChatManager
-import shutil
+from core.dialog_cache import DialogCache
+from core import resource_pool
+from core.research_cache import research_cache
+from core.transcript_store import transcript_store
+from core.llm_governor import governor
+from core.evaluation import classic_evaluator, FALLBACK_TIMEOUT, FALLBACK_ERROR
+from core.grading import grade_test_results, load_saved_tests
+from core.intent_router import intent_router
+from core.rag_prefetch import get_stats as get_rag_prefetch_stats
+from core.ocr_service import ocr_service
+from core.ingestion import ocr_pool, get_stats as get_ingestion_stats
+from core.bulk_import import BulkImporter, SUPPORTED_EXTENSIONS, max_size_for, upload_metadata
+from core.reclaimer import StorageReclaimer
+from core.document_processor import IMAGE_EXTENSIONS
+from api.outbox import WebSocketOutbox, get_metrics as get_outbox_metrics
+from api.uploads import store_upload
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,8 +50,24 @@ app.add_middleware(CORSMiddleware, allow_origins=origins, allow_credentials=True
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 # Global değişkenler
-dialog_instances = {}
 chat_manager = ChatManager()
+dialog_instances = DialogCache(
+    max_size=Config.DIALOG_CACHE_MAX_SIZE,
+    max_memory_mb=Config.DIALOG_CACHE_MAX_MEMORY_MB,
+    idle_timeout=Config.DIALOG_IDLE_TIMEOUT,
+    state_path_for=lambda cid: chat_manager.get_chat_directory(cid) / Config.DIALOG_STATE_FILENAME
+)
+# Açık diyaloğu olan sohbetlerin dosyalarına dokunulmaz
+reclaimer = StorageReclaimer(chat_manager, is_active=lambda cid: cid in dialog_instances)
+
+async def run_periodic_reclaim(interval_hours: float):
+    """Silinmiş sohbetlerden kalan verileri düzenli aralıklarla temizler"""
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            await asyncio.to_thread(reclaimer.run)
+        except Exception as e:
+            logger.error(f"❌ Zamanlanmış disk temizliği hatası: {e}")
 
 @app.on_event("startup")
 async def startup_event():
@@ -46,11 +77,26 @@ async def startup_event():
         logger.info("✅ API anahtarları doğrulandı")
         logger.info(f"✅ Google API Key: {Config.GOOGLE_API_KEY[:10]}...")
         logger.info("✅ Chat Manager başlatıldı")
+        asyncio.create_task(dialog_instances.run_sweeper(Config.DIALOG_CACHE_SWEEP_INTERVAL))
+        logger.info(f"✅ Diyalog önbelleği başlatıldı (max {Config.DIALOG_CACHE_MAX_SIZE} diyalog)")
+        if Config.RECLAIM_INTERVAL_HOURS > 0:
+            asyncio.create_task(run_periodic_reclaim(Config.RECLAIM_INTERVAL_HOURS))
+        # Önceki araştırmalar yeniden kullanılabilsin diye research_data/ arka planda indekslenir
+        asyncio.create_task(asyncio.to_thread(research_cache.index_directory))
+        if Config.PRELOAD:
+            # Sunucu hemen cevap verebilsin diye ağır bileşenler arka planda yüklenir
+            asyncio.create_task(asyncio.to_thread(resource_pool.warm_up))
+            logger.info(f"🔥 Arka planda ön yükleme başlatıldı: {', '.join(Config.PRELOAD_COMPONENTS)}")
     except Exception as e:
         logger.error(f"❌ Startup hatası: {e}")
         logger.error(f"❌ Config durumu: GOOGLE_API_KEY={'Var' if Config.GOOGLE_API_KEY else 'Yok'}")
         raise e
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    ocr_pool.shutdown()
+    resource_pool.shutdown()
+
 @app.get("/", response_class=HTMLResponse)
 async def serve_index():
     index_path = STATIC_DIR / "index.html"
@@ -295,7 +341,38 @@ async def serve_index():
     
     return FileResponse(index_path)
 
+@app.get("/metrics")
+async def get_metrics():
+    """WebSocket kuyrukları, diyalog önbelleği ve paylaşılan kaynak metrikleri"""
+    return JSONResponse({
+        "websocket_outbox": get_outbox_metrics(),
+        "dialog_cache": dialog_instances.get_stats(),
+        "resource_pool": resource_pool.get_stats(),
+        "research_cache": research_cache.get_stats(),
+        "transcripts": transcript_store.get_stats(),
+        "llm_governor": governor.get_stats(),
+        "classic_evaluation": classic_evaluator.get_stats(),
+        "intent_router": intent_router.get_stats(),
+        "rag_prefetch": get_rag_prefetch_stats(),
+        "ocr": ocr_service.get_stats(),
+        "ingestion": get_ingestion_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
 # Chat API endpoints
+@app.post("/admin/reclaim")
+async def reclaim_storage(dry_run: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Sahipsiz vektör depolarını, yüklemeleri ve geçici dosyaları siler, SQLite dosyalarını küçültür"""
+    # Token ayarlı değilse uç nokta hiç yokmuş gibi davranır (rmtree/VACUUM yetkisiz çalışmasın)
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, Config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Yetkisiz")
+    report = await asyncio.to_thread(reclaimer.run, dry_run)
+    if report["status"] == "busy":
+        raise HTTPException(status_code=409, detail="Disk temizliği zaten çalışıyor")
+    return JSONResponse(report)
+
 @app.get("/chats")
 async def get_chats():
     try:
@@ -349,6 +426,7 @@ async def get_chat_details(chat_id: str):
 @app.delete("/chats/{chat_id}")
 async def delete_chat(chat_id: str):
     try:
+        dialog_instances.discard(chat_id)
         success = chat_manager.delete_chat(chat_id)
         if success:
             return JSONResponse({
@@ -363,6 +441,27 @@ async def delete_chat(chat_id: str):
         logger.error(f"❌ Sohbet silme hatası: {e}")
         raise HTTPException(status_code=500, detail=f"Sohbet silme hatası: {str(e)}")
 
+def ingestion_progress_sender(chat_id: str, filename: str):
+    """Sayfa bazlı metin çıkarma ilerlemesini sohbetin açık WebSocket'ine ileten callback (thread-safe).
+
+    send() işçi thread'lerinden çağrılır; diyalog araması event loop'ta yapılır çünkü
+    DialogCache thread-safe değildir.
+    """
+    loop = asyncio.get_running_loop()
+
+    def deliver(message: str):
+        dialog = dialog_instances.peek(chat_id)
+        callback = dialog.websocket_callback if dialog else None
+        if callback is not None:
+            loop.create_task(callback(message))
+
+    def send(event: dict):
+        frame = {"type": "ingestion_progress", "chat_id": chat_id, "filename": filename,
+                 "timestamp": datetime.utcnow().isoformat(), **event}
+        loop.call_soon_threadsafe(deliver, json.dumps(frame, ensure_ascii=False))
+
+    return send
+
 @app.post("/chats/{chat_id}/upload-pdf")
 async def upload_pdf_to_chat(chat_id: str, file: UploadFile = File(...)):
     try:
@@ -373,46 +472,48 @@ async def upload_pdf_to_chat(chat_id: str, file: UploadFile = File(...)):
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Sadece PDF dosyaları desteklenir")
         
-        if file.size > Config.MAX_PDF_SIZE:
-            raise HTTPException(status_code=400, detail=f"Dosya boyutu {Config.MAX_PDF_SIZE // 1024 // 1024}MB'tan büyük olamaz")
-        
-        chat_upload_dir = chat_manager.get_chat_pdf_directory(chat_id)
-        chat_upload_dir.mkdir(exist_ok=True)
-        
-        safe_filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-        file_path = chat_upload_dir / safe_filename
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Parça parça diske akıtılır: boyut sınırı ve PDF imzası okuma sırasında denetlenir
+        upload = await store_upload(file, chat_manager.get_chat_pdf_directory(chat_id), Config.MAX_PDF_SIZE)
+        file_path, safe_filename = upload["path"], upload["safe_filename"]
         
         vector_store = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id)
         
-        success = vector_store.add_document_from_path(
+        # Metin çıkarma (taranmış sayfalarda OCR) event loop'u bloklamasın
+        status = await asyncio.to_thread(
+            vector_store.add_document_from_path,
             file_path=str(file_path),  # Dosyanın yolunu string olarak gönder
             filename=file.filename,
             metadata={
                 "upload_path": str(file_path),
-                "original_size": file.size,
+                "original_size": upload["size"],
                 "safe_filename": safe_filename,
-                "chat_id": chat_id
-            }
+                "chat_id": chat_id,
+                "content_sha256": upload["sha256"]
+            },
+            progress=ingestion_progress_sender(chat_id, file.filename)
         )
         
-        if success:
-            stats = vector_store.get_stats()
-            chat_manager.update_pdf_count(chat_id, stats["total_documents"])
-            
-            return JSONResponse({
-                "success": True,
-                "message": f"'{file.filename}' başarıyla yüklendi ve vektörleştirildi",
-                "filename": file.filename,
-                "safe_filename": safe_filename,
-                "stats": stats,
-                "chat_id": chat_id
-            })
-        else:
+        if status == "failed":
             file_path.unlink(missing_ok=True)
             raise HTTPException(status_code=500, detail="PDF işlenirken hata oluştu")
+        
+        # Aynı içerik zaten kayıtlı: yeni kopya hiçbir kayıtta geçmediği için silinir
+        if status == "duplicate":
+            await asyncio.to_thread(vector_store.discard_unreferenced, file_path)
+        
+        stats = vector_store.get_stats()
+        chat_manager.update_pdf_count(chat_id, stats["total_documents"])
+        
+        return JSONResponse({
+            "success": True,
+            "duplicate": status == "duplicate",
+            "message": (f"'{file.filename}' zaten yüklenmiş" if status == "duplicate"
+                        else f"'{file.filename}' başarıyla yüklendi ve vektörleştirildi"),
+            "filename": file.filename,
+            "safe_filename": safe_filename,
+            "stats": stats,
+            "chat_id": chat_id
+        })
             
     except HTTPException:
         raise
@@ -427,51 +528,50 @@ async def upload_image_to_chat(chat_id: str, file: UploadFile = File(...)):
         if not chat_info:
             raise HTTPException(status_code=404, detail="Sohbet bulunamadı")
         
-        # Dosya formatı kontrolü (isteğe bağlı, DocumentProcessor da yapabilir)
-        allowed_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.webp']
-        if not any(file.filename.lower().endswith(ext) for ext in allowed_extensions):
-            raise HTTPException(status_code=400, detail=f"Sadece resim dosyaları desteklenir: {', '.join(allowed_extensions)}")
-        
-        if file.size > Config.MAX_IMAGE_SIZE: # Config'e MAX_IMAGE_SIZE ekle (örn: 10 * 1024 * 1024)
-            raise HTTPException(status_code=400, detail=f"Dosya boyutu {Config.MAX_IMAGE_SIZE // 1024 // 1024}MB'tan büyük olamaz")
+        # Dosya formatı kontrolü - OCR hattının okuyabildiği görüntü türleri
+        if not any(file.filename.lower().endswith(ext) for ext in IMAGE_EXTENSIONS):
+            raise HTTPException(status_code=400, detail=f"Sadece resim dosyaları desteklenir: {', '.join(IMAGE_EXTENSIONS)}")
         
-        chat_upload_dir = chat_manager.get_chat_pdf_directory(chat_id) # Aynı klasörü kullanabiliriz
-        chat_upload_dir.mkdir(exist_ok=True)
-        
-        safe_filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-        file_path = chat_upload_dir / safe_filename
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Görüntüler de sohbetin PDF klasörüne yazılır; boyut ve imza akış sırasında denetlenir
+        upload = await store_upload(file, chat_manager.get_chat_pdf_directory(chat_id), Config.MAX_IMAGE_SIZE)
+        file_path, safe_filename = upload["path"], upload["safe_filename"]
         
         vector_store = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id)
         
-        # Yine aynı fonksiyonu çağırıyoruz, çünkü DocumentProcessor dosya türünü anlıyor
-        success = vector_store.add_document_from_path(
+        # Aynı hat görüntüyü OCR işçi havuzundan geçirip normal parçalama/embedding yoluna verir
+        status = await asyncio.to_thread(
+            vector_store.add_document_from_path,
             file_path=str(file_path),
             filename=file.filename,
             metadata={
                 "upload_path": str(file_path),
-                "original_size": file.size,
+                "original_size": upload["size"],
                 "safe_filename": safe_filename,
                 "chat_id": chat_id,
-                "source_type": "ocr"
-            }
+                "source_type": "ocr",
+                "content_sha256": upload["sha256"]
+            },
+            progress=ingestion_progress_sender(chat_id, file.filename)
         )
         
-        if success:
-            stats = vector_store.get_stats()
-            chat_manager.update_pdf_count(chat_id, stats["total_documents"]) # İsmi yanıltıcı olsa da şimdilik belge sayısını tutar
-            
-            return JSONResponse({
-                "success": True,
-                "message": f"'{file.filename}' başarıyla yüklendi ve OCR ile işlendi",
-                "filename": file.filename,
-                "stats": stats
-            })
-        else:
+        if status == "failed":
             file_path.unlink(missing_ok=True)
             raise HTTPException(status_code=500, detail="Resim işlenirken hata oluştu")
+        
+        if status == "duplicate":
+            await asyncio.to_thread(vector_store.discard_unreferenced, file_path)
+        
+        stats = vector_store.get_stats()
+        chat_manager.update_pdf_count(chat_id, stats["total_documents"]) # İsmi yanıltıcı olsa da şimdilik belge sayısını tutar
+        
+        return JSONResponse({
+            "success": True,
+            "duplicate": status == "duplicate",
+            "message": (f"'{file.filename}' zaten yüklenmiş" if status == "duplicate"
+                        else f"'{file.filename}' başarıyla yüklendi ve OCR ile işlendi"),
+            "filename": file.filename,
+            "stats": stats
+        })
             
     except HTTPException:
         raise
@@ -480,6 +580,60 @@ async def upload_image_to_chat(chat_id: str, file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Resim yükleme hatası: {str(e)}")
 
 
+@app.post("/chats/{chat_id}/upload-batch")
+async def upload_batch_to_chat(chat_id: str, files: List[UploadFile] = File(...)):
+    """Birden fazla dökümanı tek hatta işler: tek VectorStore, paralel metin çıkarma, birleşik upsert"""
+    try:
+        chat_info = chat_manager.get_chat_info(chat_id)
+        if not chat_info:
+            raise HTTPException(status_code=404, detail="Sohbet bulunamadı")
+        
+        chat_upload_dir = chat_manager.get_chat_pdf_directory(chat_id)
+        prefix = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        items = []
+        rejected = []
+        for index, file in enumerate(files):
+            if not any(file.filename.lower().endswith(ext) for ext in SUPPORTED_EXTENSIONS):
+                rejected.append({"filename": file.filename, "error": "Desteklenmeyen dosya türü"})
+                continue
+            try:
+                upload = await store_upload(file, chat_upload_dir, max_size_for(file.filename),
+                                            safe_filename=f"{prefix}_{index}_{Path(file.filename).name}")
+            except HTTPException as e:
+                rejected.append({"filename": file.filename, "error": e.detail})
+                continue
+            items.append((str(upload["path"]), file.filename,
+                          upload_metadata(upload["path"], file.filename, upload["size"], chat_id, upload["sha256"])))
+        
+        vector_store = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id)
+        # İlerleme callback'leri event loop thread'inde kurulmalı
+        senders = {path: ingestion_progress_sender(chat_id, filename) for path, filename, _ in items}
+        summary = await asyncio.to_thread(
+            BulkImporter(vector_store).run, items, progress_for=senders.get, remove_unused=True
+        )
+        summary["files"] += len(rejected)
+        summary["failed"].extend(rejected)
+        
+        stats = vector_store.get_stats()
+        chat_manager.update_pdf_count(chat_id, stats["total_documents"])
+        
+        return JSONResponse({
+            "success": bool(summary["added"] or summary["duplicates"]),
+            "message": f"{len(summary['added'])} döküman eklendi, {len(summary['duplicates'])} zaten mevcut, "
+                       f"{len(summary['failed'])} başarısız",
+            "summary": summary,
+            "stats": stats,
+            "chat_id": chat_id
+        })
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Toplu yükleme hatası: {e}")
+        raise HTTPException(status_code=500, detail=f"Toplu yükleme hatası: {str(e)}")
+
+
 @app.get("/chats/{chat_id}/pdfs")
 async def list_chat_pdfs(chat_id: str):
     try:
@@ -545,7 +699,9 @@ async def evaluate_test_results(chat_id: str, test_results: dict):
         total_questions = 0
         wrong_topics = []
         
-        for question_result in test_results.get("results", []):
+        # Objektif sorular istemcinin bayrağına değil kayıtlı doğru cevaba göre puanlanır
+        graded_results = regrade_test_results(chat_id, test_results.get("results", []), test_results.get("test_id"))
+        for question_result in graded_results:
             total_questions += 1
             if question_result.get("is_correct", False):
                 correct_answers += 1
@@ -577,6 +733,7 @@ async def evaluate_test_results(chat_id: str, test_results: dict):
                 "wrong_answers": total_questions - correct_answers,
                 "success_rate": round(success_rate, 2)
             },
+            "grading": summarize_grading(graded_results),
             "performance_level": (
                 "excellent" if success_rate >= 90 else
                 "good" if success_rate >= 70 else
@@ -636,7 +793,9 @@ async def evaluate_test_results_internal(chat_id: str, test_results: dict):
         total_questions = 0
         wrong_topics = []
         
-        for question_result in test_results.get("detailed_results", []):
+        # Objektif sorular istemcinin bayrağına değil kayıtlı doğru cevaba göre puanlanır
+        graded_results = regrade_test_results(chat_id, test_results.get("detailed_results", []), test_results.get("test_id"))
+        for question_result in graded_results:
             total_questions += 1
             if question_result.get("is_correct", False):
                 correct_answers += 1
@@ -668,6 +827,7 @@ async def evaluate_test_results_internal(chat_id: str, test_results: dict):
                 "wrong_answers": total_questions - correct_answers,
                 "success_rate": round(success_rate, 2)
             },
+            "grading": summarize_grading(graded_results),
             "performance_level": (
                 "excellent" if success_rate >= 90 else
                 "good" if success_rate >= 70 else
@@ -695,19 +855,28 @@ async def evaluate_test_results_internal(chat_id: str, test_results: dict):
         logger.error(f"❌ İç test değerlendirme hatası: {e}")
         raise e
 
+def regrade_test_results(chat_id: str, results: list, test_id: str = None) -> list:
+    """Test sonuçlarını sohbetin kayıtlı testlerine göre sunucu tarafında yeniden puanlar"""
+    try:
+        saved_tests = load_saved_tests(chat_manager.get_chat_directory(chat_id))
+        return grade_test_results(saved_tests, results, test_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Sunucu tarafı puanlama yapılamadı, istemci sonuçları kullanılıyor: {e}")
+        return results
+
+def summarize_grading(results: list) -> dict:
+    """Hangi soruların kim tarafından puanlandığını sayar (server / llm / client)"""
+    summary = {"server": 0, "llm": 0, "client": 0}
+    for result in results:
+        graded_by = result.get("graded_by", "client")
+        summary[graded_by] = summary.get(graded_by, 0) + 1
+    return summary
+
 async def evaluate_classic_answer_with_llm(prompt: str, llm) -> str:
     """LLM kullanarak klasik soru cevabını değerlendirir"""
     try:
-        from langchain_core.messages import HumanMessage
-        
-        # LLM'e gönder
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        
-        # Yanıtı string olarak döndür
-        if hasattr(response, 'content'):
-            return response.content
-        else:
-            return str(response)
+        # Aynı prompt daha önce değerlendirildiyse LLM'e gidilmez
+        return await classic_evaluator.evaluate_prompt(prompt, llm)
             
     except Exception as e:
         logger.error(f"❌ LLM değerlendirme hatası: {e}")
@@ -786,6 +955,9 @@ def format_evaluation_message(evaluation: dict) -> str:
 
 # WebSocket endpoint - SORUNLAR DÜZELTİLDİ
 
+# LangGraph akışını çalıştıran mesaj türleri - sohbet başına sırayla işlenir
+GRAPH_MESSAGE_TYPES = {"user_message", "test_parameters_response", "explain_topic"}
+
 @app.websocket("/ws/{chat_id}")
 async def websocket_endpoint(websocket: WebSocket, chat_id: str):
     await websocket.accept()
@@ -817,25 +989,29 @@ async def websocket_endpoint(websocket: WebSocket, chat_id: str):
             logger.error(f"❌ Fallback chat oluşturma hatası: {create_error}")
             chat_id = 'emergency_default'
     
-    async def websocket_callback(message: str):
-        try:
-            await websocket.send_text(message)
-        except Exception as e:
-            logger.error(f"❌ WebSocket gönderim hatası: {e}")
+    # Giden mesajlar bağlantıya özel kuyruktan tek bir yazıcı task ile gönderilir,
+    # böylece yavaş bir istemci ajanları bekletmez
+    outbox = WebSocketOutbox(websocket, chat_id=chat_id).start()
+    websocket_callback = outbox.send
     
-    # Dialog instance'ı oluştur veya al
-    if chat_id not in dialog_instances:
-        dialog_instances[chat_id] = AsyncLangGraphDialog(
+    # Dialog instance'ı önbellekten al, yoksa oluştur ve diske yazılmış durumu geri yükle
+    dialog = dialog_instances.get(chat_id)
+    if dialog is None:
+        # LangGraph/LangChain yığını ilk WebSocket bağlantısında yüklenir
+        from core.conversation import AsyncLangGraphDialog
+        dialog = AsyncLangGraphDialog(
             websocket_callback=websocket_callback,
             chat_id=chat_id,
             chat_manager=chat_manager
         )
+        dialog_instances.restore(chat_id, dialog)
+        dialog_instances.acquire(chat_id)
+        dialog_instances.put(chat_id, dialog)
     else:
         # Mevcut instance'ı güncelle
-        dialog_instances[chat_id].websocket_callback = websocket_callback
-        dialog_instances[chat_id].chat_manager = chat_manager
-    
-    dialog = dialog_instances[chat_id]
+        dialog_instances.acquire(chat_id)
+        dialog.set_websocket_callback(websocket_callback)
+        dialog.update_chat_manager(chat_manager)
     
     # Sohbet geçmişini yükle
     try:
@@ -851,7 +1027,7 @@ async def websocket_endpoint(websocket: WebSocket, chat_id: str):
         vector_store = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id)
         stats = vector_store.get_stats()
         
-        await websocket.send_text(json.dumps({
+        await outbox.send(json.dumps({
             "type": "connection_established",
             "chat_id": chat_id,
             "message": f"Bağlantı kuruldu - Chat: {chat_id}",
@@ -862,230 +1038,309 @@ async def websocket_endpoint(websocket: WebSocket, chat_id: str):
     except Exception as e:
         logger.error(f"❌ Bağlantı onay mesajı hatası: {e}")
     
-    try:
-        while True:
-            try:
-                data = await websocket.receive_text()
-                message_data = json.loads(data)
+    async def handle_message(message_data: dict):
+        """Tek bir istemci mesajını işler - her mesaj ayrı bir task olarak çalışır"""
+        try:
+            if message_data.get("type") == "user_message":
+                # YENİ DÜZELTME: Mesaj formatını düzelt
+                if "message" in message_data:
+                    user_message = message_data["message"]
+                else:
+                    # Legacy destek için direkt message olabilir
+                    user_message = message_data.get("content", "")
                 
-                if message_data.get("type") == "user_message":
-                    # YENİ DÜZELTME: Mesaj formatını düzelt
-                    if "message" in message_data:
-                        user_message = message_data["message"]
-                    else:
-                        # Legacy destek için direkt message olabilir
-                        user_message = message_data.get("content", "")
-                    
-                    # Eğer mesaj nested object ise
-                    if isinstance(user_message, dict):
-                        user_message = user_message.get("message", "")
-                    
-                    # String'e çevir ve temizle
-                    user_message = str(user_message).strip()
-                    
-                    # YENİ: force_web_research parametresini kontrol et
-                    force_web_research = message_data.get("force_web_research", False)
-                    if force_web_research:
-                        dialog.conversation_state["force_web_research"] = True
-                    
-                    if user_message:
-                        response = await dialog.process_user_message(user_message)
-                        if response:
-                            await websocket.send_text(json.dumps({
-                                "type": "ai_response",
-                                "message": response,
-                                "timestamp": datetime.utcnow().isoformat(),
-                                "chat_id": chat_id
-                            }))
+                # Eğer mesaj nested object ise
+                if isinstance(user_message, dict):
+                    user_message = user_message.get("message", "")
                 
-                elif message_data.get("type") == "test_parameters_response":
-                    # SORUN DÜZELTİLDİ: Test parametreleri yanıtını doğru şekilde işle
-                    response_data = message_data.get("response", {})
-                    
-                    if not isinstance(response_data, dict):
-                        logger.warning(f"❌ Geçersiz test parametre formatı: {response_data}")
-                        continue
-
-                    # SORUN DÜZELTİLMESİ: Gelen veriyi doğrudan state'e ekle
-                    logger.info(f"📝 Test parametreleri alındı: {response_data}")
-                    
-                    # 1. Gelen yapısal veriyi doğrudan konuşma durumuna (state) ekle
-                    dialog.conversation_state["partial_test_params"].update(response_data)
-                    
-                    # 2. Test parametresi bekleme durumunu işaretle
-                    if not dialog.conversation_state.get("awaiting_test_params"):
-                        dialog.conversation_state["awaiting_test_params"] = True
-                        dialog.conversation_state["test_param_stage"] = "question_types"
-                    
-                    # 3. Durum makinesinin bir sonraki adımı tetiklemesi için genel bir mesaj oluştur
-                    user_message = "Kullanıcı test parametrelerini seçti."
-                    
-                    # 4. Grafiği normal akışında çalıştır
+                # String'e çevir ve temizle
+                user_message = str(user_message).strip()
+                
+                # YENİ: force_web_research parametresini kontrol et
+                force_web_research = message_data.get("force_web_research", False)
+                if force_web_research:
+                    dialog.conversation_state["force_web_research"] = True
+                if message_data.get("refresh_research", False):
+                    dialog.conversation_state["refresh_research"] = True
+                
+                if user_message:
                     response = await dialog.process_user_message(user_message)
-
-                    # Eğer LangGraph'tan direct bir yanıt gelirse, WebSocket üzerinden gönder
                     if response:
-                        await websocket.send_text(json.dumps({
+                        await outbox.send(json.dumps({
                             "type": "ai_response",
                             "message": response,
                             "timestamp": datetime.utcnow().isoformat(),
-                            "chat_id": chat_id
+                            "chat_id": chat_id,
+                            "stream_id": dialog.current_stream_id  # Akıtılan mesaj varsa istemci onu sonlandırır
                         }))
+            
+            elif message_data.get("type") == "test_parameters_response":
+                # SORUN DÜZELTİLDİ: Test parametreleri yanıtını doğru şekilde işle
+                response_data = message_data.get("response", {})
                 
-                elif message_data.get("type") == "start_test":
-                    # Test başlatma komutu
-                    test_data = message_data.get("test_data", {})
-                    
-                    # Test verilerini localStorage için gönder
-                    await websocket.send_text(json.dumps({
-                        "type": "test_data_ready",
-                        "test_data": test_data,
+                if not isinstance(response_data, dict):
+                    logger.warning(f"❌ Geçersiz test parametre formatı: {response_data}")
+                    return
+
+                # SORUN DÜZELTİLMESİ: Gelen veriyi doğrudan state'e ekle
+                logger.info(f"📝 Test parametreleri alındı: {response_data}")
+                
+                # 1. Gelen yapısal veriyi doğrudan konuşma durumuna (state) ekle
+                dialog.conversation_state["partial_test_params"].update(response_data)
+                
+                # 2. Test parametresi bekleme durumunu işaretle
+                if not dialog.conversation_state.get("awaiting_test_params"):
+                    dialog.conversation_state["awaiting_test_params"] = True
+                    dialog.conversation_state["test_param_stage"] = "question_types"
+                
+                # 3. Durum makinesinin bir sonraki adımı tetiklemesi için genel bir mesaj oluştur
+                user_message = "Kullanıcı test parametrelerini seçti."
+                
+                # 4. Grafiği normal akışında çalıştır
+                response = await dialog.process_user_message(user_message)
+
+                # Eğer LangGraph'tan direct bir yanıt gelirse, WebSocket üzerinden gönder
+                if response:
+                    await outbox.send(json.dumps({
+                        "type": "ai_response",
+                        "message": response,
                         "timestamp": datetime.utcnow().isoformat(),
-                        "chat_id": chat_id
+                        "chat_id": chat_id,
+                        "stream_id": dialog.current_stream_id  # Akıtılan mesaj varsa istemci onu sonlandırır
                     }))
+            
+            elif message_data.get("type") == "start_test":
+                # Test başlatma komutu
+                test_data = message_data.get("test_data", {})
+                
+                # Test verilerini localStorage için gönder
+                await outbox.send(json.dumps({
+                    "type": "test_data_ready",
+                    "test_data": test_data,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "chat_id": chat_id
+                }))
+            
+            elif message_data.get("type") == "test_completed":
+                # Test tamamlandı, sonuçları değerlendir
+                test_results = message_data.get("results", {})
                 
-                elif message_data.get("type") == "test_completed":
-                    # Test tamamlandı, sonuçları değerlendir
-                    test_results = message_data.get("results", {})
+                try:
+                    # Test sonuçlarını analiz et ve chat'e kaydet
+                    evaluation_result = await evaluate_test_results_internal(chat_id, test_results)
                     
-                    try:
-                        # Test sonuçlarını analiz et ve chat'e kaydet
-                        evaluation_result = await evaluate_test_results_internal(chat_id, test_results)
-                        
-                        # YENİ: Eksik konuları WebSocket üzerinden direkt gönder
-                        if evaluation_result.get("weak_areas"):
-                            # Ana değerlendirme mesajını gönder
-                            await websocket.send_text(json.dumps({
-                                "type": "ai_response", 
-                                "message": format_evaluation_message(evaluation_result),
-                                "timestamp": datetime.utcnow().isoformat(),
-                                "chat_id": chat_id
-                            }))
-                            
-                            # Eksik konuları ayrı mesaj olarak gönder
-                            topics_message = "🎯 **Eksik Olduğun Konular:**\n\n"
-                            topics_message += "Bu konularda biraz daha çalışmanda fayda var:\n\n"
-                            
-                            for i, area in enumerate(evaluation_result["weak_areas"], 1):
-                                topic_name = area["topic"] if isinstance(area, dict) else area
-                                topics_message += f"{i}. **{topic_name}**\n"
-                                topics_message += f"   💡 Bu konuyu detaylı açıklamamı istersen: *\"{topic_name} konusunu açıkla\"*\n\n"
-                            
-                            topics_message += "📝 **Not:** Yukarıdaki konulardan herhangi birini seçerek benden detaylı açıklama isteyebilirsin! Birlikte öğrenelim! 🤝"
-                            
-                            await websocket.send_text(json.dumps({
-                                "type": "ai_response",
-                                "message": topics_message,
-                                "timestamp": datetime.utcnow().isoformat(),
-                                "chat_id": chat_id
-                            }))
-                        else:
-                            # Eksik konu yoksa sadece ana değerlendirme mesajını gönder
-                            await websocket.send_text(json.dumps({
-                                "type": "ai_response",
-                                "message": format_evaluation_message(evaluation_result) + "\n\n🎉 **Harika!** Tüm konularda başarılısın! Böyle devam et! 👏",
-                                "timestamp": datetime.utcnow().isoformat(),
-                                "chat_id": chat_id
-                            }))
-                        
-                        # Ayrıca eski formatı da gönder (geriye dönük uyumluluk için)
-                        await websocket.send_text(json.dumps({
-                            "type": "test_evaluation_complete",
-                            "evaluation": evaluation_result,
+                    # YENİ: Eksik konuları WebSocket üzerinden direkt gönder
+                    if evaluation_result.get("weak_areas"):
+                        # Ana değerlendirme mesajını gönder
+                        await outbox.send(json.dumps({
+                            "type": "ai_response", 
+                            "message": format_evaluation_message(evaluation_result),
                             "timestamp": datetime.utcnow().isoformat(),
                             "chat_id": chat_id
                         }))
                         
-                    except Exception as e:
-                        logger.error(f"❌ Test değerlendirme hatası: {e}")
-                        await websocket.send_text(json.dumps({
-                            "type": "error",
-                            "message": f"Test değerlendirme hatası: {str(e)}"
-                        }))
-                
-                elif message_data.get("type") == "llm_evaluation_request":
-                    prompt = message_data.get("prompt", "")
-                    question_index = message_data.get("questionIndex", 0)
-                    metadata = message_data.get("metadata", {})
-                    
-                    logger.info(f"🤖 LLM değerlendirme isteği alındı (Soru: {question_index})")
-                    
-                    try:
-                        # LLM çağrısına 30 saniyelik zaman aşımı ekle
-                        evaluation_result = await asyncio.wait_for(
-                            evaluate_classic_answer_with_llm(prompt, dialog.llm),
-                            timeout=30.0
-                        )
+                        # Eksik konuları ayrı mesaj olarak gönder
+                        topics_message = "🎯 **Eksik Olduğun Konular:**\n\n"
+                        topics_message += "Bu konularda biraz daha çalışmanda fayda var:\n\n"
                         
-                        await websocket.send_text(json.dumps({
-                            "type": "llm_evaluation_response",
-                            "questionIndex": question_index,
-                            "evaluation": evaluation_result,
-                            "metadata": metadata,
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "chat_id": chat_id
-                        }))
-                        logger.info(f"✅ LLM değerlendirmesi tamamlandı (Soru: {question_index})")
-
-                    except asyncio.TimeoutError:
-                        logger.error(f"⏰ LLM değerlendirmesi zaman aşımına uğradı (Soru: {question_index})")
-                        # Zaman aşımı durumunda kullanıcıya özel bir mesaj gönder
-                        await websocket.send_text(json.dumps({
-                            "type": "llm_evaluation_response",
-                            "questionIndex": question_index,
-                            "evaluation": "DOĞRU/YANLIŞ: Doğru\nPUAN: 70\nGERİ BİLDİRİM: Değerlendirme zaman aşımına uğradı, bu nedenle cevabınız geçici olarak doğru kabul edildi.",
-                            "metadata": metadata,
+                        for i, area in enumerate(evaluation_result["weak_areas"], 1):
+                            topic_name = area["topic"] if isinstance(area, dict) else area
+                            topics_message += f"{i}. **{topic_name}**\n"
+                            topics_message += f"   💡 Bu konuyu detaylı açıklamamı istersen: *\"{topic_name} konusunu açıkla\"*\n\n"
+                        
+                        topics_message += "📝 **Not:** Yukarıdaki konulardan herhangi birini seçerek benden detaylı açıklama isteyebilirsin! Birlikte öğrenelim! 🤝"
+                        
+                        await outbox.send(json.dumps({
+                            "type": "ai_response",
+                            "message": topics_message,
                             "timestamp": datetime.utcnow().isoformat(),
                             "chat_id": chat_id
                         }))
-                    except Exception as e:
-                        # Diğer tüm hataları yakala ve logla
-                        logger.error(f"❌ LLM değerlendirme hatası (Soru: {question_index}): {e}", exc_info=True)
-                        # Genel hata durumunda kullanıcıya mesaj gönder
-                        await websocket.send_text(json.dumps({
-                            "type": "llm_evaluation_response",
-                            "questionIndex": question_index,
-                            "evaluation": "DOĞRU/YANLIŞ: Doğru\nPUAN: 70\nGERİ BİLDİRİM: Değerlendirme sırasında bir hata oluştu, bu nedenle cevabınız geçici olarak doğru kabul edildi.",
-                            "metadata": metadata,
+                    else:
+                        # Eksik konu yoksa sadece ana değerlendirme mesajını gönder
+                        await outbox.send(json.dumps({
+                            "type": "ai_response",
+                            "message": format_evaluation_message(evaluation_result) + "\n\n🎉 **Harika!** Tüm konularda başarılısın! Böyle devam et! 👏",
                             "timestamp": datetime.utcnow().isoformat(),
                             "chat_id": chat_id
                         }))
-                
-                elif message_data.get("type") == "explain_topic":
-                    # Eksik konu açıklaması istendi
-                    topic = message_data.get("topic", "")
                     
-                    # Bu konuyu açıklama talebini normal mesaj olarak işle
-                    explain_message = f"'{topic}' konusunu detaylı olarak açıklayabilir misin?"
-                    response = await dialog.process_user_message(explain_message)
+                    # Ayrıca eski formatı da gönder (geriye dönük uyumluluk için)
+                    await outbox.send(json.dumps({
+                        "type": "test_evaluation_complete",
+                        "evaluation": evaluation_result,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "chat_id": chat_id
+                    }))
                     
-                    if response:
-                        await websocket.send_text(json.dumps({
-                            "type": "topic_explanation",
-                            "topic": topic,
-                            "explanation": response,
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "chat_id": chat_id
-                        }))
+                except Exception as e:
+                    logger.error(f"❌ Test değerlendirme hatası: {e}")
+                    await outbox.send(json.dumps({
+                        "type": "error",
+                        "message": f"Test değerlendirme hatası: {str(e)}"
+                    }))
+            
+            elif message_data.get("type") == "llm_evaluation_request":
+                prompt = message_data.get("prompt", "")
+                question_index = message_data.get("questionIndex", 0)
+                metadata = message_data.get("metadata", {})
+                
+                logger.info(f"🤖 LLM değerlendirme isteği alındı (Soru: {question_index})")
+                
+                try:
+                    # LLM çağrısına 30 saniyelik zaman aşımı ekle
+                    evaluation_result = await asyncio.wait_for(
+                        evaluate_classic_answer_with_llm(prompt, dialog.llm),
+                        timeout=Config.EVALUATION_TIMEOUT
+                    )
+                    
+                    await outbox.send(json.dumps({
+                        "type": "llm_evaluation_response",
+                        "questionIndex": question_index,
+                        "evaluation": evaluation_result,
+                        "metadata": metadata,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "chat_id": chat_id
+                    }))
+                    logger.info(f"✅ LLM değerlendirmesi tamamlandı (Soru: {question_index})")
+
+                except asyncio.TimeoutError:
+                    logger.error(f"⏰ LLM değerlendirmesi zaman aşımına uğradı (Soru: {question_index})")
+                    # Zaman aşımı durumunda kullanıcıya özel bir mesaj gönder
+                    await outbox.send(json.dumps({
+                        "type": "llm_evaluation_response",
+                        "questionIndex": question_index,
+                        "evaluation": FALLBACK_TIMEOUT,
+                        "metadata": metadata,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "chat_id": chat_id
+                    }))
+                except Exception as e:
+                    # Diğer tüm hataları yakala ve logla
+                    logger.error(f"❌ LLM değerlendirme hatası (Soru: {question_index}): {e}", exc_info=True)
+                    # Genel hata durumunda kullanıcıya mesaj gönder
+                    await outbox.send(json.dumps({
+                        "type": "llm_evaluation_response",
+                        "questionIndex": question_index,
+                        "evaluation": FALLBACK_ERROR,
+                        "metadata": metadata,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "chat_id": chat_id
+                    }))
+            
+            elif message_data.get("type") == "llm_evaluation_batch_request":
+                # Testteki klasik cevaplar tek istekte gelir; sonuçlar hazır oldukça soru soru gönderilir
+                items = [item for item in message_data.get("items", []) if isinstance(item, dict)]
+                logger.info(f"🤖 Toplu LLM değerlendirme isteği alındı ({len(items)} cevap)")
+
+                async def send_result(item: dict, evaluation: str, cached: bool):
+                    await outbox.send(json.dumps({
+                        "type": "llm_evaluation_response",
+                        "questionIndex": item.get("questionIndex", 0),
+                        "evaluation": evaluation,
+                        "metadata": item.get("metadata", {}),
+                        "cached": cached,
+                        "batch_id": message_data.get("batch_id"),
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "chat_id": chat_id
+                    }))
+
+                await classic_evaluator.evaluate_batch(items, dialog.llm, send_result)
+                logger.info(f"✅ Toplu LLM değerlendirmesi tamamlandı ({len(items)} cevap)")
+            
+            elif message_data.get("type") == "explain_topic":
+                # Eksik konu açıklaması istendi
+                topic = message_data.get("topic", "")
+                
+                # Bu konuyu açıklama talebini normal mesaj olarak işle
+                explain_message = f"'{topic}' konusunu detaylı olarak açıklayabilir misin?"
+                response = await dialog.process_user_message(explain_message, stream=False)
+                
+                if response:
+                    await outbox.send(json.dumps({
+                        "type": "topic_explanation",
+                        "topic": topic,
+                        "explanation": response,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "chat_id": chat_id
+                    }))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ WebSocket mesaj işleme hatası: {e}")
+            await websocket_callback(json.dumps({
+                "type": "error",
+                "message": f"Mesaj işlenirken hata oluştu: {str(e)}"
+            }))
+
+    async def run_graph_message(message_data: dict):
+        """Graph çalıştıran mesajlar aynı sohbet için sırayla işlenir"""
+        async with dialog.run_lock:
+            dialog.reset_cancellation()
+            await handle_message(message_data)
+
+    # Bağlantıya ait, devam eden mesaj task'ları
+    pending_tasks = set()
+    graph_tasks = set()
+
+    def track(task: asyncio.Task, *groups):
+        for group in (pending_tasks, *groups):
+            group.add(task)
+            task.add_done_callback(group.discard)
+
+    async def cancel_in_flight(reason: str) -> int:
+        """Devam eden graph çalıştırmalarını ve CrewAI işlerini iptal eder"""
+        cancelled = [task for task in graph_tasks if not task.done()]
+        if cancelled:
+            dialog.cancel_running_work()
+            for task in cancelled:
+                task.cancel()
+            await asyncio.gather(*cancelled, return_exceptions=True)
+            logger.info(f"🛑 {len(cancelled)} işlem iptal edildi ({reason}) - Chat: {chat_id}")
+        return len(cancelled)
+
+    try:
+        while True:
+            try:
+                data = await websocket.receive_text()
+                message_data = json.loads(data)
+                message_type = message_data.get("type")
                 
-                elif message_data.get("type") == "ping":
-                    await websocket.send_text(json.dumps({
+                if message_type == "ping":
+                    # Ping uzun süren işlemlerin arkasında beklemez
+                    await outbox.send(json.dumps({
                         "type": "pong",
                         "timestamp": datetime.utcnow().isoformat()
                     }))
+                
+                elif message_type == "cancel":
+                    cancelled_count = await cancel_in_flight("kullanıcı isteği")
+                    await outbox.send(json.dumps({
+                        "type": "cancelled",
+                        "cancelled_count": cancelled_count,
+                        "message": "İşlem iptal edildi" if cancelled_count else "İptal edilecek işlem yok",
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "chat_id": chat_id
+                    }))
+                
+                elif message_type in GRAPH_MESSAGE_TYPES:
+                    track(asyncio.create_task(run_graph_message(message_data)), graph_tasks)
+                
+                else:
+                    track(asyncio.create_task(handle_message(message_data)))
             
             except WebSocketDisconnect:
                 logger.info(f"🔌 WebSocket bağlantısı kesildi - Chat: {chat_id}")
                 break
             except json.JSONDecodeError:
                 logger.error("❌ Geçersiz JSON formatı")
-                await websocket.send_text(json.dumps({
+                await outbox.send(json.dumps({
                     "type": "error",
                     "message": "Geçersiz mesaj formatı"
                 }))
             except Exception as e:
                 logger.error(f"❌ WebSocket mesaj işleme hatası: {e}")
-                await websocket.send_text(json.dumps({
+                await outbox.send(json.dumps({
                     "type": "error",
                     "message": f"Mesaj işlenirken hata oluştu: {str(e)}"
                 }))
@@ -1095,9 +1350,16 @@ async def websocket_endpoint(websocket: WebSocket, chat_id: str):
     except Exception as e:
         logger.error(f"❌ WebSocket genel hatası: {e}")
     finally:
-        # Cleanup
-        if chat_id in dialog_instances:
-            dialog_instances[chat_id].websocket_callback = None
+        # Bağlantı kapandı - bu bağlantının başlattığı işler boşa çalışmasın
+        await cancel_in_flight("bağlantı kapandı")
+        for task in list(pending_tasks):
+            task.cancel()
+        
+        # Cleanup - diyalog önbellekte kalır, boşta kalırsa diske yazılır
+        if dialog.websocket_callback is websocket_callback:
+            dialog.set_websocket_callback(None)
+        dialog_instances.release(chat_id)
+        await outbox.close()
 
 @app.post("/chats/{chat_id}/save-test")
 async def save_test_to_chat(chat_id: str, test_data: dict):
@@ -0,0 +1,94 @@
+# src/api/uploads.py
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Uzantı -> kabul edilen dosya imzaları (ilk baytlar). TXT'nin imzası yok, ikili içerik ayrıca reddedilir.
+MAGIC_BYTES = {
+    ".pdf": (b"%PDF-",),
+    ".docx": (b"PK\x03\x04",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".gif": (b"GIF87a", b"GIF89a"),
+    ".bmp": (b"BM",),
+    ".tiff": (b"II*\x00", b"MM\x00*"),
+    ".webp": (b"RIFF",),
+}
+
+
+def matches_signature(extension: str, head: bytes) -> bool:
+    """Dosyanın ilk baytları uzantısıyla uyumlu mu (uzantısı değiştirilmiş dosyalar parser'a ulaşmasın)"""
+    if extension == ".txt":
+        return b"\x00" not in head[:4096] or head.startswith((b"\xff\xfe", b"\xfe\xff"))
+    signatures = MAGIC_BYTES.get(extension)
+    if signatures is None:
+        return False
+    if not head.startswith(signatures):
+        return False
+    if extension == ".webp":
+        return head[8:12] == b"WEBP"
+    return True
+
+
+async def store_upload(file: UploadFile, target_dir: Path, max_bytes: int,
+                       safe_filename: Optional[str] = None) -> Dict[str, Any]:
+    """Yüklemeyi parça parça geçici dosyaya yazar, yolda sha256 hesaplar ve atomik olarak yerine taşır.
+
+    Boyut sınırı aşılır aşılmaz ya da ilk baytlar uzantıyla uyuşmazsa okuma kesilir (413/400).
+    Disk yazımı thread'de yapıldığı için büyük yüklemeler event loop'u bekletmez.
+    Dönen sözlük: path, safe_filename, size, sha256.
+    """
+    filename = Path(file.filename or "").name
+    extension = os.path.splitext(filename)[1].lower()
+    limit_mb = max_bytes // 1024 // 1024
+
+    # İstemcinin bildirdiği boyut varsa hiç okumadan reddet (yine de akış sırasında sayılır)
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Dosya boyutu {limit_mb}MB'tan büyük olamaz")
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    safe_filename = safe_filename or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
+    final_path = target_dir / safe_filename
+    temp_path = target_dir / f".{safe_filename}.{uuid.uuid4().hex[:8]}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    checked = False
+    try:
+        with open(temp_path, "wb") as out:
+            while True:
+                chunk = await file.read(Config.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if not checked:
+                    if not matches_signature(extension, chunk):
+                        raise HTTPException(status_code=400, detail=f"Dosya içeriği '{extension}' türüyle uyuşmuyor")
+                    checked = True
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Dosya boyutu {limit_mb}MB'tan büyük olamaz")
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Dosya boş")
+        os.replace(temp_path, final_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"📥 Yükleme kaydedildi: {safe_filename} ({size / 1024:.1f}KB)")
+    return {"path": final_path, "safe_filename": safe_filename, "size": size, "sha256": digest.hexdigest()}
@@ -0,0 +1,301 @@
+# src/core/benchmarks.py
+"""Performans ölçümleri.
+
+Kullanım (src dizininden):
+    python -m core.benchmarks dialog --iterations 20
+    python -m core.benchmarks intent --iterations 200
+    OCR_QUANTIZE=false python -m core.benchmarks ocr --iterations 16
+    OCR_SEGMENT_LINES=true python -m core.benchmarks ocr_pages --iterations 5
+    python -m core.benchmarks ocr_routing --iterations 5
+"""
+
+import argparse
+import shutil
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .config import Config
+
+
+def _summarize(name: str, samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95_index = max(0, int(round(len(ordered) * 0.95)) - 1)
+    result = {
+        "name": name,
+        "iterations": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": ordered[p95_index] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+    print(
+        f"📊 {name}: n={result['iterations']} ortalama={result['mean_ms']:.1f}ms "
+        f"medyan={result['median_ms']:.1f}ms p95={result['p95_ms']:.1f}ms max={result['max_ms']:.1f}ms"
+    )
+    return result
+
+
+def bench_dialog_creation(iterations: int = 20) -> Dict[str, float]:
+    """AsyncLangGraphDialog oluşturma gecikmesini ölçer (ilk oluşturma ayrı raporlanır)"""
+    from .conversation import AsyncLangGraphDialog
+
+    chat_ids = [f"bench_dialog_{i}" for i in range(iterations + 1)]
+    samples = []
+    try:
+        start = time.perf_counter()
+        AsyncLangGraphDialog(chat_id=chat_ids[0])
+        print(f"🧊 İlk diyalog oluşturma: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        for chat_id in chat_ids[1:]:
+            start = time.perf_counter()
+            AsyncLangGraphDialog(chat_id=chat_id)
+            samples.append(time.perf_counter() - start)
+    finally:
+        for chat_id in chat_ids:
+            shutil.rmtree(Path(Config.VECTOR_STORE_PATH) / chat_id, ignore_errors=True)
+
+    return _summarize("dialog_creation", samples)
+
+
+# (mesaj, doküman var mı, araştırma tamamlandı mı, beklenen niyet) - yönlendirici örneklerinden ayrı tutulur
+INTENT_EVAL_SET = [
+    ("selam, bugün nasılsın?", False, False, "gemini"),
+    ("bana kısa bir hikaye yazar mısın", False, False, "gemini"),
+    ("javascript'te promise nedir", False, False, "gemini"),
+    ("sağ ol, çok yardımcı oldun", False, False, "gemini"),
+    ("bir haftalık çalışma planı çıkar", True, False, "gemini"),
+    ("yüklediğim dosyanın özetini çıkar", True, False, "rag_search"),
+    ("dokümanda hangi bölümler var", True, False, "rag_search"),
+    ("pdf'te enerji verimliliği hakkında ne yazıyor", True, False, "rag_search"),
+    ("belgeye göre sonuç ne", True, False, "rag_search"),
+    ("bu pdf neyi anlatıyor", False, False, "no_pdf_available"),
+    ("yenilenebilir enerji hakkında araştırma yap", False, False, "web_research"),
+    ("internetten blockchain'in son durumunu araştır", False, False, "web_research"),
+    ("mars görevlerini detaylı incele", False, False, "web_research"),
+    ("bu konuda bana 5 soruluk test hazırla", True, False, "generate_test"),
+    ("quiz oluştur", True, False, "generate_test"),
+    ("beni sınamak için sorular üret", True, False, "generate_test"),
+    ("araştırmadaki üçüncü başlığı açıklar mısın", False, True, "research_question"),
+    ("rapordaki önemli bulgular neler", False, True, "research_question"),
+]
+
+
+def bench_intent_routing(iterations: int = 20) -> Dict[str, float]:
+    """Niyet yönlendiricisinin doğruluğunu anahtar kelime kurallarıyla karşılaştırır ve gecikmesini ölçer"""
+    from .intent_router import IntentRouter, keyword_intent
+
+    router = IntentRouter()
+    start = time.perf_counter()
+    router.build()
+    print(f"🧊 Niyet merkezleri hazırlama: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    keyword_correct = router_correct = hybrid_correct = confident = 0
+    for message, has_documents, research_completed, expected in INTENT_EVAL_SET:
+        keyword = keyword_intent(message, has_documents=has_documents, research_completed=research_completed)["intent"]
+        routed = router.route(message, has_documents=has_documents, research_completed=research_completed)
+        raw = router.classify(router.embed(message), [i for i in router._intents if i != "research_question" or research_completed])
+        raw_intent = "no_pdf_available" if raw["intent"] == "rag_search" and not has_documents else raw["intent"]
+        hybrid = routed["intent"] if routed else keyword
+
+        keyword_correct += keyword == expected
+        router_correct += raw_intent == expected
+        hybrid_correct += hybrid == expected
+        confident += routed is not None
+        marker = "✅" if hybrid == expected else "❌"
+        print(f"{marker} {message[:45]:45} beklenen={expected:18} kelime={keyword:18} "
+              f"router={raw_intent}({raw['confidence']:.2f}) {'emin' if routed else 'fallback'}")
+
+    total = len(INTENT_EVAL_SET)
+    print(f"🎯 Doğruluk - anahtar kelime: {keyword_correct}/{total}, yalnız router: {router_correct}/{total}, "
+          f"router+fallback: {hybrid_correct}/{total} (router emin: {confident}/{total})")
+
+    messages = [item[0] for item in INTENT_EVAL_SET]
+    embed_samples, classify_samples = [], []
+    for i in range(iterations):
+        message = f"{messages[i % total]} {i}"  # Önbelleğe düşmesin
+        start = time.perf_counter()
+        vector = router.embed(message)
+        embed_samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        router.classify(vector)
+        classify_samples.append(time.perf_counter() - start)
+    _summarize("intent_embed", embed_samples)
+    result = _summarize("intent_classify", classify_samples)
+    result.update({
+        "keyword_accuracy": keyword_correct / total,
+        "router_accuracy": router_correct / total,
+        "hybrid_accuracy": hybrid_correct / total,
+    })
+    return result
+
+
+def _synthetic_line_images(count: int):
+    """OCR ölçümü için tek satırlık sentetik metin görüntüleri"""
+    from PIL import Image, ImageDraw
+
+    words = ["enerji", "verim", "öğrenci", "sınav", "fotosentez", "hücre", "denklem", "tarih"]
+    images = []
+    for i in range(count):
+        image = Image.new("RGB", (384, 64), "white")
+        ImageDraw.Draw(image).text((8, 20), " ".join(words[(i + j) % len(words)] for j in range(4)), fill="black")
+        images.append(image)
+    return images
+
+
+def bench_ocr(iterations: int = 20) -> Dict[str, float]:
+    """Paylaşılan OCR servisinde tek tek ve eşzamanlı (batch) görüntü başı gecikme ile görüntü/saniye ölçer"""
+    from . import resource_pool
+    from .ocr_service import ocr_service
+
+    start = time.perf_counter()
+    resource_pool.get_ocr_model("handwritten")
+    print(f"🧊 OCR modeli yükleme (quantize={Config.OCR_QUANTIZE}, torch thread={resource_pool.configure_torch_threads()}): "
+          f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+    images = _synthetic_line_images(iterations)
+    ocr_service.recognize(images[0])  # Isınma
+
+    sequential = []
+    start_all = time.perf_counter()
+    for image in images:
+        start = time.perf_counter()
+        ocr_service.recognize(image)
+        sequential.append(time.perf_counter() - start)
+    sequential_rate = len(images) / (time.perf_counter() - start_all)
+
+    start_all = time.perf_counter()
+    futures = [(time.perf_counter(), ocr_service.submit(image)) for image in images]
+    concurrent = []
+    for submitted_at, future in futures:
+        future.result()
+        concurrent.append(time.perf_counter() - submitted_at)
+    concurrent_rate = len(images) / (time.perf_counter() - start_all)
+
+    _summarize("ocr_sequential", sequential)
+    result = _summarize("ocr_concurrent", concurrent)
+    stats = ocr_service.get_stats()["models"]["handwritten"]
+    print(f"🖼️ Görüntü/saniye - tek tek: {sequential_rate:.2f}, eşzamanlı: {concurrent_rate:.2f} "
+          f"(ortalama batch: {stats['avg_batch_size']})")
+    result.update({"sequential_images_per_sec": sequential_rate, "concurrent_images_per_sec": concurrent_rate})
+    return result
+
+
+def _synthetic_pages(directory: Path, count: int, lines_per_page: int = 12):
+    """Çok satırlı sentetik sayfa görüntüleri yazar; (yol, gerçek metin) listesi döner"""
+    from PIL import Image, ImageDraw
+
+    words = ["enerji", "verim", "öğrenci", "sınav", "fotosentez", "hücre", "denklem", "tarih", "deney", "sonuç"]
+    pages = []
+    for page in range(count):
+        image = Image.new("RGB", (1000, 60 + lines_per_page * 48), "white")
+        draw = ImageDraw.Draw(image)
+        lines = []
+        for line in range(lines_per_page):
+            text = " ".join(words[(page + line + j) % len(words)] for j in range(6))
+            draw.text((40, 30 + line * 48), text, fill="black")
+            lines.append(text)
+        path = directory / f"page_{page}.png"
+        image.save(path)
+        pages.append((str(path), "\n".join(lines)))
+    return pages
+
+
+def bench_ocr_routing(iterations: int = 5) -> Dict[str, float]:
+    """Her satırı iki modelle okumak ile basılı/el yazısı sınıflandırıcısına göre tek modelle okumayı karşılaştırır"""
+    import tempfile
+    import numpy as np
+    from .ocr_processor import HandwritingOCR, classify_script
+
+    ocr = HandwritingOCR()
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = _synthetic_pages(Path(tmp), iterations)
+        page_lines = [ocr.preprocess_lines(path) for path, _ in pages]
+    ocr.recognize_mixed(page_lines[0])  # Isınma (iki model de yüklensin)
+
+    both, routed, classify = [], [], []
+    routed_calls = fallbacks = printed_lines = total_lines = 0
+    for lines in page_lines:
+        start = time.perf_counter()
+        ocr.recognize_lines(lines, "handwritten")
+        ocr.recognize_lines(lines, "printed")
+        both.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for line in lines:
+            classify_script(np.array(line.convert("L")))
+        classify.append((time.perf_counter() - start) / max(1, len(lines)))
+
+        start = time.perf_counter()
+        result = ocr.recognize_mixed(lines)
+        routed.append(time.perf_counter() - start)
+        models = result.get("models", {})
+        routed_calls += len(lines) + models.get("fallbacks", 0)
+        fallbacks += models.get("fallbacks", 0)
+        printed_lines += models.get("printed", 0)
+        total_lines += len(lines)
+
+    _summarize("ocr_both_models", both)
+    _summarize("ocr_classify_per_line", classify)
+    result = _summarize("ocr_routed", routed)
+    print(f"🔀 Model çağrısı - iki model: {2 * total_lines}, yönlendirmeli: {routed_calls} "
+          f"(basılı seçilen: {printed_lines}/{total_lines}, yedek modele düşen: {fallbacks})")
+    result.update({"both_model_calls": 2 * total_lines, "routed_calls": routed_calls, "fallbacks": fallbacks})
+    return result
+
+
+def bench_ocr_pages(iterations: int = 5) -> Dict[str, float]:
+    """Tüm sayfayı tek görüntü olarak okumak ile satır bölütlemeyi sayfa süresi ve karakter sayısıyla karşılaştırır"""
+    import tempfile
+    from .ocr_processor import HandwritingOCR
+
+    ocr = HandwritingOCR()
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = _synthetic_pages(Path(tmp), iterations)
+        ocr.service.recognize(ocr.preprocess_image(pages[0][0]))  # Isınma
+
+        whole, segmented = [], []
+        whole_chars = segmented_chars = expected_chars = line_count = 0
+        for path, expected in pages:
+            expected_chars += len(expected.replace("\n", ""))
+
+            start = time.perf_counter()
+            whole_chars += len(ocr.service.recognize(ocr.preprocess_image(path)))
+            whole.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            lines = ocr.preprocess_lines(path)
+            text = ocr.recognize_lines(lines, "handwritten")["text"]
+            segmented.append(time.perf_counter() - start)
+            segmented_chars += len(text.replace("\n", ""))
+            line_count += len(lines)
+
+    _summarize("ocr_page_whole", whole)
+    result = _summarize("ocr_page_segmented", segmented)
+    print(f"🔤 Karakter - beklenen: {expected_chars}, tüm sayfa: {whole_chars}, satır bölütleme: {segmented_chars} "
+          f"(bulunan satır: {line_count}, sayfa başı {line_count / len(pages):.1f})")
+    print(f"📄 Sayfa/saniye - tüm sayfa: {len(whole) / sum(whole):.2f}, satır bölütleme: {len(segmented) / sum(segmented):.2f}")
+    result.update({"expected_chars": expected_chars, "whole_page_chars": whole_chars, "segmented_chars": segmented_chars})
+    return result
+
+
+BENCHMARKS: Dict[str, Callable[..., Dict[str, float]]] = {
+    "dialog": bench_dialog_creation,
+    "intent": bench_intent_routing,
+    "ocr": bench_ocr,
+    "ocr_pages": bench_ocr_pages,
+    "ocr_routing": bench_ocr_routing,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Performans ölçümleri")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS.keys()))
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.benchmark](iterations=args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# src/core/bulk_import.py
+"""Çoklu dosya içe aktarma - ders paketi gibi onlarca dökümanı tek hatta işler.
+
+import-docs sunucu kapalıyken çalıştırılmalıdır: Chroma aynı PersistentClient dizininin birden
+fazla süreçten açılmasını desteklemez. Sunucu açıkken /chats/{chat_id}/upload-batch kullanılır.
+
+Kullanım (proje kök dizininden):
+    python run.py import-docs <chat_id> <klasör> [--recursive]
+"""
+
+import argparse
+import logging
+import shutil
+import time
+from concurrent.futures import as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import Config
+from .document_processor import IMAGE_EXTENSIONS
+from .ingestion import ocr_pool
+from . import resource_pool
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.txt'] + IMAGE_EXTENSIONS
+
+# (dosya yolu, görünen ad, metadata)
+ImportItem = Tuple[str, str, Dict[str, Any]]
+
+
+def max_size_for(filename: str) -> int:
+    """Tekil yükleme uç noktalarıyla aynı boyut sınırları"""
+    is_image = any(filename.lower().endswith(ext) for ext in IMAGE_EXTENSIONS)
+    return Config.MAX_IMAGE_SIZE if is_image else Config.MAX_PDF_SIZE
+
+
+def upload_metadata(file_path: Path, filename: str, size: int, chat_id: str,
+                    content_sha256: Optional[str] = None) -> Dict[str, Any]:
+    metadata = {
+        "upload_path": str(file_path),
+        "original_size": size,
+        "safe_filename": file_path.name,
+        "chat_id": chat_id,
+    }
+    if content_sha256:
+        metadata["content_sha256"] = content_sha256
+    if any(filename.lower().endswith(ext) for ext in IMAGE_EXTENSIONS):
+        metadata["source_type"] = "ocr"
+    return metadata
+
+
+class BulkImporter:
+    """Dosyaları tek VectorStore (tek Chroma istemcisi, paylaşılan embedding modeli) üzerinden içe aktarır.
+
+    Metin çıkarma 'ingestion' havuzunda paralel yürür (taranmış sayfalar ayrıca OCR süreç
+    havuzuna gider); hazır parçalar biriktirilip BULK_IMPORT_BATCH_CHUNKS'lık upsert'lerle yazılır.
+    """
+
+    def __init__(self, vector_store, batch_chunks: int = None):
+        self.vector_store = vector_store
+        self.batch_chunks = batch_chunks or Config.BULK_IMPORT_BATCH_CHUNKS
+
+    def run(self, items: List[ImportItem],
+            progress_for: Optional[Callable[[str], Optional[Callable]]] = None,
+            remove_unused: bool = False) -> Dict[str, Any]:
+        """Tüm dosyaları işler ve özet döner: eklenen/yinelenen/başarısız dosyalar ve verim.
+
+        progress_for dosya yolunu alır (aynı adlı iki dosya ayrı ilerleme akışı alsın).
+        remove_unused: başarısız ve yinelenen dosyaların sohbet klasörüne yazılmış kopyaları silinir.
+        """
+        start = time.perf_counter()
+        summary = {"files": len(items), "added": [], "duplicates": [], "failed": [], "chunks": 0}
+        pending: List[Dict[str, Any]] = []
+        pending_paths: List[str] = []
+        seen_hashes = set()
+
+        executor = resource_pool.get_executor("ingestion")
+        futures = {
+            executor.submit(self.vector_store.prepare_document, path, filename, metadata,
+                            progress=progress_for(path) if progress_for else None): (path, filename)
+            for path, filename, metadata in items
+        }
+
+        for future in as_completed(futures):
+            path, filename = futures[future]
+            try:
+                doc = future.result()
+            except Exception as e:
+                doc = {"status": "failed", "filename": filename, "error": str(e)}
+
+            # Aynı içerik bu partide ikinci kez geldiyse (farklı dosya adıyla) yinelenen sayılır
+            if doc["status"] == "ready" and doc["file_hash"] in seen_hashes:
+                doc["status"] = "duplicate"
+
+            if doc["status"] == "duplicate":
+                summary["duplicates"].append(filename)
+                if remove_unused:
+                    self.vector_store.discard_unreferenced(path)
+            elif doc["status"] == "failed":
+                summary["failed"].append({"filename": filename, "error": doc.get("error", "")})
+                if remove_unused:
+                    Path(path).unlink(missing_ok=True)
+            else:
+                seen_hashes.add(doc["file_hash"])
+                pending.append(doc)
+                pending_paths.append(path)
+                if sum(len(d["ids"]) for d in pending) >= self.batch_chunks:
+                    self._flush(pending, pending_paths, summary, remove_unused)
+                    pending, pending_paths = [], []
+
+        self._flush(pending, pending_paths, summary, remove_unused)
+
+        elapsed = time.perf_counter() - start
+        summary.update({
+            "elapsed_s": round(elapsed, 2),
+            "files_per_s": round(len(items) / elapsed, 2) if elapsed > 0 else None,
+            "chunks_per_s": round(summary["chunks"] / elapsed, 1) if elapsed > 0 else None,
+        })
+        logger.info(
+            f"📦 Toplu içe aktarma: {len(summary['added'])} eklendi, {len(summary['duplicates'])} yinelenen, "
+            f"{len(summary['failed'])} başarısız, {summary['chunks']} parça, {elapsed:.1f}s - Chat: {self.vector_store.chat_id}"
+        )
+        return summary
+
+    def _flush(self, pending: List[Dict[str, Any]], paths: List[str], summary: Dict[str, Any], remove_unused: bool):
+        if not pending:
+            return
+        if self.vector_store.add_prepared(pending):
+            summary["added"].extend(doc["filename"] for doc in pending)
+            summary["chunks"] += sum(len(doc["ids"]) for doc in pending)
+            return
+        for doc, path in zip(pending, paths):
+            summary["failed"].append({"filename": doc["filename"], "error": "Vektör deposuna yazılamadı"})
+            if remove_unused:
+                Path(path).unlink(missing_ok=True)
+
+
+def import_directory(chat_id: str, directory: str, recursive: bool = False) -> Dict[str, Any]:
+    """Klasördeki desteklenen dosyaları sohbetin PDF klasörüne kopyalar ve içe aktarır"""
+    from .chat_manager import ChatManager
+    from .vector_store import VectorStore
+
+    chat_manager = ChatManager()
+    if not chat_manager.get_chat_info(chat_id):
+        raise ValueError(f"Sohbet bulunamadı: {chat_id}")
+
+    source_dir = Path(directory)
+    if not source_dir.is_dir():
+        raise ValueError(f"Klasör bulunamadı: {directory}")
+
+    chat_upload_dir = chat_manager.get_chat_pdf_directory(chat_id)
+    chat_upload_dir.mkdir(parents=True, exist_ok=True)
+    prefix = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    items: List[ImportItem] = []
+    skipped: List[Dict[str, str]] = []
+    candidates = source_dir.rglob("*") if recursive else source_dir.iterdir()
+    for source in sorted(p for p in candidates if p.is_file()):
+        if source.suffix.lower() not in SUPPORTED_EXTENSIONS:
+            continue
+        size = source.stat().st_size
+        if size > max_size_for(source.name):
+            skipped.append({"filename": source.name, "error": "Dosya boyutu sınırı aşıldı"})
+            continue
+        target = chat_upload_dir / f"{prefix}_{len(items)}_{source.name}"
+        shutil.copy2(source, target)
+        items.append((str(target), source.name, upload_metadata(target, source.name, size, chat_id)))
+
+    vector_store = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id)
+    summary = BulkImporter(vector_store).run(items, remove_unused=True)
+    summary["files"] += len(skipped)
+    summary["failed"].extend(skipped)
+    chat_manager.update_pdf_count(chat_id, vector_store.get_stats()["total_documents"])
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Klasördeki dökümanları bir sohbete toplu aktar")
+    parser.add_argument("chat_id")
+    parser.add_argument("directory")
+    parser.add_argument("--recursive", action="store_true", help="Alt klasörleri de tara")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = import_directory(args.chat_id, args.directory, recursive=args.recursive)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        ocr_pool.shutdown()
+        resource_pool.shutdown()
+
+    print(f"📦 {summary['files']} dosya, {summary['elapsed_s']}s "
+          f"({summary['files_per_s']} dosya/s, {summary['chunks_per_s']} parça/s)")
+    print(f"✅ Eklenen: {len(summary['added'])} ({summary['chunks']} parça)")
+    print(f"📄 Zaten mevcut: {len(summary['duplicates'])}")
+    for name in summary["duplicates"]:
+        print(f"   • {name}")
+    print(f"❌ Başarısız: {len(summary['failed'])}")
+    for failure in summary["failed"]:
+        print(f"   • {failure['filename']}: {failure['error']}")
+    return 1 if summary["failed"] and not summary["added"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
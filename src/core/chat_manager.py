@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 import logging
 
+from .config import Config
+
 logger = logging.getLogger(__name__)
 
 class ChatManager:
@@ -99,11 +101,16 @@ class ChatManager:
     def delete_chat(self, chat_id: str) -> bool:
         """Sohbeti siler"""
         try:
+            import shutil
             chat_dir = self.base_data_dir / chat_id
             if chat_dir.exists():
-                import shutil
                 shutil.rmtree(chat_dir)
             
+            # Vektör deposu ayrı kökte tutulur; açık dosya yüzünden silinemeyen kısım reclaimer'a kalır
+            vector_dir = Path(Config.VECTOR_STORE_PATH) / chat_id
+            if vector_dir.exists():
+                shutil.rmtree(vector_dir, ignore_errors=True)
+            
             if chat_id in self.chats_metadata:
                 del self.chats_metadata[chat_id]
                 self.save_chats_metadata()
@@ -15,6 +15,8 @@ class Config:
     GEMINI_MODEL = "gemini-2.5-flash"
     GEMINI_TEMPERATURE = 0.7
     GEMINI_MAX_TOKENS = 2048
+    STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "true").lower() == "true"  # Cevapları token token gönder
+    STREAM_FLUSH_INTERVAL = 0.05  # Saniye - delta çerçeveleri bu aralıkla gruplanır
 
     # Chat configurations
     MAX_HISTORY_LENGTH = 50
@@ -26,16 +28,125 @@ class Config:
     MAX_PDF_SIZE = 50 * 1024 * 1024  # 50MB
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
     MAX_IMAGE_SIZE = 10 * 1024 * 1024 # 10MB
     
     # PDF Upload configurations  
     UPLOAD_DIR = "uploads"
     ALLOWED_EXTENSIONS = {'.pdf'}
+    UPLOAD_CHUNK_BYTES = 1024 * 1024  # Yüklemeler bu boyutta parçalarla diske akıtılır
+    DATABASE_PATH = "chat_system.db"  # DatabaseManager'ın SQLite dosyası
     
+    # Storage reclamation - silinmiş sohbetlerden kalan veriler ve yarım kalmış geçici dosyalar
+    RECLAIM_MIN_AGE_SECONDS = 3600  # Bundan yeni dosya/dizinlere dokunulmaz (süren yüklemeler)
+    RECLAIM_VACUUM_TIMEOUT = 5  # Saniye - SQLite kilidi alınamazsa VACUUM atlanır
+    RECLAIM_INTERVAL_HOURS = float(os.getenv("RECLAIM_INTERVAL_HOURS", "0"))  # 0 = sadece elle / admin uç noktası
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # /admin uç noktaları X-Admin-Token başlığı ister; ayarlı değilse kapalıdır
+    
+    # Intent router configurations - emin olunmayan mesajlar anahtar kelime kurallarına düşer
+    INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+    INTENT_MIN_CONFIDENCE = 0.55  # En yakın niyet merkezine minimum cosine benzerliği
+    INTENT_MIN_MARGIN = 0.05  # En iyi iki niyet arasındaki minimum fark
+    INTENT_WEB_RESEARCH_MIN_CONFIDENCE = 0.7  # Pahalı crew yolu için daha yüksek güven istenir
+
     # RAG configurations
     RAG_TOP_K = 5  # Kaç doküman parçası getirilecek
     RAG_SIMILARITY_THRESHOLD = 0.3  # Minimum benzerlik skoru
     RAG_ENABLED = True  # RAG sistemini açık/kapalı
+    RAG_SPECULATIVE_PREFETCH = os.getenv("RAG_SPECULATIVE_PREFETCH", "false").lower() == "true"  # Aramayı niyet analiziyle paralel başlat
+
+    # Dialog cache configurations
+    DIALOG_CACHE_MAX_SIZE = int(os.getenv("DIALOG_CACHE_MAX_SIZE", "50"))  # Bellekte tutulacak maksimum diyalog
+    DIALOG_CACHE_MAX_MEMORY_MB = float(os.getenv("DIALOG_CACHE_MAX_MEMORY_MB", "256"))  # Tahmini state bellek sınırı
+    DIALOG_IDLE_TIMEOUT = int(os.getenv("DIALOG_IDLE_TIMEOUT", "1800"))  # Saniye - boşta kalan diyalog diske yazılır
+    DIALOG_CACHE_SWEEP_INTERVAL = 60  # Saniye
+    DIALOG_STATE_FILENAME = "dialog_state.json"
+
+    # WebSocket outbound queue configurations
+    WS_OUTBOX_MAX_SIZE = 200  # Bağlantı başına bekleyen maksimum mesaj
+    WS_BATCH_MAX_FRAMES = 20  # Tek 'batch' çerçevesindeki maksimum telemetri mesajı
+
+    # Bulk import configurations - çoklu yükleme ve import-docs komutu
+    BULK_IMPORT_WORKERS = int(os.getenv("BULK_IMPORT_WORKERS", "4"))  # Aynı anda metni çıkarılan dosya
+    BULK_IMPORT_BATCH_CHUNKS = 256  # Bu kadar parça birikince tek Chroma upsert'i yapılır
+
+    # Index migration - ayarlar değişince sohbetleri yeniden indeksleyen reindex komutu
+    MIGRATION_BATCH_CHUNKS = int(os.getenv("MIGRATION_BATCH_CHUNKS", "1024"))  # Tek embedding çağrısı + checkpoint
+    MIGRATION_STATE_FILENAME = "migration_state.json"  # VECTOR_STORE_PATH altında, yarıda kalan çalışma buradan devam eder
+
+    # Shared resource pool configurations
+    WHISPER_MODEL_SIZE = "base"
+    WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+    WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "1"))  # 1 = greedy çözümleme (en hızlı)
+    WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "1"))  # Aynı anda çalışan transkripsiyon
+    SHARED_EXECUTOR_WORKERS = {
+        "crew": 8,  # CrewAI kickoff çağrıları (araştırma + test üretimi)
+        "whisper": WHISPER_WORKERS,  # Transkripsiyon crew thread'lerini işgal etmesin
+        "ingestion": BULK_IMPORT_WORKERS,  # Toplu içe aktarmada metin çıkarma (OCR ayrıca süreç havuzunda)
+    }
+
+    # OCR configurations - TrOCR modelleri süreç başına bir kez yüklenir
+    OCR_MODELS = {
+        "handwritten": "microsoft/trocr-base-handwritten",
+        "printed": "microsoft/trocr-base-printed",
+    }
+    OCR_QUANTIZE = os.getenv("OCR_QUANTIZE", "true").lower() == "true"  # CPU'da dinamik int8 quantization
+    OCR_NUM_BEAMS = int(os.getenv("OCR_NUM_BEAMS", "1"))  # 1 = greedy çözümleme (en hızlı)
+    OCR_MAX_LENGTH = 256
+    OCR_MAX_BATCH_SIZE = int(os.getenv("OCR_MAX_BATCH_SIZE", "32"))  # Tek generate çağrısındaki maksimum görüntü (bir sayfanın satırları)
+    OCR_BATCH_WAIT_MS = 20  # İlk istekten sonra batch'e katılacak istekler için bekleme
+    OCR_FALLBACK_CONFIDENCE = float(os.getenv("OCR_FALLBACK_CONFIDENCE", "0.6"))  # Altında satır diğer modelle de okunur
+    OCR_SEGMENT_LINES = os.getenv("OCR_SEGMENT_LINES", "true").lower() == "true"  # TrOCR tek satır tanır - sayfayı satırlara böl
+    OCR_MIN_LINE_HEIGHT = 8  # Piksel - daha küçük bölgeler gürültü sayılır
+    TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))  # 0 = torch varsayılanı
+
+    # Ingestion OCR configurations - görüntüler ve metin katmanı olmayan PDF sayfaları
+    OCR_PROCESS_WORKERS = int(os.getenv("OCR_PROCESS_WORKERS", "2"))  # Her süreç modelleri ayrı yükler (bellek!)
+    OCR_PAGE_TIMEOUT = 120  # Saniye - tek sayfa/görüntü için bekleme sınırı
+    OCR_WORKER_STARTUP_TIMEOUT = 180  # Saniye - yeni işçi havuzunun süreç başlatma + model yükleme payı
+    OCR_DOCUMENT_TIMEOUT = 900  # Saniye - bir belgenin tüm OCR sayfaları için üst sınır
+    OCR_PDF_ENABLED = os.getenv("OCR_PDF_ENABLED", "true").lower() == "true"
+    OCR_PDF_MIN_PAGE_CHARS = 20  # Bundan az metin katmanı olan sayfa taranmış kabul edilir
+    OCR_PDF_DPI = 200
+
+    # Extraction cache - ham dosya özeti + çıkarma ayarlarına göre metin/OCR sonuçları
+    EXTRACTION_CACHE_DIR = "extraction_cache"
+    EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "200"))
+    EXTRACTOR_VERSION = 2  # Okuyucu/OCR mantığı değişince artırılır - eski kayıtlar geçersiz olur
+
+    # YouTube transcript cache configurations
+    TRANSCRIPT_CACHE_DIR = "transcript_cache"
+    AUDIO_CACHE_MAX_MB = int(os.getenv("AUDIO_CACHE_MAX_MB", "500"))
+
+    # Gemini concurrency governor - sohbet > değerlendirme > arka plan crew'ları
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))  # Aynı anda uçuşta olan Gemini çağrısı
+    LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "60"))  # Token bucket dolum hızı
+    LLM_BURST = int(os.getenv("LLM_BURST", "10"))  # Kısa süreli patlama kapasitesi
+    LLM_INTERACTIVE_RESERVED = 1  # Sadece sohbet cevaplarının kullanabildiği slot
+    LLM_BACKOFF_BASE = 2.0  # Saniye - ilk 429 sonrası bekleme
+    LLM_BACKOFF_MAX = 60.0  # Saniye - art arda 429'larda üst sınır
+
+    # Classic answer evaluation configurations
+    EVALUATION_BATCH_SIZE = 5  # Tek LLM çağrısında değerlendirilen klasik cevap sayısı
+    EVALUATION_TIMEOUT = 30.0  # Saniye - her değerlendirme çağrısı için
+    EVALUATION_CACHE_SIZE = 1000  # Aynı soru + cevap için saklanan değerlendirme
+    GRADING_FUZZY_THRESHOLD = 0.85  # Boşluk doldurmada yazım hatası toleransı (benzerlik oranı)
+    GRADING_MIN_CLASSIC_CHARS = 10  # Bundan kısa klasik cevaplar LLM'e gönderilmeden yanlış sayılır
+
+    # Research crew configurations
+    RESEARCH_DETAIL_CONCURRENCY = int(os.getenv("RESEARCH_DETAIL_CONCURRENCY", "3"))  # Aynı anda detaylandırılan alt başlık
+    RESEARCH_WEB_TIMEOUT = 300  # Saniye - web araştırma aşaması
+    RESEARCH_YOUTUBE_TIMEOUT = 240  # Saniye - YouTube aşaması aşarsa sadece web sonuçlarıyla devam edilir
+    RESEARCH_DATA_DIR = "research_data"
+    RESEARCH_CACHE_TTL_HOURS = float(os.getenv("RESEARCH_CACHE_TTL_HOURS", "24"))  # Bu süreden eski araştırmalar yeniden yapılır
+    RESEARCH_CACHE_SIMILARITY = 0.85  # Önceki konuyla eşleşme için minimum cosine benzerliği
+    RESEARCH_REFRESH_KEYWORDS = ["yeniden araştır", "tekrar araştır", "güncel araştır", "araştırmayı yenile", "güncelle"]
+
+    # Startup configurations - ağır bileşenler varsayılan olarak ilk kullanımda yüklenir
+    PRELOAD = os.getenv("PRELOAD", "").lower() in ("1", "true", "yes")
+    PRELOAD_COMPONENTS = [
+        c.strip() for c in os.getenv("PRELOAD_COMPONENTS", "conversation,vector_store,llm,crew,whisper,intent").split(",") if c.strip()
+    ]
 
     # GÜNCELLENEN SATIR 38-50: System prompt RAG desteği ile genişletildi
     SYSTEM_PROMPT = """Sen LangGraph ve CrewAI ile güçlendirilmiş akıllı bir asistansın.
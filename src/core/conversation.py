@@ -1,21 +1,28 @@
 # src/core/conversation.py
 
 from typing import TypedDict, List, Literal
-from chromadb import logger
+import logging
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 import asyncio
 import json
+import threading
+import time
+from collections import deque
 from datetime import datetime
 import re
 
 from .config import Config
-from agents.research_crew import AsyncCrewAIA2AHandler
-from agents.crew_agents import CrewAISystem # YENİ: CrewAI sistemini import et
+from . import resource_pool
+from .research_cache import is_refresh_request
+from .llm_governor import governor, INTERACTIVE
+from .intent_router import intent_router, keyword_intent
+from .rag_prefetch import RagPrefetch
 
 from core.vector_store import VectorStore
 
+logger = logging.getLogger(__name__)
+
 class ConversationState(TypedDict):
     messages: List[BaseMessage]
     current_intent: str
@@ -41,20 +48,24 @@ class ConversationState(TypedDict):
     partial_test_params: dict
     test_params_ready: bool  # Test parametrelerinin hazır olup olmadığını belirler
     ui_message_sent: bool  # UI mesajının gönderilip gönderilmediğini takip eder - YENİ
+    refresh_research: bool  # Kayıtlı araştırma yerine yeni araştırma yapılsın mı (tek seferlik)
     
 class AsyncLangGraphDialog:
     def __init__(self, websocket_callback=None, chat_id=None, chat_manager=None):
-        self.llm = ChatGoogleGenerativeAI(
-            model=Config.GEMINI_MODEL,
-            google_api_key=Config.GOOGLE_API_KEY,
-            temperature=Config.GEMINI_TEMPERATURE,
-        )
+        self.llm = resource_pool.get_chat_llm()
         
         self.websocket_callback = websocket_callback
         self.chat_id = chat_id
         self.chat_manager = chat_manager
-        self.crew_handler = AsyncCrewAIA2AHandler(websocket_callback)
-        self.test_crew = CrewAISystem(api_key=Config.GOOGLE_API_KEY, websocket_callback=websocket_callback)
+        self._active_runs = 0  # Devam eden graph çalıştırmaları - önbellekten çıkarmayı engeller
+        self.run_lock = asyncio.Lock()  # Aynı sohbette graph çalıştırmaları sırayla yapılır
+        self.current_stream_id = None  # Bu turda akıtılan cevabın kimliği
+        self._stream_this_turn = True
+        self.turn_metrics = deque(maxlen=50)  # Son turların TTFT ve token/s ölçümleri
+        # CrewAI bileşenleri ilk kullanımda oluşturulur (crewai import'u pahalı)
+        self._crew_handler = None
+        self._test_crew = None
+        self._rag_prefetch = None  # Bu tur için niyet analiziyle paralel başlatılan RAG araması
 
         
         # Chat-specific vector store oluştur
@@ -85,9 +96,26 @@ class AsyncLangGraphDialog:
             test_param_stage="start",
             partial_test_params={},
             test_params_ready=False,
-            ui_message_sent=False  # YENİ: UI mesaj takibi
+            ui_message_sent=False,  # YENİ: UI mesaj takibi
+            refresh_research=False
         )
     
+    @property
+    def crew_handler(self):
+        """Araştırma ekibi - ilk web araştırmasında oluşturulur"""
+        if self._crew_handler is None:
+            from agents.research_crew import AsyncCrewAIA2AHandler
+            self._crew_handler = AsyncCrewAIA2AHandler(self.websocket_callback)
+        return self._crew_handler
+
+    @property
+    def test_crew(self):
+        """Test üretim ekibi - ilk test üretiminde oluşturulur"""
+        if self._test_crew is None:
+            from agents.crew_agents import CrewAISystem
+            self._test_crew = CrewAISystem(api_key=Config.GOOGLE_API_KEY, websocket_callback=self.websocket_callback)
+        return self._test_crew
+
     def create_conversation_graph(self):
         workflow = StateGraph(ConversationState)
         
@@ -187,11 +215,13 @@ class AsyncLangGraphDialog:
         try:
             last_message = state["messages"][-1].content
             
-            # Vektör deposunda ara
-            search_results = self.vector_store.search_similar(
-                query=last_message,
-                n_results=Config.RAG_TOP_K
-            )
+            # Spekülatif arama başlatıldıysa sonucu kullanılır, yoksa vektör deposunda ara
+            search_results = await self._rag_prefetch.take(last_message) if self._rag_prefetch else None
+            if search_results is None:
+                search_results = self.vector_store.search_similar(
+                    query=last_message,
+                    n_results=Config.RAG_TOP_K
+                )
             
             if search_results:
                 # Benzerlik skoruna göre filtrele
@@ -269,7 +299,9 @@ class AsyncLangGraphDialog:
         context += f"\nARAŞTIRMA TARİHİ: {research_data.get('timestamp', 'Belirtilmemiş')}"
         return context
     
-    async def process_user_message(self, user_message: str) -> str:
+    async def process_user_message(self, user_message: str, stream: bool = True) -> str:
+        self.current_stream_id = None
+        self._stream_this_turn = stream
         try:
             # Kullanıcı mesajını conversation state'e ekle
             self.conversation_state["messages"].append(HumanMessage(content=user_message))
@@ -288,7 +320,15 @@ class AsyncLangGraphDialog:
                     self.chat_manager.auto_generate_title(self.chat_id, user_message)
             
             # Graph'ı çalıştır
-            final_state = await self.graph.ainvoke(self.conversation_state)
+            self._active_runs += 1
+            self._start_rag_prefetch(user_message)
+            try:
+                final_state = await self.graph.ainvoke(self.conversation_state)
+            finally:
+                self._active_runs -= 1
+                if self._rag_prefetch:
+                    self._rag_prefetch.discard()
+                    self._rag_prefetch = None
             self.conversation_state = final_state
             
             # Pending action varsa mesaj döndürme
@@ -324,6 +364,22 @@ class AsyncLangGraphDialog:
             
             return error_response
 
+    def _start_rag_prefetch(self, user_message: str):
+        """Dokümanlı sohbetlerde RAG aramasını niyet analizini beklemeden başlatır"""
+        self._rag_prefetch = None
+        if not (Config.RAG_ENABLED and Config.RAG_SPECULATIVE_PREFETCH):
+            return
+        # Test parametresi cevapları hiçbir zaman RAG aramasına gitmez
+        if self.conversation_state.get("awaiting_test_params"):
+            return
+        try:
+            if self.vector_store.collection.count() == 0:
+                return
+        except Exception as e:
+            logger.warning(f"Spekülatif RAG araması atlandı: {e}")
+            return
+        self._rag_prefetch = RagPrefetch.start(self.vector_store, user_message, Config.RAG_TOP_K)
+
     def get_conversation_history(self) -> List[dict]:
         """Konuşma geçmişini döner"""
         history = []
@@ -355,6 +411,7 @@ class AsyncLangGraphDialog:
             "rag_enabled": Config.RAG_ENABLED,
             "vector_store_stats": vector_stats,
             "chat_id": self.chat_id or "default",
+            "last_turn_metrics": self.turn_metrics[-1] if self.turn_metrics else None,
             # Test durumu istatistikleri - DÜZELTİLMİŞ
             "test_stats": {
                 "awaiting_params": self.conversation_state.get("awaiting_test_params", False),
@@ -407,7 +464,8 @@ class AsyncLangGraphDialog:
             test_param_stage="start",
             partial_test_params={},
             test_params_ready=False,
-            ui_message_sent=False  # YENİ: UI mesaj takibi sıfırla
+            ui_message_sent=False,  # YENİ: UI mesaj takibi sıfırla
+            refresh_research=False
         )
 
     def update_chat_manager(self, chat_manager):
@@ -426,15 +484,86 @@ class AsyncLangGraphDialog:
         
         # Vector store'u yeni chat ID ile yeniden başlat
         self.vector_store = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id)
+
+    # Diske yazılmayacak state alanları: çalışma zamanına ait nesneler ve mesajlar
+    # (mesajlar veritabanında; bağlantıda load_conversation_from_messages ile yüklenir)
+    NON_PERSISTENT_STATE_KEYS = ("websocket_callback", "chat_manager", "messages")
+
+    @property
+    def is_busy(self) -> bool:
+        """Graph çalışıyor mu - bekleyen test parametresi sorusu diyaloğu önbellekte tutmaz (durum diske yazılır)"""
+        return self._active_runs > 0
+
+    def export_state(self) -> dict:
+        """ConversationState'i JSON'a yazılabilir bir sözlük olarak döner"""
+        state = {
+            key: value for key, value in self.conversation_state.items()
+            if key not in self.NON_PERSISTENT_STATE_KEYS
+        }
+        return {
+            "chat_id": self.chat_id,
+            "saved_at": datetime.now().isoformat(),
+            "state": state
+        }
+
+    def restore_state(self, data: dict):
+        """export_state ile kaydedilmiş durumu geri yükler"""
+        state = {key: value for key, value in data.get("state", {}).items()
+                 if key not in self.NON_PERSISTENT_STATE_KEYS}
+        self.conversation_state.update(state)
+        self.conversation_state["websocket_callback"] = self.websocket_callback
+        self.conversation_state["chat_manager"] = self.chat_manager
+
+    def estimate_memory_usage(self) -> int:
+        """Konuşma durumunun yaklaşık bellek kullanımı (byte)"""
+        size = sum(len(str(msg.content)) for msg in self.conversation_state["messages"])
+        size += len(self.conversation_state.get("full_document_text") or "")
+        size += len(self.conversation_state.get("rag_context") or "")
+        for key in ("research_data", "generated_questions"):
+            value = self.conversation_state.get(key)
+            if value:
+                size += len(json.dumps(value, ensure_ascii=False, default=str))
+        return size
+
+    def set_websocket_callback(self, websocket_callback):
+        """Yeni bağlantının callback'ini diyaloğa ve CrewAI bileşenlerine aktarır"""
+        self.websocket_callback = websocket_callback
+        self.conversation_state["websocket_callback"] = websocket_callback
+        if self._crew_handler is not None:
+            self._crew_handler.websocket_callback = websocket_callback
+            self._crew_handler.crew_tool.websocket_callback = websocket_callback
+        if self._test_crew is not None:
+            self._test_crew.websocket_callback = websocket_callback
+
+    def cancel_running_work(self):
+        """Çalışan CrewAI işlerine durma sinyali gönderir"""
+        if self._crew_handler is not None:
+            self._crew_handler.crew_tool.cancel_event.set()
+        if self._test_crew is not None:
+            self._test_crew.cancel_event.set()
+
+    def reset_cancellation(self):
+        """Yeni bir graph çalıştırması için yeni iptal sinyalleri oluşturur.
+
+        Olay temizlenmez, değiştirilir: iptal edilen çalıştırmanın hâlâ adımlar
+        arasında olan crew thread'leri kendi (set edilmiş) olaylarını görmeye devam eder.
+        """
+        if self._crew_handler is not None:
+            self._crew_handler.crew_tool.cancel_event = threading.Event()
+        if self._test_crew is not None:
+            self._test_crew.cancel_event = threading.Event()
+
+    def close(self):
+        """Diyaloğun bağlantı referanslarını bırakır - paylaşılan kaynaklar havuzda kalır"""
+        self.set_websocket_callback(None)
     
     def intent_analysis_node(self, state: ConversationState) -> ConversationState:
-        last_message = state["messages"][-1].content.strip().lower()
         original_message = state["messages"][-1].content.strip()
         
         # Force web research flag'ini kontrol et
         force_web_research = state.get("force_web_research", False)
         
-        print(f"🔍 Intent Analysis - Message: '{last_message[:50]}...', Force Web Research: {force_web_research}")
+        print(f"🔍 Intent Analysis - Message: '{original_message.lower()[:50]}...', Force Web Research: {force_web_research}")
         
         # ÖNCE test parametresi bekleme durumunu kontrol et
         if state.get("awaiting_test_params"):
@@ -442,137 +571,45 @@ class AsyncLangGraphDialog:
             state["current_intent"] = "process_test_params"
             logger.info("✅ Intent detected: process_test_params (awaiting parameters)")
             return state
-        
-        # Test oluşturma komutları - GENİŞLETİLMİŞ LİSTE
-        test_keywords = [
-            "test oluştur", "test olustur", "soru hazırla", "sınav yap", "test yap", 
-            "soru üret", "soru uret", "test hazırla", "quiz oluştur",
-            "quiz olustur", "sınav oluştur", "sinav olustur", "test üret", "test uret",
-            "sorular oluştur", "sorular olustur", "değerlendirme yap", "degerlendirme yap"
-        ]
-        
-        if any(keyword in last_message for keyword in test_keywords):
-            state["current_intent"] = "generate_test"
-            state["test_generation_requested"] = True
-            logger.info("✅ Intent detected: generate_test")
-            return state
 
-        # Araştırma tamamlandıysa ve research data varsa
-        if state.get("research_completed", False) and state.get("research_data"):
-            research_keywords = ["araştırma", "rapor", "bulgu", "sonuç", "detay", "açıkla", "anlatır mısın", 
-                            "nedir", "nasıl", "ne demek", "anlat", "açıklayabilir", "daha fazla bilgi"]
-            
-            if any(keyword in last_message for keyword in research_keywords):
-                state["current_intent"] = "research_question"
-                state["needs_crew_ai"] = False
-                print(f"✅ Intent: research_question")
-                return state
-        
-        # ÖNCE web araştırması flag'ini kontrol et
-        if force_web_research:
-            state["current_intent"] = "web_research"
-            state["crew_ai_task"] = original_message
-            state["needs_crew_ai"] = True
-            print(f"✅ Intent: web_research (forced)")
-            return state
-        
-        # RAG kontrolü - DAHA SPESIFIK KRITERLER
+        research_completed = bool(state.get("research_completed", False) and state.get("research_data"))
+        has_documents = False
+        file_name_parts = []
         if Config.RAG_ENABLED:
             vector_stats = self.vector_store.get_stats()
             has_documents = vector_stats.get("total_documents", 0) > 0
             print(f"📚 PDF Documents: {has_documents}, Total: {vector_stats.get('total_documents', 0)}")
-            
-            if has_documents:
-                # Direkt PDF referansları
-                direct_pdf_references = [
-                    "bu doküman", "bu dokuman", "bu dosya", "bu pdf", "bu rapor",
-                    "bu belge", "yüklediğim", "yukledıgım", "gönderdiğim", "gonderdigim",
-                    "dokümanı", "dokumanı", "dosyayı", "pdf'i", "raporu", "belgeyi",
-                    "dosyada", "dosyadan", "pdf'te", "pdf'de", "belgede", "dökümanı", "dokumanı"
-                ]
-                
-                # PDF içerik soruları
-                pdf_content_questions = [
-                    "özet", "özetle", "içerik", "içinde", "neler var", "ne diyor",
-                    "bahsediyor", "yaziyor", "yazıyor", "anlatıyor", "gösteriyor",
-                    "açıklıyor", "hangi konular", "nasıl açıklıyor", "konu başlıkları",
-                    "başlıklar", "konular", "bölümler", "detaylar", "bilgiler", "içindekiler"
-                ]
-                
-                # Dosya ismi referansları
-                uploaded_files = vector_stats.get("documents", [])
-                file_name_matches = []
-                for doc in uploaded_files:
-                    filename = doc.get("filename", "").lower()
-                    if filename:
-                        # Dosya adının ana kısmını al (uzantısız)
-                        name_without_ext = filename.replace(".pdf", "").replace("-", " ").replace("_", " ")
-                        name_parts = [part for part in name_without_ext.split() if len(part) > 3]
-                        
-                        # Bu dosya isminin parçaları mesajda geçiyor mu?
-                        for part in name_parts:
-                            if part in last_message:
-                                file_name_matches.append(part)
-                
-                # RAG kullanım kriterleri
-                should_use_rag = False
-                reason = ""
-                
-                # 1. Direkt PDF referansı
-                if any(ref in last_message for ref in direct_pdf_references):
-                    should_use_rag = True
-                    reason = "Direct PDF reference"
-                
-                # 2. **KONU BAŞLIĞI SORGUSU - GÜÇLENDİRİLMİŞ**
-                elif any(kw in last_message for kw in ["konu başlıkları", "başlıklar", "konular", "bölümler", "içindekiler", "pdf deki", "pdfdeki", "pdf in", "pdfin", "başlık", "konu", "içerik"]):
-                    should_use_rag = True
-                    reason = "Table of contents/content request"
-                
-                # 3. Dosya ismi + içerik sorusu
-                elif file_name_matches and any(q in last_message for q in pdf_content_questions):
-                    should_use_rag = True
-                    reason = f"File name match ({file_name_matches}) + content question"
-                
-                # 4. PDF kelimesi + içerik sorusu 
-                elif ("pdf" in last_message or "doküman" in last_message or "dokuman" in last_message) and \
-                     any(q in last_message for q in pdf_content_questions):
-                    should_use_rag = True
-                    reason = "PDF keyword + content question"
-                
-                print(f"🎯 RAG Analysis: should_use={should_use_rag}, reason='{reason}'")
-                
-                if should_use_rag:
-                    state["current_intent"] = "rag_search"
-                    state["crew_ai_task"] = original_message
-                    state["needs_crew_ai"] = False
-                    print(f"✅ Intent: rag_search")
-                    return state
-            
-            # PDF mevcut değilse ve PDF referansı yapıldıysa uyar
-            elif not has_documents and any(ref in last_message for ref in ["pdf", "doküman", "dokuman", "dosya", "belge"]):
-                state["current_intent"] = "no_pdf_available"
-                state["needs_crew_ai"] = False
-                print(f"✅ Intent: no_pdf_available")
-                return state
-    
-        # Web araştırması otomatik algılama - SADECE kesin durumlar
-        research_keywords_explicit = ["araştır", "araştırma yap", "incele", "analiz et", "web'de ara", "internette ara"]
-        
-        detected_intent = "gemini"  # Varsayılan olarak gemini response
-        task_topic = original_message
-        
-        # Açık araştırma talepleri
-        for keyword in research_keywords_explicit:
-            if keyword in last_message:
-                detected_intent = "web_research"
-                task_topic = original_message.replace(keyword, "", 1).strip()
-                break
-        
-        state["current_intent"] = detected_intent
-        state["crew_ai_task"] = task_topic
-        state["needs_crew_ai"] = detected_intent == "web_research"
-        
-        print(f"✅ Final Intent: {detected_intent}")
+            for doc in vector_stats.get("documents", []):
+                # Dosya adının ana kısmı (uzantısız) mesajda geçerse RAG sinyali sayılır
+                name_without_ext = doc.get("filename", "").lower().replace(".pdf", "").replace("-", " ").replace("_", " ")
+                file_name_parts.extend(part for part in name_without_ext.split() if len(part) > 3)
+
+        # Embedding yönlendiricisi emin olduğunda doğrudan kullanılır
+        if not force_web_research:
+            routed = intent_router.route(original_message, has_documents=has_documents, research_completed=research_completed)
+            if routed:
+                print(f"🧭 Intent: {routed['intent']} (router, güven={routed['confidence']}, fark={routed['margin']})")
+                return self._apply_intent(state, routed["intent"], original_message)
+
+        decision = keyword_intent(
+            original_message,
+            has_documents=has_documents,
+            research_completed=research_completed,
+            force_web_research=force_web_research,
+            file_name_parts=file_name_parts,
+        )
+        print(f"✅ Final Intent: {decision['intent']} (anahtar kelime: {decision['reason']})")
+        return self._apply_intent(state, decision["intent"], decision["topic"])
+
+    def _apply_intent(self, state: ConversationState, intent: str, topic: str) -> ConversationState:
+        """Belirlenen niyeti graph state'ine yazar"""
+        state["current_intent"] = intent
+        if intent == "generate_test":
+            state["test_generation_requested"] = True
+            return state
+        if intent in ("web_research", "rag_search", "gemini"):
+            state["crew_ai_task"] = topic
+        state["needs_crew_ai"] = intent == "web_research"
         return state
 
     async def no_pdf_available_node(self, state: ConversationState) -> ConversationState:
@@ -606,7 +643,12 @@ class AsyncLangGraphDialog:
             
             await asyncio.sleep(0.5)
             
-            research_result = await self.crew_handler.research_workflow(research_query)
+            # Kayıtlı araştırma yerine yenisi istendiyse önbellek atlanır (tek seferlik bayrak)
+            refresh = state.get("refresh_research", False) or is_refresh_request(
+                state["messages"][-1].content if state.get("messages") else ""
+            )
+            state["refresh_research"] = False
+            research_result = await self.crew_handler.research_workflow(research_query, refresh=refresh)
             
             if research_result and not research_result.get("error"):
                 state["research_data"] = research_result
@@ -703,7 +745,7 @@ Kaynak: [Dosya adı], Bölüm [X]"
                     HumanMessage(content=enhanced_prompt)
                 ]
                 
-                response = await self.llm.ainvoke(contextual_messages)
+                response_text = await self.generate_response(contextual_messages)
                 
             elif state.get("current_intent") == "research_question" and state.get("research_data"):
                 research_context = self.format_research_context(state["research_data"])
@@ -730,15 +772,15 @@ Kullanıcı dostu ve bilgilendirici bir ton kullan.
 """
                 
                 contextual_messages = messages_for_llm[:-1] + [HumanMessage(content=contextual_prompt)]
-                response = await self.llm.ainvoke(contextual_messages)
+                response_text = await self.generate_response(contextual_messages)
                 
             else:
                 # Normal Gemini response
                 if messages_for_llm and "araştırma başlatılmadı" in messages_for_llm[-1].content:
                     messages_for_llm = messages_for_llm[:-1]
-                response = await self.llm.ainvoke(messages_for_llm)
+                response_text = await self.generate_response(messages_for_llm)
             
-            state["messages"].append(AIMessage(content=response.content))
+            state["messages"].append(AIMessage(content=response_text))
             
         except Exception as e:
             error_message = f"Üzgünüm, bir hata oluştu: {str(e)}"
@@ -747,6 +789,81 @@ Kullanıcı dostu ve bilgilendirici bir ton kullan.
         
         return state
     
+    async def generate_response(self, messages: List[BaseMessage]) -> str:
+        """Gemini cevabını üretir - bağlantı varsa token'ları ai_response_delta olarak akıtır"""
+        if not (self._stream_this_turn and Config.STREAMING_ENABLED and self.websocket_callback):
+            start = time.perf_counter()
+            async with governor.slot(INTERACTIVE):
+                response = await self.llm.ainvoke(messages)
+            self._record_turn_metrics(start, None, time.perf_counter(), response.content, getattr(response, "usage_metadata", None), streamed=False)
+            return response.content
+
+        stream_id = f"{self.chat_id or 'default'}_{int(time.time() * 1000)}"
+        self.current_stream_id = stream_id
+        start = time.perf_counter()
+        first_token_at = None
+        last_flush = start
+        parts: List[str] = []
+        pending: List[str] = []
+        aggregate = None
+        index = 0
+
+        async def flush():
+            nonlocal index, pending
+            if not pending:
+                return
+            await self.websocket_callback(json.dumps({
+                "type": "ai_response_delta",
+                "stream_id": stream_id,
+                "index": index,
+                "delta": "".join(pending),
+                "chat_id": self.chat_id
+            }))
+            index += 1
+            pending = []
+
+        async with governor.slot(INTERACTIVE):
+            async for chunk in self.llm.astream(messages):
+                aggregate = chunk if aggregate is None else aggregate + chunk
+                text = chunk.content if isinstance(chunk.content, str) else "".join(
+                    part.get("text", "") if isinstance(part, dict) else str(part) for part in chunk.content
+                )
+                if not text:
+                    continue
+                now = time.perf_counter()
+                if first_token_at is None:
+                    first_token_at = now
+                parts.append(text)
+                pending.append(text)
+                # İlk token hemen, sonrakiler kısa aralıklarla gruplanarak gönderilir
+                if index == 0 or now - last_flush >= Config.STREAM_FLUSH_INTERVAL:
+                    await flush()
+                    last_flush = now
+        await flush()
+
+        full_text = "".join(parts)
+        self._record_turn_metrics(start, first_token_at, time.perf_counter(), full_text,
+                                  getattr(aggregate, "usage_metadata", None), streamed=True)
+        return full_text
+
+    def _record_turn_metrics(self, start: float, first_token_at, end: float, text: str, usage_metadata, streamed: bool):
+        """Tur başına ilk token süresi (TTFT) ve token/saniye kaydı"""
+        output_tokens = (usage_metadata or {}).get("output_tokens") or max(1, len(text) // 4)
+        generation_time = end - (first_token_at or start)
+        metrics = {
+            "timestamp": datetime.now().isoformat(),
+            "streamed": streamed,
+            "ttft_ms": round(((first_token_at or end) - start) * 1000, 1),
+            "total_ms": round((end - start) * 1000, 1),
+            "output_tokens": output_tokens,
+            "tokens_per_second": round(output_tokens / generation_time, 1) if generation_time > 0 else None,
+        }
+        self.turn_metrics.append(metrics)
+        logger.info(
+            f"⏱️ Gemini cevabı - TTFT: {metrics['ttft_ms']}ms, toplam: {metrics['total_ms']}ms, "
+            f"{metrics['tokens_per_second']} token/s (Chat: {self.chat_id})"
+        )
+
     def _get_full_text_from_vector_store(self) -> str:
         """Vektör veritabanındaki tüm parçaları birleştirerek tam metni alır."""
         try:
@@ -218,4 +218,14 @@ class DatabaseManager:
         """Sohbeti sil (soft delete)"""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
-            cursor.execute('UPDATE chats SET is_active = 0 WHERE id = ?', (chat_id,))
\ No newline at end of file
+            cursor.execute('UPDATE chats SET is_active = 0 WHERE id = ?', (chat_id,))
+            
+    def purge_deleted_chats(self) -> int:
+        """Yumuşak silinmiş sohbetleri mesaj ve döküman kayıtlarıyla birlikte kalıcı olarak sil"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            deleted = 'SELECT id FROM chats WHERE is_active = 0'
+            cursor.execute(f'DELETE FROM messages WHERE chat_id IN ({deleted})')
+            cursor.execute(f'DELETE FROM documents WHERE chat_id IN ({deleted})')
+            cursor.execute('DELETE FROM chats WHERE is_active = 0')
+            return cursor.rowcount
\ No newline at end of file
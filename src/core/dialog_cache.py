@@ -0,0 +1,198 @@
+# src/core/dialog_cache.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class DialogCache:
+    """AsyncLangGraphDialog örnekleri için boyut, bellek ve boşta kalma sınırlı LRU önbellek.
+
+    Önbellekten çıkarılan diyaloglar ConversationState'lerini diske yazar ve
+    bir sonraki WebSocket bağlantısında aynı dosyadan geri yüklenir.
+    """
+
+    def __init__(self, max_size: int, max_memory_mb: float, idle_timeout: float,
+                 state_path_for: Callable[[str], Path]):
+        self.max_size = max_size
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.idle_timeout = idle_timeout
+        self.state_path_for = state_path_for
+
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._active: Dict[str, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "spills": 0, "restores": 0}
+
+    def __contains__(self, chat_id: str) -> bool:
+        return chat_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, chat_id: str):
+        """Diyaloğu döner ve en son kullanılan olarak işaretler"""
+        dialog = self._entries.get(chat_id)
+        if dialog is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        self._touch(chat_id)
+        return dialog
+
+    def peek(self, chat_id: str):
+        """Diyaloğu LRU sırasını ve isabet sayaçlarını değiştirmeden döner (bildirimler için)"""
+        return self._entries.get(chat_id)
+
+    def put(self, chat_id: str, dialog):
+        """Diyaloğu önbelleğe ekler ve sınırları aşan eski diyalogları çıkarır"""
+        self._entries[chat_id] = dialog
+        self._touch(chat_id)
+        self._enforce_limits()
+
+    def acquire(self, chat_id: str):
+        """Aktif bağlantı sayacını artırır - aktif diyaloglar çıkarılmaz"""
+        self._active[chat_id] = self._active.get(chat_id, 0) + 1
+        self._touch(chat_id)
+
+    def release(self, chat_id: str):
+        """Aktif bağlantı sayacını azaltır"""
+        count = self._active.get(chat_id, 0) - 1
+        if count > 0:
+            self._active[chat_id] = count
+        else:
+            self._active.pop(chat_id, None)
+        self._touch(chat_id)
+
+    def discard(self, chat_id: str):
+        """Diyaloğu diske yazmadan kaldırır (ör. sohbet silindiğinde)"""
+        dialog = self._entries.pop(chat_id, None)
+        self._last_used.pop(chat_id, None)
+        self._active.pop(chat_id, None)
+        if dialog is not None:
+            self._close(dialog)
+        try:
+            self.state_path_for(chat_id).unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Diyalog durum dosyası silinemedi ({chat_id}): {e}")
+
+    def restore(self, chat_id: str, dialog) -> bool:
+        """Diske yazılmış durumu varsa diyaloğa geri yükler ve dosyayı siler"""
+        state_path = self.state_path_for(chat_id)
+        if not state_path.exists():
+            return False
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            dialog.restore_state(data)
+            # Tek seferlik: eski durum (ör. bekleyen test sorusu) sonraki soğuk başlangıçlarda yeniden uygulanmasın
+            state_path.unlink(missing_ok=True)
+            self._stats["restores"] += 1
+            logger.info(f"♻️ Diyalog durumu diskten geri yüklendi - Chat: {chat_id}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Diyalog durumu geri yükleme hatası ({chat_id}): {e}")
+            return False
+
+    def evict(self, chat_id: str) -> bool:
+        """Diyaloğu durumunu diske yazarak önbellekten çıkarır"""
+        if self._is_busy(chat_id):
+            return False
+        dialog = self._entries.pop(chat_id, None)
+        self._last_used.pop(chat_id, None)
+        if dialog is None:
+            return False
+        self._spill(chat_id, dialog)
+        self._close(dialog)
+        self._stats["evictions"] += 1
+        logger.info(f"📤 Diyalog önbellekten çıkarıldı - Chat: {chat_id}")
+        return True
+
+    def sweep(self) -> int:
+        """Boşta kalma süresini aşan diyalogları çıkarır"""
+        now = time.monotonic()
+        expired = [
+            chat_id for chat_id, last_used in self._last_used.items()
+            if now - last_used > self.idle_timeout
+        ]
+        return sum(1 for chat_id in expired if self.evict(chat_id))
+
+    async def run_sweeper(self, interval: float):
+        """Arka planda periyodik olarak boşta kalan diyalogları temizler"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                evicted = self.sweep()
+                if evicted:
+                    logger.info(f"🧹 {evicted} boşta diyalog önbellekten çıkarıldı")
+            except Exception as e:
+                logger.error(f"❌ Diyalog önbellek temizleme hatası: {e}")
+
+    def memory_usage(self) -> int:
+        """Önbellekteki diyalogların tahmini toplam bellek kullanımı (byte)"""
+        return sum(self._footprint(dialog) for dialog in self._entries.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "active": sum(self._active.values()),
+            "memory_bytes": self.memory_usage(),
+            "max_memory_bytes": self.max_memory_bytes,
+        }
+
+    # --- İç yardımcılar ---
+
+    def _touch(self, chat_id: str):
+        self._last_used[chat_id] = time.monotonic()
+        if chat_id in self._entries:
+            self._entries.move_to_end(chat_id)
+
+    def _is_busy(self, chat_id: str) -> bool:
+        if self._active.get(chat_id, 0) > 0:
+            return True
+        dialog = self._entries.get(chat_id)
+        return bool(dialog is not None and getattr(dialog, "is_busy", False))
+
+    def _eviction_candidates(self):
+        # En eski kullanılandan başlayarak meşgul olmayanlar
+        return [chat_id for chat_id in self._entries if not self._is_busy(chat_id)]
+
+    def _enforce_limits(self):
+        for chat_id in self._eviction_candidates():
+            if len(self._entries) <= self.max_size and self.memory_usage() <= self.max_memory_bytes:
+                break
+            self.evict(chat_id)
+
+    def _footprint(self, dialog) -> int:
+        try:
+            return dialog.estimate_memory_usage()
+        except Exception:
+            return 0
+
+    def _spill(self, chat_id: str, dialog):
+        state_path = self.state_path_for(chat_id)
+        tmp_path = state_path.with_suffix(state_path.suffix + ".tmp")
+        try:
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dialog.export_state(), f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, state_path)
+            self._stats["spills"] += 1
+        except Exception as e:
+            logger.error(f"❌ Diyalog durumu diske yazılamadı ({chat_id}): {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _close(self, dialog):
+        try:
+            dialog.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Diyalog kapatma hatası: {e}")
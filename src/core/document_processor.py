@@ -1,7 +1,61 @@
+import codecs
+import io
 import os
-from typing import Optional
-from .ocr_processor import HandwritingOCR, is_image_file, supported_image_formats
-from docx import Document
+import re
+from typing import Any, Dict, List, Optional
+
+from .extraction_cache import extraction_cache, file_hash
+
+# OCR (torch/transformers/cv2) ve python-docx yalnızca ihtiyaç olduğunda import edilir.
+# Görüntü uzantıları burada tutulur ki format kontrolü OCR yığınını yüklemesin.
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif', '.webp']
+
+TXT_SNIFF_BYTES = 64 * 1024
+# UTF-8 değilse Türkçe metinler için önce Windows-1254 denenir; latin-1 her baytı kabul eder (son çare)
+TXT_FALLBACK_ENCODINGS = ['cp1254', 'latin-1']
+_HEADING_STYLE = re.compile(r'^(?:heading|başlık)\s*(\d+)$', re.IGNORECASE)
+
+
+def make_block(kind: str, text: str, **meta) -> Dict[str, Any]:
+    """Chunker'ın kullandığı yapısal blok: type = heading | paragraph | table | page"""
+    return {"type": kind, "text": text, **meta}
+
+
+def blocks_to_text(blocks: List[Dict[str, Any]]) -> str:
+    return "\n".join(block["text"] for block in blocks)
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """Dosyanın ilk baytlarından kodlamayı tek seferde tahmin eder (dosya tekrar tekrar okunmaz)"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # final=False: örneğin sonunda yarım kalan çok baytlı karakter hata sayılmaz
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    for encoding in TXT_FALLBACK_ENCODINGS:
+        try:
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+
+def _heading_level(style_name: str) -> int:
+    if style_name == 'Title':
+        return 1
+    match = _HEADING_STYLE.match(style_name.strip())
+    return int(match.group(1)) if match else 0
+
+
+def _cell_text(tc, doc) -> str:
+    from docx.table import _Cell
+    return " ".join(_Cell(tc, doc).text.split())
 
 
 class DocumentProcessor:
@@ -13,17 +67,45 @@ class DocumentProcessor:
     def _init_ocr(self):
         """OCR processor'ı lazy loading ile başlat"""
         if self.ocr_processor is None:
+            from .ocr_processor import HandwritingOCR
             self.ocr_processor = HandwritingOCR()
         return self.ocr_processor
     
     @staticmethod
     def read_document(file_path: str) -> str:
-        """Döküman dosyasını oku ve metin olarak döndür"""
+        """Döküman dosyasını oku ve metin olarak döndür (aynı içerik daha önce okunduysa önbellekten)"""
+        return blocks_to_text(DocumentProcessor.read_blocks(file_path))
+    
+    @staticmethod
+    def read_blocks(file_path: str, digest: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Dökümanı yapısal bloklar halinde oku: [{"type", "text", ...meta}] (chunker başlık/sayfa bilgisini kullanır).
+
+        digest: yükleme sırasında hesaplanmış sha256 varsa dosya yeniden özetlenmez.
+        """
         try:
             if not os.path.exists(file_path):
                 print(f"❌ Dosya bulunamadı: {file_path}")
-                return ""
+                return []
             
+            digest = digest or file_hash(file_path)
+            cached = extraction_cache.get_document(digest, "text")
+            if cached is not None:
+                print(f"♻️ Çıkarma önbelleğinden okundu: {os.path.basename(file_path)} ({len(cached['blocks'])} blok)")
+                return cached["blocks"]
+            
+            blocks = DocumentProcessor._read_uncached(file_path)
+            if any(block["text"].strip() for block in blocks):
+                extraction_cache.put_document(digest, "text", {"blocks": blocks})
+            return blocks
+                
+        except Exception as e:
+            print(f"❌ Dosya okuma hatası: {e}")
+            return []
+    
+    @staticmethod
+    def _read_uncached(file_path: str) -> List[Dict[str, Any]]:
+        """Uzantıya göre uygun okuyucuyu çağırır"""
+        try:
             file_ext = os.path.splitext(file_path)[1].lower()
             print(f"📖 Dosya türü: {file_ext}")
             
@@ -35,92 +117,111 @@ class DocumentProcessor:
                 return DocumentProcessor._read_docx(file_path)
             else:
                 print(f"❌ Desteklenmeyen dosya formatı: {file_ext}")
-                return ""
+                return []
                 
         except Exception as e:
             print(f"❌ Dosya okuma hatası: {e}")
-            return ""
+            return []
     
     @staticmethod
-    def _read_txt(file_path: str) -> str:
-        """TXT dosyasını oku"""
+    def _read_txt(file_path: str) -> List[Dict[str, Any]]:
+        """TXT dosyasını tek geçişte oku: kodlama ilk baytlardan tahmin edilir, dosya parça parça akıtılır"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            print(f"✅ TXT dosyası okundu: {len(content)} karakter")
-            return content
-        except UnicodeDecodeError:
-            # Farklı encoding'leri dene
-            encodings = ['latin-1', 'cp1252', 'iso-8859-1']
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    print(f"✅ TXT dosyası okundu ({encoding}): {len(content)} karakter")
-                    return content
-                except:
-                    continue
-            print("❌ TXT dosyası hiçbir encoding ile okunamadı")
-            return ""
+            with open(file_path, 'rb') as raw:
+                encoding = sniff_encoding(raw.read(TXT_SNIFF_BYTES))
+                raw.seek(0)
+                # Örnekten sonra gelen bozuk bayt dosyayı yeniden okutmaz, '�' ile değiştirilir
+                stream = io.TextIOWrapper(raw, encoding=encoding, errors='replace', newline=None)
+                blocks = []
+                paragraph: List[str] = []
+                for line in stream:
+                    if line.strip():
+                        paragraph.append(line.rstrip('\n'))
+                    elif paragraph:
+                        blocks.append(make_block('paragraph', '\n'.join(paragraph)))
+                        paragraph = []
+                if paragraph:
+                    blocks.append(make_block('paragraph', '\n'.join(paragraph)))
+            
+            chars = sum(len(block['text']) for block in blocks)
+            print(f"✅ TXT dosyası okundu ({encoding}): {len(blocks)} paragraf, {chars} karakter")
+            return blocks
+        except Exception as e:
+            print(f"❌ TXT okuma hatası: {e}")
+            return []
     
     @staticmethod
-    def _read_pdf(file_path: str) -> str:
-        """PDF dosyasını oku"""
+    def _read_pdf(file_path: str) -> List[Dict[str, Any]]:
+        """PDF dosyasını oku - her sayfa bir blok"""
         try:
             import PyPDF2
             with open(file_path, 'rb') as f:
                 reader = PyPDF2.PdfReader(f)
-                text = ""
+                blocks = []
                 
                 print(f"📄 PDF sayfa sayısı: {len(reader.pages)}")
                 
                 for i, page in enumerate(reader.pages):
                     try:
-                        page_text = page.extract_text()
-                        text += page_text + "\n"
-                        print(f"✅ Sayfa {i+1} okundu")
+                        blocks.append(make_block('page', page.extract_text() or "", page=i + 1))
                     except Exception as e:
                         print(f"⚠️  Sayfa {i+1} okunamadı: {e}")
                         continue
                 
-                print(f"✅ PDF dosyası okundu: {len(text)} karakter")
-                return text
+                print(f"✅ PDF dosyası okundu: {sum(len(b['text']) for b in blocks)} karakter")
+                return blocks
                 
         except ImportError:
             print("❌ PyPDF2 kütüphanesi yüklü değil. Yüklemek için: pip install PyPDF2")
-            return ""
+            return []
         except Exception as e:
             print(f"❌ PDF okuma hatası: {e}")
-            return ""
+            return []
     
     @staticmethod
-    def _read_docx(file_path: str) -> str:
-        """DOCX dosyasını oku"""
+    def _read_docx(file_path: str) -> List[Dict[str, Any]]:
+        """DOCX gövdesini belge sırasıyla oku - paragraflar ve tablolar araya girmiş halde, başlık/stil bilgisiyle"""
         try:
+            from docx import Document
+            from docx.table import Table
+            from docx.text.paragraph import Paragraph
             doc = Document(file_path)
-            text = ""
+            blocks = []
             
-            print(f"📄 DOCX paragraf sayısı: {len(doc.paragraphs)}")
-            
-            for i, paragraph in enumerate(doc.paragraphs):
-                text += paragraph.text + "\n"
-            
-            # Tabloları da oku
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
+            for element in doc.element.body.iterchildren():
+                tag = element.tag.rsplit('}', 1)[-1]
+                if tag == 'p':
+                    paragraph = Paragraph(element, doc)
+                    text = paragraph.text.strip()
+                    if not text:
+                        continue
+                    style = paragraph.style.name if paragraph.style is not None else ""
+                    level = _heading_level(style)
+                    if level:
+                        blocks.append(make_block('heading', text, style=style, level=level))
+                    else:
+                        blocks.append(make_block('paragraph', text, style=style))
+                elif tag == 'tbl':
+                    rows = []
+                    for row in Table(element, doc).rows:
+                        cells = []
+                        for cell in row.cells:
+                            # Birleştirilmiş hücreler python-docx'te tekrar döner
+                            if not cells or cells[-1] is not cell._tc:
+                                cells.append(cell._tc)
+                        rows.append(" | ".join(_cell_text(tc, doc) for tc in cells))
+                    if any(r.strip(" |") for r in rows):
+                        blocks.append(make_block('table', "\n".join(rows)))
             
-            print(f"✅ DOCX dosyası okundu: {len(text)} karakter")
-            return text
+            print(f"✅ DOCX dosyası okundu: {len(blocks)} blok, {sum(len(b['text']) for b in blocks)} karakter")
+            return blocks
             
         except ImportError:
             print("❌ python-docx kütüphanesi yüklü değil. Yüklemek için: pip install python-docx")
-            return ""
+            return []
         except Exception as e:
             print(f"❌ DOCX okuma hatası: {e}")
-            return ""
+            return []
     
     @staticmethod
     def validate_file(file_path: str, max_size_mb: int = 10) -> bool:
@@ -200,6 +301,8 @@ class DocumentProcessor:
             info = f"\n\n📷 OCR Bilgileri:\n"
             info += f"🔍 Yöntem: {result['method']}\n"
             info += f"📊 Güven: {result['confidence']}\n"
+            if result.get('line_count'):
+                info += f"📏 Satır sayısı: {result['line_count']}\n"
             info += f"📝 Karakter sayısı: {len(text)}\n"
             
             return text + info
@@ -223,10 +326,10 @@ class DocumentProcessor:
             return self.extract_text_from_docx(file_path)
         
         # YENİ: Görüntü dosyası kontrolü
-        elif is_image_file(file_path):
+        elif file_ext in IMAGE_EXTENSIONS:
             return self.extract_text_from_image(file_path)
         
         else:
-            supported_formats = ['.txt', '.pdf', '.docx', '.doc'] + supported_image_formats()
+            supported_formats = ['.txt', '.pdf', '.docx', '.doc'] + IMAGE_EXTENSIONS
             return f"❌ Desteklenmeyen dosya formatı: {file_ext}\n" \
                    f"Desteklenen formatlar: {', '.join(supported_formats)}"
\ No newline at end of file
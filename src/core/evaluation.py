@@ -0,0 +1,218 @@
+# src/core/evaluation.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import Config
+from .llm_governor import governor, EVALUATION
+from .grading import grade_open_ended_shortcut
+
+logger = logging.getLogger(__name__)
+
+# LLM'e ulaşılamazsa öğrencinin aleyhine karar verilmez (mevcut davranış)
+FALLBACK_TIMEOUT = "DOĞRU/YANLIŞ: Doğru\nPUAN: 70\nGERİ BİLDİRİM: Değerlendirme zaman aşımına uğradı, bu nedenle cevabınız geçici olarak doğru kabul edildi."
+FALLBACK_ERROR = "DOĞRU/YANLIŞ: Doğru\nPUAN: 70\nGERİ BİLDİRİM: Değerlendirme sırasında bir hata oluştu, bu nedenle cevabınız geçici olarak doğru kabul edildi."
+
+BATCH_PROMPT = """Sen bir eğitim uzmanısın. Aşağıdaki açık uçlu sorulara verilen öğrenci cevaplarını değerlendir.
+
+{items}
+
+**DEĞERLENDİRME KURALLARI:**
+- Eğer cevap temel kavramları doğru içeriyorsa "dogru": true ver
+- Tamamen yanlış veya ilgisiz cevaplar "dogru": false
+- Puan verirken: İçerik doğruluğu (%60), detay seviyesi (%25), açıklık (%15)
+- Geri bildirimde yapıcı ve teşvik edici ol, öğrencinin doğru yaptığı kısımları da belirt
+
+Sadece aşağıdaki formatta bir JSON listesi döndür, her cevap için bir eleman:
+[{{"id": <cevap numarası>, "dogru": true/false, "puan": <0-100>, "geri_bildirim": "<detaylı açıklama>"}}]"""
+
+# LLM "dogru" alanını bazen metin olarak döner ("false", "0"); bool("false") True olacağı için açıkça ayrıştırılır
+_TRUE_STRINGS = {"true", "evet", "doğru", "dogru", "1"}
+
+
+def _is_true(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUE_STRINGS
+
+
+ITEM_TEMPLATE = """### CEVAP {id}
+**SORU:** {question}
+**ÖĞRENCİNİN CEVABI:** {answer}
+**ÖRNEK CEVAP (Referans):** {sample}
+**DEĞERLENDİRME KRİTERLERİ:** {criteria}
+"""
+
+
+def format_evaluation(is_correct: bool, score: int, feedback: str) -> str:
+    """İstemcinin parseLLMEvaluation fonksiyonunun beklediği metin formatı"""
+    return f"DOĞRU/YANLIŞ: {'Doğru' if is_correct else 'Yanlış'}\nPUAN: {score}\nGERİ BİLDİRİM: {feedback}"
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+class ClassicAnswerEvaluator:
+    """Klasik soru cevaplarını toplu halde LLM ile değerlendirir.
+
+    Cevaplar küçük parçalara bölünüp paralel değerlendirilir, her sonuç hazır
+    olduğunda geri çağrı ile iletilir. Aynı soru için aynı cevap bir daha
+    LLM'e gönderilmez.
+    """
+
+    def __init__(self, cache_size: int = None, batch_size: int = None):
+        self.cache_size = cache_size or Config.EVALUATION_CACHE_SIZE
+        self.batch_size = batch_size or Config.EVALUATION_BATCH_SIZE
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {"evaluated": 0, "cache_hits": 0, "llm_calls": 0, "fallbacks": 0, "deterministic": 0}
+
+    async def evaluate_batch(self, items: List[Dict[str, Any]], llm,
+                             on_result: Callable[[Dict[str, Any], str, bool], Awaitable[None]]):
+        """items: [{"questionIndex", "question": {...}, "userAnswer"}] - on_result(item, evaluation, cached)"""
+        pending = []
+        for item in items:
+            shortcut = grade_open_ended_shortcut(item.get("question", {}), item.get("userAnswer", ""))
+            if shortcut is not None:
+                self.stats["deterministic"] += 1
+                await on_result(item, format_evaluation(shortcut["is_correct"], shortcut["score"], shortcut["feedback"]), False)
+                continue
+            cached = self._cache_get(self.cache_key(item.get("question", {}), item.get("userAnswer", "")))
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                await on_result(item, cached, True)
+            else:
+                pending.append(item)
+
+        chunks = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        await asyncio.gather(*(self._evaluate_chunk(chunk, llm, on_result) for chunk in chunks))
+
+    async def evaluate_prompt(self, prompt: str, llm) -> str:
+        """Tek soruluk eski istek formatı - hazır prompt ile değerlendirir (önbellekli)"""
+        key = "prompt:" + hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        from langchain_core.messages import HumanMessage
+
+        self.stats["llm_calls"] += 1
+        async with governor.slot(EVALUATION):
+            response = await llm.ainvoke([HumanMessage(content=prompt)])
+        evaluation = response.content if hasattr(response, "content") else str(response)
+        self.stats["evaluated"] += 1
+        self._cache_put(key, evaluation)
+        return evaluation
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cache_size": len(self._cache)}
+
+    @staticmethod
+    def cache_key(question: Dict[str, Any], user_answer: str) -> str:
+        parts = [
+            question.get("soru", ""),
+            question.get("ornek_cevap") or question.get("cevap") or "",
+            question.get("degerlendirme_kriterleri", ""),
+            user_answer,
+        ]
+        return hashlib.sha256("\x1f".join(_normalize(p) for p in parts).encode("utf-8")).hexdigest()
+
+    # --- İç yardımcılar ---
+
+    async def _evaluate_chunk(self, chunk: List[Dict[str, Any]], llm, on_result):
+        try:
+            results = await asyncio.wait_for(self._call_llm(chunk, llm), timeout=Config.EVALUATION_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"⏰ Toplu değerlendirme zaman aşımı ({len(chunk)} cevap)")
+            results, fallback = {}, FALLBACK_TIMEOUT
+        except Exception as e:
+            logger.error(f"❌ Toplu değerlendirme hatası ({len(chunk)} cevap): {e}")
+            results, fallback = {}, FALLBACK_ERROR
+        else:
+            fallback = FALLBACK_ERROR
+
+        missing = []
+        for position, item in enumerate(chunk):
+            evaluation = results.get(position)
+            if evaluation is None:
+                missing.append(item)
+                continue
+            self.stats["evaluated"] += 1
+            self._cache_put(self.cache_key(item.get("question", {}), item.get("userAnswer", "")), evaluation)
+            await on_result(item, evaluation, False)
+
+        if missing and len(missing) < len(chunk):
+            # Model bazı cevapları atladıysa yalnızca onlar tekrar sorulur
+            await self._evaluate_chunk(missing, llm, on_result)
+            return
+        for item in missing:
+            self.stats["fallbacks"] += 1
+            await on_result(item, fallback, False)
+
+    async def _call_llm(self, chunk: List[Dict[str, Any]], llm) -> Dict[int, str]:
+        """Tek LLM çağrısıyla parçadaki tüm cevapları değerlendirir; {parça içi sıra: değerlendirme} döner"""
+        from langchain_core.messages import HumanMessage
+
+        blocks = []
+        for position, item in enumerate(chunk):
+            question = item.get("question", {})
+            blocks.append(ITEM_TEMPLATE.format(
+                id=position + 1,
+                question=question.get("soru", ""),
+                answer=item.get("userAnswer", ""),
+                sample=question.get("ornek_cevap") or question.get("cevap") or "Örnek cevap belirtilmemiş",
+                criteria=question.get("degerlendirme_kriterleri") or "Genel değerlendirme kriterleri kullanılacak",
+            ))
+        prompt = BATCH_PROMPT.format(items="\n".join(blocks))
+
+        self.stats["llm_calls"] += 1
+        async with governor.slot(EVALUATION):
+            response = await llm.ainvoke([HumanMessage(content=prompt)])
+        content = response.content if hasattr(response, "content") else str(response)
+        return self._parse_batch_response(content, len(chunk))
+
+    @staticmethod
+    def _parse_batch_response(content: str, count: int) -> Dict[int, str]:
+        cleaned = content.strip()
+        match = re.search(r"\[.*\]", cleaned, re.DOTALL)
+        if match:
+            cleaned = match.group(0)
+        try:
+            parsed = json.loads(cleaned)
+        except json.JSONDecodeError:
+            logger.warning("⚠️ Toplu değerlendirme yanıtı JSON değil")
+            return {}
+
+        results = {}
+        for entry in parsed if isinstance(parsed, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                position = int(entry.get("id")) - 1
+                score = max(0, min(100, int(entry.get("puan", 0))))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= position < count:
+                is_correct = _is_true(entry.get("dogru")) or score >= 70
+                results[position] = format_evaluation(is_correct, score, str(entry.get("geri_bildirim", "")).strip())
+        return results
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key: str, value: str):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+classic_evaluator = ClassicAnswerEvaluator()
@@ -0,0 +1,152 @@
+# src/core/extraction_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(file_path: str) -> str:
+    """Ham dosya içeriğinin sha256 özeti (dosya adı ve sohbetten bağımsız)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_fingerprint() -> str:
+    """Çıkarma sonucunu etkileyen ayarlar - biri değişirse eski kayıtlar kullanılmaz"""
+    settings = {
+        "version": Config.EXTRACTOR_VERSION,
+        "ocr_models": Config.OCR_MODELS,
+        "ocr_quantize": Config.OCR_QUANTIZE,
+        "ocr_num_beams": Config.OCR_NUM_BEAMS,
+        "ocr_max_length": Config.OCR_MAX_LENGTH,
+        "ocr_segment_lines": Config.OCR_SEGMENT_LINES,
+        "ocr_fallback_confidence": Config.OCR_FALLBACK_CONFIDENCE,
+        "ocr_pdf_enabled": Config.OCR_PDF_ENABLED,
+        "ocr_pdf_min_page_chars": Config.OCR_PDF_MIN_PAGE_CHARS,
+        "ocr_pdf_dpi": Config.OCR_PDF_DPI,
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+class ExtractionCache:
+    """Çıkarılmış belge metni ve sayfa bazlı OCR çıktısı için disk önbelleği.
+
+    Anahtar ham dosya özeti + ayar parmak izidir; aynı dosya başka bir
+    sohbete yüklense de yeniden okunmaz. Kayıtlar tek tek JSON dosyasıdır,
+    okundukça mtime güncellenir ve boyut sınırı aşılınca en eski kullanılanlar silinir.
+    """
+
+    def __init__(self, directory: str = None, max_mb: float = None):
+        self.directory = Path(directory or Config.EXTRACTION_CACHE_DIR)
+        self.max_bytes = int((max_mb or Config.EXTRACTION_CACHE_MAX_MB) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.stats = {
+            "document_hits": 0, "document_misses": 0,
+            "page_hits": 0, "page_misses": 0,
+            "writes": 0, "evictions": 0,
+        }
+
+    def document_key(self, digest: str, extractor: str) -> str:
+        return f"{digest}-{extractor}-{settings_fingerprint()}"
+
+    def page_key(self, digest: str, page_index: int) -> str:
+        return f"{digest}-page-{settings_fingerprint()}-p{page_index}"
+
+    def get_document(self, digest: str, extractor: str) -> Optional[Dict[str, Any]]:
+        """extractor: 'text' (DocumentProcessor.read_document) veya 'ocr' (görüntü/taranmış PDF hattı)"""
+        return self._get(self.document_key(digest, extractor), "document")
+
+    def put_document(self, digest: str, extractor: str, data: Dict[str, Any]):
+        self._put(self.document_key(digest, extractor), data)
+
+    def get_page(self, digest: str, page_index: int) -> Optional[Dict[str, Any]]:
+        return self._get(self.page_key(digest, page_index), "page")
+
+    def put_page(self, digest: str, page_index: int, data: Dict[str, Any]):
+        self._put(self.page_key(digest, page_index), data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["document_hits"] + self.stats["document_misses"]
+        return {
+            **self.stats,
+            "document_hit_rate": round(self.stats["document_hits"] / lookups, 3) if lookups else None,
+            "size_mb": round(self._size() / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+        }
+
+    # --- İç yardımcılar ---
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _get(self, key: str, kind: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)  # LRU için son kullanım zamanı
+        except FileNotFoundError:
+            self.stats[f"{kind}_misses"] += 1
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Bozuk çıkarma önbelleği kaydı siliniyor ({path.name}): {e}")
+            path.unlink(missing_ok=True)
+            self.stats[f"{kind}_misses"] += 1
+            return None
+        self.stats[f"{kind}_hits"] += 1
+        return data
+
+    def _put(self, key: str, data: Dict[str, Any]):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            payload = json.dumps(data, ensure_ascii=False)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ Çıkarma önbelleğine yazılamadı: {e}")
+            return
+        with self._lock:
+            self.stats["writes"] += 1
+            if self._total_bytes is None:
+                self._size()  # İlk yazımda dizin taranır (yeni kayıt dahil)
+            else:
+                self._total_bytes += len(payload.encode("utf-8")) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _size(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self.directory.glob("*.json")) if self.directory.exists() else 0
+        return self._total_bytes
+
+    def _evict(self):
+        """Kilit altında çağrılır: sınır altına inene kadar en uzun süredir kullanılmayan kayıtları siler"""
+        files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            self.stats["evictions"] += 1
+        self._total_bytes = total
+        logger.info(f"🧹 Çıkarma önbelleği küçültüldü: {total / (1024 * 1024):.1f}MB")
+
+
+extraction_cache = ExtractionCache()
@@ -0,0 +1,205 @@
+# src/core/grading.py
+
+import json
+import logging
+import re
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# test_solver.js soruları bu sırayla düz listeye çevirir; question_index buna göre gelir
+QUESTION_TYPES = ("coktan_secmeli", "klasik", "bosluk_doldurma", "dogru_yanlis")
+OBJECTIVE_TYPES = {"coktan_secmeli", "bosluk_doldurma", "dogru_yanlis"}
+
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_ASCII_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+# Boşluk doldurmada "takım" ile "takım'dır" / "takım dır" aynı kabul edilsin. Yalnızca ayrı son kelime
+# olarak aranır (kesme işareti normalize_answer'da boşluğa döner): "kültür" -> "kül" olmasın
+_COPULA_WORD = re.compile(r"^[dt][iu]r(lar|ler)?$")
+# Bundan kısa kelimelerde tek harf anlamı değiştirir (Mart/Martı) - tam eşleşme gerekir
+_FUZZY_MIN_TOKEN_CHARS = 5
+
+_TRUE_VALUES = {"true", "dogru", "evet", "d", "1"}
+_FALSE_VALUES = {"false", "yanlis", "hayir", "y", "0"}
+
+
+def normalize_answer(text: Any) -> str:
+    """Türkçe büyük/küçük harf kurallarıyla küçültür, noktalama ve fazla boşlukları temizler"""
+    text = str(text if text is not None else "").translate(_TURKISH_LOWER).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _fold(text: str) -> str:
+    """Türkçe karakterler olmadan yazılmış cevaplar için (ı->i, ş->s ...)"""
+    return text.translate(_ASCII_FOLD)
+
+
+def _variants(text: str) -> set:
+    """Kelime dizileri: cevabın kendisi ve varsa sondaki ek-fiil kelimesi atılmış hali"""
+    tokens = tuple(_fold(normalize_answer(text)).split())
+    if not tokens:
+        return set()
+    variants = {tokens}
+    if len(tokens) > 1 and _COPULA_WORD.match(tokens[-1]):
+        variants.add(tokens[:-1])
+    return variants
+
+
+def _token_similarity(user_token: str, candidate_token: str) -> Optional[float]:
+    """Kelime benzerliği; sayı içeren veya kısa kelimeler tam eşleşmezse None (1923/1924, Mart/Martı)"""
+    if user_token == candidate_token:
+        return 1.0
+    if any(ch.isdigit() for ch in user_token + candidate_token):
+        return None
+    if min(len(user_token), len(candidate_token)) < _FUZZY_MIN_TOKEN_CHARS:
+        return None
+    return SequenceMatcher(None, user_token, candidate_token).ratio()
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    normalized = _fold(normalize_answer(value))
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    return None
+
+
+def match_text(user_answer: Any, accepted: List[Any], fuzzy_threshold: float = None) -> Optional[str]:
+    """Kabul edilen cevaplardan biriyle eşleşirse yöntemi ('exact' / 'fuzzy') döner"""
+    threshold = fuzzy_threshold or Config.GRADING_FUZZY_THRESHOLD
+    user_variants = _variants(user_answer)
+    if not user_variants:
+        return None
+    fuzzy = False
+    for candidate in accepted:
+        candidate_variants = _variants(candidate)
+        if user_variants & candidate_variants:
+            return "exact"
+        # Yazım hatası toleransı kelime kelime uygulanır: her kelime ayrı ayrı eşiği geçmeli
+        for user_tokens in user_variants:
+            for candidate_tokens in candidate_variants:
+                if len(user_tokens) != len(candidate_tokens):
+                    continue
+                scores = [_token_similarity(u, c) for u, c in zip(user_tokens, candidate_tokens)]
+                if all(score is not None and score >= threshold for score in scores):
+                    fuzzy = True
+    return "fuzzy" if fuzzy else None
+
+
+def grade_question(question: Dict[str, Any], question_type: str, user_answer: Any) -> Optional[Dict[str, Any]]:
+    """Objektif soruyu kayıtlı doğru cevaba göre puanlar; açık uçlu sorular için None döner"""
+    if question_type not in OBJECTIVE_TYPES:
+        return None
+    if user_answer is None or (isinstance(user_answer, str) and not user_answer.strip()):
+        return {"is_correct": False, "correct_answer": question.get("dogru_cevap", ""), "method": "empty"}
+
+    correct = question.get("dogru_cevap", "")
+
+    if question_type == "coktan_secmeli":
+        options = question.get("secenekler") or {}
+        correct_key = normalize_answer(correct)
+        if normalize_answer(user_answer) == correct_key:
+            return {"is_correct": True, "correct_answer": correct, "method": "exact"}
+        # İstemci seçenek anahtarı yerine metnini göndermiş olabilir
+        option_text = options.get(correct) if isinstance(options, dict) else None
+        method = match_text(user_answer, [option_text]) if option_text else None
+        return {"is_correct": method is not None, "correct_answer": correct, "method": method or "no_match"}
+
+    if question_type == "dogru_yanlis":
+        expected, given = _to_bool(correct), _to_bool(user_answer)
+        if expected is None or given is None:
+            return None
+        return {"is_correct": expected == given, "correct_answer": "Doğru" if expected else "Yanlış", "method": "exact"}
+
+    accepted = [correct] + list(question.get("alternatif_cevaplar") or [])
+    method = match_text(user_answer, [a for a in accepted if a])
+    return {"is_correct": method is not None, "correct_answer": correct, "method": method or "no_match"}
+
+
+def flatten_questions(questions: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Kayıtlı test verisini test_solver.js ile aynı sırada düz listeye çevirir"""
+    if isinstance(questions, dict) and isinstance(questions.get("questions"), dict):
+        questions = questions["questions"]
+    flat = []
+    for question_type in QUESTION_TYPES:
+        for question in (questions or {}).get(question_type) or []:
+            if isinstance(question, dict) and question.get("soru"):
+                flat.append({**question, "type": question_type})
+    return flat
+
+
+def load_saved_tests(chat_dir: Path) -> List[Dict[str, Any]]:
+    test_file = Path(chat_dir) / "saved_tests.json"
+    if not test_file.exists():
+        return []
+    try:
+        with open(test_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Saved tests dosyası okunamadı: {e}")
+        return []
+
+
+def grade_test_results(saved_tests: List[Dict[str, Any]], results: List[Dict[str, Any]],
+                       test_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """İstemcinin gönderdiği sonuçları kayıtlı testteki cevaplara göre yeniden puanlar.
+
+    Objektif sorularda istemcinin is_correct bayrağı yerine sunucu kararı
+    kullanılır; sunucu yalnızca yazım hatası toleransıyla ('fuzzy') eşleştirdiyse
+    istemcinin kararı korunur. Klasik sorularda LLM değerlendirmesi (istemciden gelen) korunur.
+    Soru, test_id verilmişse o testte, yoksa soru metnine göre en yeni testlerde aranır.
+    """
+    by_text: Dict[str, Dict[str, Any]] = {}
+    indexed: List[Dict[str, Any]] = []
+    for test in saved_tests:
+        flat = flatten_questions(test.get("questions", {}))
+        if test_id and test.get("test_id") == test_id:
+            indexed = flat
+        for question in flat:
+            by_text[normalize_answer(question["soru"])] = question  # sonraki (daha yeni) test kazanır
+
+    graded = []
+    for result in results:
+        result = dict(result)
+        question = None
+        index = result.get("question_index")
+        if indexed and isinstance(index, int) and 0 <= index < len(indexed):
+            question = indexed[index]
+        if question is None or (result.get("question_text") and
+                                normalize_answer(result["question_text"]) != normalize_answer(question["soru"])):
+            question = by_text.get(normalize_answer(result.get("question_text", "")))
+
+        question_type = result.get("question_type") or (question or {}).get("type")
+        grade = grade_question(question, question_type, result.get("user_answer")) if question else None
+        if grade is None:
+            result["graded_by"] = "llm" if question_type == "klasik" else "client"
+        else:
+            # Benzerlik tek başına doğruluğu kanıtlamaz: fuzzy eşleşmede istemcinin kararı geçerli
+            if not (grade["method"] == "fuzzy" and "is_correct" in result):
+                if bool(result.get("is_correct")) != grade["is_correct"]:
+                    logger.info(f"⚖️ Soru {index}: istemci sonucu sunucu puanlamasıyla düzeltildi ({grade['method']})")
+                result["is_correct"] = grade["is_correct"]
+            result["correct_answer"] = grade["correct_answer"]
+            result["graded_by"] = "server"
+            result["match_method"] = grade["method"]
+        graded.append(result)
+    return graded
+
+
+def grade_open_ended_shortcut(question: Dict[str, Any], user_answer: Any) -> Optional[Dict[str, Any]]:
+    """Klasik soruda LLM'e gerek olmayan durumlar: çok kısa cevap veya örnek cevabın aynısı"""
+    answer = normalize_answer(user_answer)
+    if len(answer) < Config.GRADING_MIN_CLASSIC_CHARS:
+        return {"is_correct": False, "score": 0, "feedback": "Cevabınız çok kısa. Lütfen daha detaylı açıklama yapın."}
+    sample = normalize_answer(question.get("ornek_cevap") or question.get("cevap") or "")
+    if sample and SequenceMatcher(None, _fold(answer), _fold(sample)).ratio() >= 0.95:
+        return {"is_correct": True, "score": 100, "feedback": "Cevabınız örnek cevapla birebir örtüşüyor."}
+    return None
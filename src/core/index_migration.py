@@ -0,0 +1,337 @@
+# src/core/index_migration.py
+"""Vektör indeksi migration'ı - CHUNK_SIZE / CHUNK_OVERLAP / EMBEDDING_MODEL değişince sohbetleri yeniden indeksler.
+
+Her sohbet için yeni bir koleksiyon kurulur, dökümanlar kaynak dosyadan (çıkarma önbelleği
+sayesinde çoğunlukla yeniden okunmadan) parçalanıp toplu halde vektörleştirilir ve etkin
+koleksiyon dosyası atomik olarak değiştirilir. İlerleme kaydedildiği için yarıda kalan
+çalışma kaldığı yerden devam eder. Eski koleksiyon hemen silinmez; bir sonraki çalışmada
+kalan dökümanları etkin koleksiyona aktarılıp silinir.
+
+Sunucu kapalıyken çalıştırılmalıdır: Chroma aynı PersistentClient dizininin birden fazla
+süreçten açılmasını desteklemez (run.py, sunucu çalışıyorsa komutu reddeder).
+
+Kullanım (proje kök dizininden):
+    python run.py reindex --status
+    python run.py reindex [--chat <id> ...] [--force] [--keep-old]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+from .document_processor import make_block
+from .ingestion import extract_document_blocks, ocr_pool
+from .vector_store import VectorStore, index_version
+from . import resource_pool
+
+logger = logging.getLogger(__name__)
+
+# Parçaya özgü alanlar - döküman metadata'sı yeniden kurulurken atılır
+_CHUNK_KEYS = {"chunk_index", "chunk_id", "chunk_count", "section", "page", "index_version", "file_hash"}
+_CHROMA_WRITE_BATCH = 1000  # Chroma'nın tek çağrıdaki kayıt sınırının güvenli altı
+
+
+class MigrationState:
+    """Sohbet bazlı ilerleme kaydı (VECTOR_STORE_PATH/migration_state.json) - hedef sürüm değişirse sıfırlanır"""
+
+    def __init__(self, path: Path = None):
+        self.path = path or Path(Config.VECTOR_STORE_PATH) / Config.MIGRATION_STATE_FILENAME
+        self.data = {"index_version": index_version(), "chats": {}}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("index_version") == index_version():
+                self.data = saved
+            else:
+                # Hedef sürüm değişti: ilerleme sıfırlanır ama silinmeyi bekleyen eski koleksiyonlar unutulmaz
+                for chat_id, entry in saved.get("chats", {}).items():
+                    if entry.get("retired"):
+                        self.chat(chat_id)["retired"] = entry["retired"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Migration durumu okunamadı, baştan başlanıyor: {e}")
+
+    def chat(self, chat_id: str) -> Dict[str, Any]:
+        return self.data["chats"].setdefault(chat_id, {"status": "pending", "done": []})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _source_documents(collection) -> Dict[str, Dict[str, Any]]:
+    """Koleksiyondaki parçaları dökümanlara göre gruplar: file_hash -> {metadata, chunks}"""
+    records = collection.get(include=["documents", "metadatas"])
+    documents: Dict[str, Dict[str, Any]] = {}
+    for text, meta in zip(records["documents"], records["metadatas"]):
+        file_hash = meta.get("file_hash")
+        if not file_hash:
+            continue
+        doc = documents.setdefault(file_hash, {
+            "metadata": {k: v for k, v in meta.items() if k not in _CHUNK_KEYS},
+            "chunks": [],
+        })
+        doc["chunks"].append((meta.get("chunk_index", 0), text))
+    return documents
+
+
+def _document_blocks(doc: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+    """Kaynak dosya duruyorsa ondan (önbellekten), yoksa eski parçalardan bloklar üretir"""
+    meta = doc["metadata"]
+    path = meta.get("upload_path")
+    if path and os.path.exists(path):
+        blocks = extract_document_blocks(path, digest=meta.get("content_sha256"))
+        if any(block["text"].strip() for block in blocks):
+            return blocks, "source"
+    # Eski parçalar örtüşme içerir; yine de en azından yeni modelle vektörleştirilir
+    return [make_block("paragraph", text) for _, text in sorted(doc["chunks"])], "chunks"
+
+
+class IndexMigrator:
+    def __init__(self, force: bool = False, keep_old: bool = False, batch_chunks: int = None):
+        self.force = force
+        self.keep_old = keep_old
+        self.batch_chunks = batch_chunks or Config.MIGRATION_BATCH_CHUNKS
+        self.state = MigrationState()
+
+    def migrate_chat(self, chat_id: str) -> Dict[str, Any]:
+        vector_store = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id)
+        entry = self.state.chat(chat_id)
+        if entry.get("retired") and not self.keep_old:
+            self._drop_retired(vector_store, entry)
+        if self.force and entry["status"] == "done":
+            entry.update({"status": "pending", "collection": None, "done": []})
+        state = vector_store.index_state()
+        resuming = entry["status"] == "in_progress"
+        if not self.force and not resuming and (entry["status"] == "done" or state["stale_chunks"] == 0):
+            entry["status"] = "done"
+            self.state.save()
+            return {"chat_id": chat_id, "status": "up_to_date", "chunks": state["total_chunks"]}
+
+        start = time.perf_counter()
+        target = self._target_collection(vector_store, entry)
+        # Geçişten sonra vector_store.collection yeni koleksiyonu gösterir; eski koleksiyon ayrıca tutulur
+        try:
+            old_collection = vector_store.client.get_collection(entry.get("previous") or vector_store.collection.name)
+        except Exception:
+            old_collection = target  # Önceki çalışma eski koleksiyonu silmişti, taşınacak bir şey kalmadı
+        done = set(entry["done"])
+        stats = {"documents": 0, "chunks": 0, "from_chunks": 0, "embed_s": 0.0}
+
+        self._catch_up(vector_store, old_collection, target, entry, done, stats)
+        self._swap(vector_store, target.name, old_collection.name)
+        # Eski koleksiyon bir sonraki çalışmaya kadar tutulur: geçişten sonra ona düşen yazımlar orada aktarılır
+        if old_collection.name != target.name and old_collection.name not in entry.setdefault("retired", []):
+            entry["retired"].append(old_collection.name)
+        entry["status"] = "done"
+        entry["elapsed_s"] = round(time.perf_counter() - start, 2)
+        self.state.save()
+
+        elapsed = time.perf_counter() - start
+        result = {
+            "chat_id": chat_id,
+            "status": "migrated",
+            **stats,
+            "embed_s": round(stats["embed_s"], 2),
+            "elapsed_s": round(elapsed, 2),
+            "chunks_per_s": round(stats["chunks"] / elapsed, 1) if elapsed > 0 else None,
+        }
+        logger.info(f"🔁 {chat_id}: {stats['documents']} döküman, {stats['chunks']} parça, {elapsed:.1f}s")
+        return result
+
+    def _target_collection(self, vector_store: VectorStore, entry: Dict[str, Any]):
+        """Yarıda kalan çalışmanın koleksiyonuna devam eder, yoksa yenisini kurar"""
+        if entry.get("collection"):
+            try:
+                return vector_store.client.get_collection(entry["collection"])
+            except Exception:
+                logger.warning(f"⚠️ Yarım koleksiyon bulunamadı, baştan kuruluyor: {entry['collection']}")
+        # Kuşak numarası: pdf_documents_<chat>_v2, _v3... (Chroma ad sınırı 63 karakter, zaman damgası sığmıyor)
+        base = vector_store.base_collection_name
+        current = vector_store.collection.name[len(base):].lstrip("_v")
+        name = f"{base}_v{int(current) + 1 if current.isdigit() else 2}"
+        try:
+            vector_store.client.delete_collection(name)  # Durumu sıfırlanmış eski bir denemeden kalmış olabilir
+        except Exception:
+            pass
+        target = vector_store.client.get_or_create_collection(
+            name=name, metadata={"hnsw:space": "cosine", "index_version": index_version()}
+        )
+        entry.update({"status": "in_progress", "collection": name, "previous": vector_store.collection.name, "done": []})
+        self.state.save()
+        return target
+
+    def _drop_retired(self, vector_store: VectorStore, entry: Dict[str, Any]):
+        """Önceki çalışmalardan kalan eski koleksiyonlardaki eksik dökümanları etkin koleksiyona aktarır ve siler"""
+        active = vector_store.collection
+        present = {meta.get("file_hash") for meta in active.get(include=["metadatas"])["metadatas"]}
+        for name in list(entry["retired"]):
+            if name != active.name:
+                try:
+                    old = vector_store.client.get_collection(name)
+                except Exception:
+                    old = None  # Elle silinmiş
+                if old is not None:
+                    stats = {"documents": 0, "chunks": 0, "from_chunks": 0, "embed_s": 0.0}
+                    self._catch_up(vector_store, old, active, None, present, stats)
+                    if stats["documents"]:
+                        logger.info(f"🔁 {name}: geçişten sonra eklenmiş {stats['documents']} döküman aktarıldı")
+                    try:
+                        vector_store.client.delete_collection(name)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Eski koleksiyon silinemedi ({name}): {e}")
+                        continue
+            entry["retired"].remove(name)
+            self.state.save()
+
+    def _catch_up(self, vector_store: VectorStore, source, target, entry, done, stats):
+        """Kaynak koleksiyonda henüz taşınmamış döküman kalmayana kadar tekrarlar"""
+        while True:
+            pending = [(file_hash, doc) for file_hash, doc in _source_documents(source).items() if file_hash not in done]
+            if not pending:
+                return
+            self._migrate_documents(vector_store, target, pending, entry, done, stats)
+
+    def _migrate_documents(self, vector_store: VectorStore, target, pending, entry, done, stats):
+        # Metin çıkarma paylaşılan havuzda önden yürür, embedding ana thread'de toplu yapılır
+        executor = resource_pool.get_executor("ingestion")
+        results = executor.map(lambda item: (item[0], item[1], _document_blocks(item[1])), pending)
+
+        batch: List[Dict[str, Any]] = []
+        batch_hashes: List[str] = []
+        for file_hash, doc, (blocks, origin) in results:
+            chunks = vector_store.chunk_blocks(blocks, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP)
+            if not chunks:
+                logger.warning(f"⚠️ Parça üretilemedi, atlanıyor: {doc['metadata'].get('filename')}")
+                done.add(file_hash)
+                continue
+            batch.append(vector_store.build_records(file_hash, chunks, doc["metadata"]))
+            batch_hashes.append(file_hash)
+            stats["documents"] += 1
+            stats["from_chunks"] += origin == "chunks"
+            if sum(len(records["ids"]) for records in batch) >= self.batch_chunks:
+                self._write(vector_store, target, batch, stats)
+                self._checkpoint(entry, done, batch_hashes)
+                batch, batch_hashes = [], []
+
+        if batch:
+            self._write(vector_store, target, batch, stats)
+            self._checkpoint(entry, done, batch_hashes)
+
+    def _write(self, vector_store: VectorStore, target, batch: List[Dict[str, Any]], stats: Dict[str, Any]):
+        ids = [i for records in batch for i in records["ids"]]
+        documents = [d for records in batch for d in records["documents"]]
+        metadatas = [m for records in batch for m in records["metadatas"]]
+        start = time.perf_counter()
+        embeddings = vector_store.embed(documents)
+        stats["embed_s"] += time.perf_counter() - start
+        for i in range(0, len(ids), _CHROMA_WRITE_BATCH):
+            window = slice(i, i + _CHROMA_WRITE_BATCH)
+            target.upsert(ids=ids[window], documents=documents[window],
+                          embeddings=embeddings[window], metadatas=metadatas[window])
+        stats["chunks"] += len(ids)
+
+    def _checkpoint(self, entry: Optional[Dict[str, Any]], done: set, hashes: List[str]):
+        done.update(hashes)
+        if entry is not None:
+            entry["done"] = sorted(done)
+            self.state.save()
+
+    def _swap(self, vector_store: VectorStore, new_name: str, old_name: str):
+        """Etkin koleksiyon dosyasını atomik olarak değiştirir; açık VectorStore'lar sonraki erişimde geçer.
+
+        Yarıda kalan bir çalışmada dosya zaten yeni koleksiyonu gösteriyor olabilir - yeniden yazmak zararsızdır.
+        """
+        tmp_path = vector_store.pointer_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"collection": new_name, "previous": old_name, "index_version": index_version(),
+                       "migrated_at": datetime.now().isoformat()}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, vector_store.pointer_path)
+
+
+def _chat_ids(requested: Optional[List[str]]) -> List[str]:
+    from .chat_manager import ChatManager
+    known = list(ChatManager().chats_metadata.keys())
+    if not requested:
+        return known
+    missing = [cid for cid in requested if cid not in known]
+    if missing:
+        raise ValueError(f"Sohbet bulunamadı: {', '.join(missing)}")
+    return requested
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vektör indeksini güncel parçalama/embedding ayarlarıyla yeniden oluştur")
+    parser.add_argument("--chat", action="append", help="Sadece bu sohbet (tekrarlanabilir)")
+    parser.add_argument("--status", action="store_true", help="Sadece sürüm durumunu raporla")
+    parser.add_argument("--force", action="store_true", help="Güncel görünen sohbetleri de yeniden indeksle")
+    parser.add_argument("--keep-old", action="store_true", help="Önceki çalışmalardan kalan eski koleksiyonları silme")
+    args = parser.parse_args(argv)
+
+    try:
+        chat_ids = _chat_ids(args.chat)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"🔖 Hedef indeks sürümü: {index_version()}")
+    if args.status:
+        migrator_state = MigrationState()
+        for chat_id in chat_ids:
+            state = VectorStore(Config.VECTOR_STORE_PATH, chat_id=chat_id).index_state()
+            label = "karışık" if state["mixed"] else "eski" if state["stale_chunks"] else "güncel"
+            retired = migrator_state.data["chats"].get(chat_id, {}).get("retired")
+            print(f"   • {chat_id}: {label} ({state['current_chunks']}/{state['total_chunks']} parça güncel)"
+                  + (f", silinecek eski koleksiyon: {', '.join(retired)}" if retired else ""))
+        return 0
+
+    # Migration tek başına çalışır: embedding tüm çekirdekleri kullanabilir
+    if not Config.TORCH_NUM_THREADS:
+        Config.TORCH_NUM_THREADS = os.cpu_count() or 1
+    resource_pool.configure_torch_threads()
+
+    migrator = IndexMigrator(force=args.force, keep_old=args.keep_old)
+    start = time.perf_counter()
+    results, failures = [], []
+    try:
+        for chat_id in chat_ids:
+            try:
+                results.append(migrator.migrate_chat(chat_id))
+            except Exception as e:
+                logger.error(f"❌ {chat_id} migration hatası: {e}")
+                failures.append(chat_id)
+    except KeyboardInterrupt:
+        print("\n⏸️ Durduruldu - tekrar çalıştırınca kaldığı yerden devam eder")
+        return 130
+    finally:
+        ocr_pool.shutdown()
+        resource_pool.shutdown()
+
+    migrated = [r for r in results if r["status"] == "migrated"]
+    chunks = sum(r["chunks"] for r in migrated)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(migrated)} sohbet yeniden indekslendi, {len(results) - len(migrated)} zaten güncel")
+    print(f"📊 {sum(r['documents'] for r in migrated)} döküman, {chunks} parça, {elapsed:.1f}s "
+          f"({chunks / elapsed if elapsed > 0 else 0:.1f} parça/s, embedding {sum(r['embed_s'] for r in migrated):.1f}s)")
+    if migrated:
+        print("🗄️ Eski koleksiyonlar bir sonraki çalışmada (eksik dökümanlar aktarıldıktan sonra) silinecek")
+    rebuilt_from_chunks = sum(r["from_chunks"] for r in migrated)
+    if rebuilt_from_chunks:
+        print(f"⚠️ {rebuilt_from_chunks} döküman kaynak dosya olmadığı için eski parçalardan kuruldu")
+    for chat_id in failures:
+        print(f"❌ Başarısız: {chat_id}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+# src/core/ingestion.py
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import Config
+from .document_processor import DocumentProcessor, IMAGE_EXTENSIONS, blocks_to_text, make_block
+from .extraction_cache import extraction_cache, file_hash
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+# --- OCR işçi süreci tarafı (spawn ile başlatılan süreçlerde çalışır) ---
+
+_worker_ocr = None
+
+
+def _init_worker(torch_threads: int):
+    """Her işçi CPU'nun kendi payı kadar torch thread'i kullanır (aşırı abonelik olmasın).
+
+    TrOCR modelleri burada yüklenir ki ilk sayfa model yüklemesini OCR_PAGE_TIMEOUT içinde ödemesin.
+    """
+    if not Config.TORCH_NUM_THREADS:
+        Config.TORCH_NUM_THREADS = torch_threads
+    from . import resource_pool
+    resource_pool.warm_up(["ocr"])
+
+
+def _get_worker_ocr():
+    global _worker_ocr
+    if _worker_ocr is None:
+        from .ocr_processor import HandwritingOCR
+        _worker_ocr = HandwritingOCR()
+    return _worker_ocr
+
+
+def ocr_image_file(image_path: str) -> Dict[str, Any]:
+    """İşçi süreçte görüntü dosyasını OCR'dan geçirir"""
+    return _get_worker_ocr().extract_mixed_text(image_path)
+
+
+def ocr_pdf_page(pdf_path: str, page_index: int, dpi: int) -> Dict[str, Any]:
+    """İşçi süreçte PDF sayfasını rasterleştirip OCR'dan geçirir"""
+    import numpy as np
+    import pypdfium2 as pdfium
+    from .ocr_processor import enhance_image, page_lines
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        image = pdf[page_index].render(scale=dpi / 72).to_pil()
+    finally:
+        pdf.close()
+    gray = enhance_image(np.array(image.convert("L")))
+    return _get_worker_ocr().recognize_mixed(page_lines(gray))
+
+
+# --- Ana süreç tarafı ---
+
+class OCRWorkerPool:
+    """Sınırlı sayıda OCR süreci - ağır çıkarım web sunucusunun GIL'ini ve belleğini paylaşmaz.
+
+    Havuz ilk taramalı belgede başlatılır. Zaman aşımına uğrayan sayfanın
+    sonucu beklenmez (işçi sayfayı arka planda bitirir); çöken havuz bir
+    sonraki istekte yeniden kurulur. Yeni havuz ilk sonucunu verene kadar
+    beklemelere OCR_WORKER_STARTUP_TIMEOUT eklenir (süreç başlatma + model yükleme).
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or Config.OCR_PROCESS_WORKERS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._origins: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()  # future -> onu üreten havuz
+        self._ready_executor: Optional[ProcessPoolExecutor] = None  # En az bir sonuç vermiş (ısınmış) havuz
+        self._page_times: List[float] = []
+        self.stats = {"pages": 0, "timeouts": 0, "errors": 0, "restarts": 0}
+
+    def submit(self, fn, *args):
+        # Havuz, kimsenin beklemediği (zaman aşımına uğramış) bir sayfada çökmüş olabilir: bir kez yeniden kur
+        for attempt in range(2):
+            with self._lock:
+                if self._executor is None:
+                    torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(torch_threads,),
+                    )
+                    logger.info(f"🏭 OCR işçi havuzu başlatıldı ({self.workers} süreç, süreç başı {torch_threads} thread)")
+                executor = self._executor
+                try:
+                    future = executor.submit(fn, *args)
+                    self._origins[future] = executor
+                    return future
+                except BrokenProcessPool:
+                    if attempt:
+                        raise
+            logger.warning("⚠️ OCR işçi havuzu çökmüş, yeniden kuruluyor")
+            self._reset(executor)
+
+    def wait(self, future, timeout: float) -> Dict[str, Any]:
+        """Sonucu bekler; hata ve zaman aşımını {'error': ...} olarak döner"""
+        start = time.perf_counter()
+        with self._lock:
+            origin = self._origins.get(future)
+        if origin is not self._ready_executor:
+            timeout = max(0.0, timeout) + Config.OCR_WORKER_STARTUP_TIMEOUT
+        try:
+            result = future.result(timeout=max(0.0, timeout))
+        except FutureTimeoutError:
+            future.cancel()
+            self.stats["timeouts"] += 1
+            return {"text": "", "error": "timeout"}
+        except BrokenProcessPool as e:
+            self.stats["errors"] += 1
+            with self._lock:
+                broken = self._origins.get(future)
+            self._reset(broken)
+            return {"text": "", "error": f"OCR süreci çöktü: {e}"}
+        except Exception as e:
+            self.stats["errors"] += 1
+            return {"text": "", "error": str(e)}
+        self.stats["pages"] += 1
+        self._ready_executor = origin
+        self._page_times.append(time.perf_counter() - start)
+        del self._page_times[:-200]
+        if result.get("confidence") == "error":
+            self.stats["errors"] += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        samples = self._page_times
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "running": self._executor is not None,
+            "avg_page_wait_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else None,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _reset(self, broken: Optional[ProcessPoolExecutor]):
+        """Çöken havuzu kapatır - aynı çöküşten gelen diğer sayfalar, yeniden kurulmuş havuza dokunmaz"""
+        with self._lock:
+            if self._executor is not None and self._executor is broken:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.stats["restarts"] += 1
+
+
+ocr_pool = OCRWorkerPool()
+
+
+def get_stats() -> Dict[str, Any]:
+    return {"ocr_pool": ocr_pool.get_stats(), "cache": extraction_cache.get_stats()}
+
+
+def extract_document_text(file_path: str, progress: Optional[ProgressCallback] = None) -> str:
+    """Dosyadan düz metin çıkarır (bkz. extract_document_blocks)"""
+    return blocks_to_text(extract_document_blocks(file_path, progress))
+
+
+def extract_document_blocks(file_path: str, progress: Optional[ProgressCallback] = None,
+                            digest: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Dosyadan yapısal bloklar çıkarır; görüntüler ve metin katmanı olmayan PDF sayfaları OCR'dan geçer.
+
+    Aynı içerik (ve aynı OCR ayarları) daha önce işlendiyse sonuç çıkarma önbelleğinden gelir.
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext not in IMAGE_EXTENSIONS and file_ext != ".pdf":
+        return DocumentProcessor.read_blocks(file_path, digest=digest)
+
+    try:
+        digest = digest or file_hash(file_path)
+    except OSError as e:
+        logger.error(f"❌ Dosya okunamadı ({os.path.basename(file_path)}): {e}")
+        return []
+
+    cached = extraction_cache.get_document(digest, "ocr")
+    if cached is not None:
+        pages = len(cached["blocks"])
+        chars = sum(len(block["text"]) for block in cached["blocks"])
+        _report(progress, stage="cache", page=pages, total_pages=pages, status="done", chars=chars)
+        logger.info(f"♻️ Çıkarma önbelleğinden okundu: {os.path.basename(file_path)} ({pages} sayfa)")
+        return cached["blocks"]
+
+    if file_ext in IMAGE_EXTENSIONS:
+        blocks, complete = _extract_image(file_path, progress)
+    else:
+        blocks, complete = _extract_pdf(file_path, progress, digest)
+
+    # Hata/zaman aşımı olan belge saklanmaz; bir sonraki yüklemede yeniden denenir
+    if complete and any(block["text"].strip() for block in blocks):
+        extraction_cache.put_document(digest, "ocr", {"blocks": blocks})
+    return blocks
+
+
+def _report(progress: Optional[ProgressCallback], **event):
+    if progress is None:
+        return
+    try:
+        progress(event)
+    except Exception as e:
+        logger.debug(f"İlerleme bildirimi gönderilemedi: {e}")
+
+
+def _extract_image(file_path: str, progress: Optional[ProgressCallback]):
+    _report(progress, stage="ocr", page=1, total_pages=1, status="started")
+    start = time.perf_counter()
+    result = ocr_pool.wait(ocr_pool.submit(ocr_image_file, file_path), Config.OCR_PAGE_TIMEOUT)
+    error = result.get("error")
+    _report(progress, stage="ocr", page=1, total_pages=1, status="error" if error else "done",
+            elapsed=round(time.perf_counter() - start, 2), chars=len(result.get("text", "")))
+    if error:
+        logger.error(f"❌ Görüntü OCR hatası ({os.path.basename(file_path)}): {error}")
+    complete = not error and result.get("confidence") != "error"
+    return [make_block("page", result.get("text", ""), page=1)], complete
+
+
+def _extract_pdf(file_path: str, progress: Optional[ProgressCallback], digest: str):
+    """(sayfa blokları, tüm sayfalar başarılı mı) döner"""
+    try:
+        import PyPDF2
+    except ImportError:
+        logger.error("❌ PyPDF2 kütüphanesi yüklü değil. Yüklemek için: pip install PyPDF2")
+        return [], False
+
+    try:
+        with open(file_path, 'rb') as f:
+            reader = PyPDF2.PdfReader(f)
+            texts = []
+            for page in reader.pages:
+                try:
+                    texts.append(page.extract_text() or "")
+                except Exception as e:
+                    logger.warning(f"⚠️ PDF sayfası okunamadı: {e}")
+                    texts.append("")
+    except Exception as e:
+        logger.error(f"❌ PDF okuma hatası: {e}")
+        return [], False
+
+    total = len(texts)
+    complete = True
+    scanned = [i for i, text in enumerate(texts) if len(text.strip()) < Config.OCR_PDF_MIN_PAGE_CHARS]
+    for i in range(total):
+        if len(texts[i].strip()) >= Config.OCR_PDF_MIN_PAGE_CHARS:
+            _report(progress, stage="text", page=i + 1, total_pages=total, status="done", chars=len(texts[i]))
+
+    if scanned and Config.OCR_PDF_ENABLED:
+        try:
+            import pypdfium2  # noqa: F401 - sadece varlık kontrolü; rasterleştirme işçide yapılır
+        except ImportError:
+            logger.warning("⚠️ pypdfium2 yüklü değil, taranmış PDF sayfaları atlanıyor. Yüklemek için: pip install pypdfium2")
+            scanned = []
+            complete = False  # Eksik sonuç önbelleğe yazılmaz; pypdfium2 kurulunca sayfalar OCR'lanır
+
+    if scanned and Config.OCR_PDF_ENABLED:
+        logger.info(f"📷 {len(scanned)}/{total} PDF sayfasında metin katmanı yok, OCR uygulanıyor: {os.path.basename(file_path)}")
+        # Önceki (örn. zaman aşımına uğramış) denemede biten sayfalar yeniden OCR'lanmaz
+        cached_pages = {i: extraction_cache.get_page(digest, i) for i in scanned}
+        futures = {i: ocr_pool.submit(ocr_pdf_page, file_path, i, Config.OCR_PDF_DPI)
+                   for i in scanned if cached_pages[i] is None}
+        deadline = time.monotonic() + Config.OCR_DOCUMENT_TIMEOUT
+        for i in scanned:
+            if cached_pages[i] is not None:
+                if len(cached_pages[i]["text"].strip()) > len(texts[i].strip()):
+                    texts[i] = cached_pages[i]["text"]
+                _report(progress, stage="cache", page=i + 1, total_pages=total, status="done", chars=len(texts[i]))
+                continue
+            _report(progress, stage="ocr", page=i + 1, total_pages=total, status="started")
+            start = time.perf_counter()
+            timeout = min(Config.OCR_PAGE_TIMEOUT, deadline - time.monotonic())
+            result = ocr_pool.wait(futures[i], timeout)
+            error = result.get("error")
+            if error or result.get("confidence") == "error":
+                complete = False
+            else:
+                extraction_cache.put_page(digest, i, {"text": result.get("text", ""), "confidence": result.get("confidence")})
+            if error:
+                logger.warning(f"⚠️ Sayfa {i + 1} OCR başarısız: {error}")
+            elif len(result.get("text", "").strip()) > len(texts[i].strip()):
+                texts[i] = result["text"]
+            _report(progress, stage="ocr", page=i + 1, total_pages=total,
+                    status="timeout" if error == "timeout" else "error" if error else "done",
+                    elapsed=round(time.perf_counter() - start, 2), chars=len(texts[i]))
+
+    logger.info(f"✅ PDF okundu: {total} sayfa, {len(scanned)} OCR, {sum(len(t) for t in texts)} karakter")
+    return [make_block("page", text, page=i + 1) for i, text in enumerate(texts)], complete
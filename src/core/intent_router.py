@@ -0,0 +1,261 @@
+# src/core/intent_router.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import Config
+from . import resource_pool
+
+logger = logging.getLogger(__name__)
+
+# --- Anahtar kelime kuralları (yönlendirici emin olmadığında kullanılır) ---
+
+TEST_KEYWORDS = [
+    "test oluştur", "test olustur", "soru hazırla", "sınav yap", "test yap",
+    "soru üret", "soru uret", "test hazırla", "quiz oluştur",
+    "quiz olustur", "sınav oluştur", "sinav olustur", "test üret", "test uret",
+    "sorular oluştur", "sorular olustur", "değerlendirme yap", "degerlendirme yap"
+]
+
+RESEARCH_FOLLOWUP_KEYWORDS = [
+    "araştırma", "rapor", "bulgu", "sonuç", "detay", "açıkla", "anlatır mısın",
+    "nedir", "nasıl", "ne demek", "anlat", "açıklayabilir", "daha fazla bilgi"
+]
+
+DIRECT_PDF_REFERENCES = [
+    "bu doküman", "bu dokuman", "bu dosya", "bu pdf", "bu rapor",
+    "bu belge", "yüklediğim", "yukledıgım", "gönderdiğim", "gonderdigim",
+    "dokümanı", "dokumanı", "dosyayı", "pdf'i", "raporu", "belgeyi",
+    "dosyada", "dosyadan", "pdf'te", "pdf'de", "belgede", "dökümanı", "dokumanı"
+]
+
+PDF_CONTENT_QUESTIONS = [
+    "özet", "özetle", "içerik", "içinde", "neler var", "ne diyor",
+    "bahsediyor", "yaziyor", "yazıyor", "anlatıyor", "gösteriyor",
+    "açıklıyor", "hangi konular", "nasıl açıklıyor", "konu başlıkları",
+    "başlıklar", "konular", "bölümler", "detaylar", "bilgiler", "içindekiler"
+]
+
+TOC_KEYWORDS = [
+    "konu başlıkları", "başlıklar", "konular", "bölümler", "içindekiler",
+    "pdf deki", "pdfdeki", "pdf in", "pdfin", "başlık", "konu", "içerik"
+]
+
+PDF_WORDS = ["pdf", "doküman", "dokuman", "dosya", "belge"]
+
+WEB_RESEARCH_KEYWORDS = ["araştır", "araştırma yap", "incele", "analiz et", "web'de ara", "internette ara"]
+
+
+def keyword_intent(message: str, has_documents: bool = False, research_completed: bool = False,
+                   force_web_research: bool = False, file_name_parts: Iterable[str] = ()) -> Dict[str, str]:
+    """Anahtar kelime kurallarıyla niyet belirler; {"intent", "topic", "reason"} döner"""
+    last_message = message.strip().lower()
+    original_message = message.strip()
+
+    if any(keyword in last_message for keyword in TEST_KEYWORDS):
+        return {"intent": "generate_test", "topic": original_message, "reason": "Test keyword"}
+
+    if research_completed and any(keyword in last_message for keyword in RESEARCH_FOLLOWUP_KEYWORDS):
+        return {"intent": "research_question", "topic": original_message, "reason": "Research follow-up keyword"}
+
+    if force_web_research:
+        return {"intent": "web_research", "topic": original_message, "reason": "Forced web research"}
+
+    if Config.RAG_ENABLED:
+        if has_documents:
+            file_name_matches = [part for part in file_name_parts if part in last_message]
+            reason = ""
+            # 1. Direkt PDF referansı
+            if any(ref in last_message for ref in DIRECT_PDF_REFERENCES):
+                reason = "Direct PDF reference"
+            # 2. Konu başlığı sorgusu
+            elif any(kw in last_message for kw in TOC_KEYWORDS):
+                reason = "Table of contents/content request"
+            # 3. Dosya ismi + içerik sorusu
+            elif file_name_matches and any(q in last_message for q in PDF_CONTENT_QUESTIONS):
+                reason = f"File name match ({file_name_matches}) + content question"
+            # 4. PDF kelimesi + içerik sorusu
+            elif ("pdf" in last_message or "doküman" in last_message or "dokuman" in last_message) and \
+                    any(q in last_message for q in PDF_CONTENT_QUESTIONS):
+                reason = "PDF keyword + content question"
+            if reason:
+                return {"intent": "rag_search", "topic": original_message, "reason": reason}
+        elif any(ref in last_message for ref in PDF_WORDS):
+            return {"intent": "no_pdf_available", "topic": original_message, "reason": "PDF reference without documents"}
+
+    # Web araştırması - sadece açık talepler
+    for keyword in WEB_RESEARCH_KEYWORDS:
+        if keyword in last_message:
+            return {"intent": "web_research", "topic": original_message.replace(keyword, "", 1).strip(), "reason": f"Keyword '{keyword}'"}
+
+    return {"intent": "gemini", "topic": original_message, "reason": "Default"}
+
+
+# --- Embedding tabanlı yönlendirici ---
+
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "generate_test": TEST_KEYWORDS + [
+        "bu konuyla ilgili bana 10 soru hazırlar mısın",
+        "kendimi denemek için bir quiz istiyorum",
+        "çoktan seçmeli sorular üretir misin",
+        "dokümandan sınav soruları çıkar",
+        "konuyu ne kadar anladığımı ölçen bir test yap",
+    ],
+    "rag_search": DIRECT_PDF_REFERENCES + [
+        "yüklediğim pdf'i özetler misin",
+        "bu dokümanda hangi konular var",
+        "belgede bu konu hakkında ne diyor",
+        "dosyadaki ana fikir nedir",
+        "pdf'in içindekiler bölümünü göster",
+        "raporda sonuç kısmında ne yazıyor",
+    ],
+    "web_research": WEB_RESEARCH_KEYWORDS + [
+        "yapay zeka trendlerini araştırır mısın",
+        "internette bu konuyla ilgili güncel gelişmeleri ara",
+        "kuantum bilgisayarlar hakkında kapsamlı araştırma yap",
+        "iklim değişikliğinin etkilerini web'de incele",
+        "elektrikli araç pazarını analiz et",
+    ],
+    "research_question": [
+        "araştırmadaki ikinci konuyu açıkla",
+        "rapordaki bulgular neler",
+        "bu araştırmanın sonucu ne",
+        "bulduğun alt başlıkları daha detaylı anlat",
+        "araştırmada bahsettiğin konu ne demek",
+    ],
+    "gemini": [
+        "merhaba nasılsın", "teşekkür ederim", "bana bir şiir yaz",
+        "python'da liste nasıl sıralanır", "iki artı iki kaç eder",
+        "bugün ne yapsam", "bana bir fıkra anlat", "bu cümleyi ingilizceye çevir",
+        "fotosentez nedir kısaca açıkla", "motivasyon için bir söz söyle",
+    ],
+}
+
+
+class IntentRouter:
+    """Sentence embedding üzerinde en yakın merkez (nearest-centroid) niyet sınıflandırıcısı.
+
+    Merkezler anahtar kelime listeleri ve örnek cümlelerden bir kez hesaplanır;
+    her mesaj için tek bir embedding ve birkaç iç çarpım yeterlidir. Model
+    henüz yüklenmediyse arka planda hazırlanır ve bu sürede None dönülür.
+    """
+
+    def __init__(self, examples: Dict[str, List[str]] = None):
+        self.examples = examples or INTENT_EXAMPLES
+        self._intents: List[str] = []
+        self._centroids = None
+        self._lock = threading.Lock()
+        self._building = False
+        self._embedding_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._classify_times = deque(maxlen=200)
+        self._embed_times = deque(maxlen=200)
+        self.stats = {"routed": {}, "fallbacks": 0, "not_ready": 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._centroids is not None
+
+    def build(self):
+        """Örnek cümleleri embed edip niyet merkezlerini hesaplar (bloklayan)"""
+        import numpy as np
+
+        model = resource_pool.get_embedding_model()
+        start = time.perf_counter()
+        intents, centroids = [], []
+        for intent, phrases in self.examples.items():
+            vectors = model.encode(phrases, normalize_embeddings=True)
+            centroid = vectors.mean(axis=0)
+            centroids.append(centroid / np.linalg.norm(centroid))
+            intents.append(intent)
+        self._intents = intents
+        self._centroids = np.vstack(centroids)
+        logger.info(f"🧭 Niyet yönlendiricisi hazır ({len(intents)} niyet, {time.perf_counter() - start:.2f}s)")
+
+    def ensure_ready_async(self):
+        """Merkezleri event loop'u bekletmeden arka plan thread'inde hazırlar"""
+        with self._lock:
+            if self.ready or self._building:
+                return
+            self._building = True
+
+        def run():
+            try:
+                self.build()
+            except Exception as e:
+                logger.warning(f"⚠️ Niyet yönlendiricisi hazırlanamadı, anahtar kelimeler kullanılacak: {e}")
+            finally:
+                self._building = False
+
+        threading.Thread(target=run, name="intent-router-build", daemon=True).start()
+
+    def embed(self, message: str):
+        """Mesaj embedding'i (son mesajlar önbellekte - RAG araması da aynı vektörü kullanabilir)"""
+        key = message.strip().lower()
+        vector = self._embedding_cache.get(key)
+        if vector is not None:
+            self._embedding_cache.move_to_end(key)
+            return vector
+        start = time.perf_counter()
+        vector = resource_pool.get_embedding_model().encode([message], normalize_embeddings=True)[0]
+        self._embed_times.append(time.perf_counter() - start)
+        self._embedding_cache[key] = vector
+        while len(self._embedding_cache) > 256:
+            self._embedding_cache.popitem(last=False)
+        return vector
+
+    def classify(self, vector, allowed: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Embedding'i merkezlerle karşılaştırır; niyet, güven ve ikinciyle farkı döner"""
+        start = time.perf_counter()
+        scores = self._centroids @ vector
+        allowed = set(allowed) if allowed is not None else None
+        ranked = sorted(
+            ((float(score), intent) for score, intent in zip(scores, self._intents) if allowed is None or intent in allowed),
+            reverse=True
+        )
+        self._classify_times.append(time.perf_counter() - start)
+        top_score, top_intent = ranked[0]
+        second_score = ranked[1][0] if len(ranked) > 1 else 0.0
+        return {
+            "intent": top_intent,
+            "confidence": round(top_score, 4),
+            "margin": round(top_score - second_score, 4),
+            "scores": {intent: round(score, 4) for score, intent in ranked},
+        }
+
+    def route(self, message: str, has_documents: bool = False, research_completed: bool = False) -> Optional[Dict[str, Any]]:
+        """Emin olunan durumda niyet sonucunu, değilse None döner (anahtar kelime kurallarına düşülür)"""
+        if not Config.INTENT_ROUTER_ENABLED:
+            return None
+        if not self.ready:
+            self.stats["not_ready"] += 1
+            self.ensure_ready_async()
+            return None
+
+        allowed = [intent for intent in self._intents if intent != "research_question" or research_completed]
+        result = self.classify(self.embed(message), allowed)
+
+        required = Config.INTENT_WEB_RESEARCH_MIN_CONFIDENCE if result["intent"] == "web_research" else Config.INTENT_MIN_CONFIDENCE
+        if result["confidence"] < required or result["margin"] < Config.INTENT_MIN_MARGIN:
+            self.stats["fallbacks"] += 1
+            return None
+
+        if result["intent"] == "rag_search" and not has_documents:
+            result["intent"] = "no_pdf_available"
+        self.stats["routed"][result["intent"]] = self.stats["routed"].get(result["intent"], 0) + 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        def avg_ms(samples):
+            return round(sum(samples) / len(samples) * 1000, 3) if samples else None
+        return {
+            **self.stats,
+            "ready": self.ready,
+            "avg_classify_ms": avg_ms(self._classify_times),
+            "avg_embed_ms": avg_ms(self._embed_times),
+        }
+
+
+intent_router = IntentRouter()
@@ -0,0 +1,250 @@
+# src/core/llm_governor.py
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Öncelik sınıfları - küçük değer önce çalışır
+INTERACTIVE = 0  # Sohbet cevapları
+EVALUATION = 1   # Test değerlendirmeleri
+BACKGROUND = 2   # CrewAI araştırma ve test üretimi
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", EVALUATION: "evaluation", BACKGROUND: "background"}
+
+_RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "resource exhausted", "rate limit", "ratelimit", "quota")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Hata Gemini kota / 429 hatası mı"""
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _RATE_LIMIT_MARKERS)
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued_at", "notify", "granted", "cancelled")
+
+    def __init__(self, priority: int, notify: Callable[[], None]):
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.notify = notify
+        self.granted = False
+        self.cancelled = False
+
+
+class LLMGovernor:
+    """Süreç genelinde Gemini çağrılarını sınırlayan token bucket + eşzamanlılık kontrolü.
+
+    Hem async kod (sohbet, değerlendirme) hem de CrewAI thread'leri aynı
+    kuyruğu kullanır. Boşalan slot her zaman en yüksek öncelikli bekleyene
+    verilir; bir slot yalnızca sohbet cevapları için ayrılır. 429 hatası
+    alındığında tüm çağrılar üstel artan süreyle bekletilir.
+    """
+
+    def __init__(self, max_concurrency: int = None, rate_per_minute: float = None, burst: int = None,
+                 interactive_reserved: int = None):
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.rate_per_second = (rate_per_minute or Config.LLM_RATE_PER_MINUTE) / 60.0
+        self.capacity = float(burst or Config.LLM_BURST)
+        reserved = Config.LLM_INTERACTIVE_RESERVED if interactive_reserved is None else interactive_reserved
+        self.interactive_reserved = min(reserved, self.max_concurrency - 1)
+
+        self._lock = threading.Lock()
+        self._waiters = []  # (priority, sıra, _Waiter) heap
+        self._sequence = itertools.count()
+        self._active = 0
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._backoff = 0.0
+        self._timer = None
+
+        self._wait_samples = {name: deque(maxlen=200) for name in PRIORITY_NAMES.values()}
+        self.stats = {
+            name: {"requests": 0, "waiting": 0, "rate_limited": 0, "errors": 0}
+            for name in PRIORITY_NAMES.values()
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE):
+        """async with governor.slot(EVALUATION): await llm.ainvoke(...)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(priority, notify)
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        try:
+            yield
+        except Exception as e:
+            self._report_failure(priority, e)
+            raise
+        else:
+            self._report_success()
+        finally:
+            self._release()
+
+    @contextmanager
+    def slot_sync(self, priority: int = BACKGROUND):
+        """Thread'lerde çalışan (CrewAI) çağrılar için engelleyen sürüm"""
+        granted = threading.Event()
+        self._enqueue(priority, granted.set)
+        granted.wait()
+
+        try:
+            yield
+        except Exception as e:
+            self._report_failure(priority, e)
+            raise
+        else:
+            self._report_success()
+        finally:
+            self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        classes = {}
+        for name, counters in self.stats.items():
+            samples = sorted(self._wait_samples[name])
+            classes[name] = {
+                **counters,
+                "avg_wait_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0,
+                "p95_wait_ms": round(samples[max(0, int(round(len(samples) * 0.95)) - 1)] * 1000, 1) if samples else 0.0,
+                "max_wait_ms": round(samples[-1] * 1000, 1) if samples else 0.0,
+            }
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "active": self._active,
+                "queued": sum(1 for _, _, w in self._waiters if not w.cancelled),
+                "max_concurrency": self.max_concurrency,
+                "tokens": round(self._tokens, 2),
+                "rate_per_minute": round(self.rate_per_second * 60, 1),
+                "backoff_seconds": round(self._backoff, 2),
+                "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+                "classes": classes,
+            }
+
+    # --- İç yardımcılar ---
+
+    def _enqueue(self, priority: int, notify: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(priority, notify)
+        name = PRIORITY_NAMES[priority]
+        with self._lock:
+            self.stats[name]["requests"] += 1
+            self.stats[name]["waiting"] += 1
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            self._dispatch()
+        return waiter
+
+    def _abandon(self, waiter: _Waiter):
+        """İptal edilen async bekleyen - slot verildiyse geri bırakılır"""
+        with self._lock:
+            if not waiter.granted:
+                waiter.cancelled = True
+                self.stats[PRIORITY_NAMES[waiter.priority]]["waiting"] -= 1
+                return
+        self._release()
+
+    def _release(self):
+        with self._lock:
+            self._active -= 1
+            self._dispatch()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def _dispatch(self):
+        """Kilit altında çağrılır: koşullar uygunsa en öncelikli bekleyenlere slot verir"""
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            priority, _, waiter = self._waiters[0]
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            limit = self.max_concurrency if priority == INTERACTIVE else self.max_concurrency - self.interactive_reserved
+            if self._active >= limit:
+                break
+            if now < self._blocked_until:
+                self._schedule(self._blocked_until - now)
+                break
+            if self._tokens < 1:
+                self._schedule((1 - self._tokens) / self.rate_per_second)
+                break
+
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self._active += 1
+            waiter.granted = True
+            name = PRIORITY_NAMES[priority]
+            self.stats[name]["waiting"] -= 1
+            self._wait_samples[name].append(now - waiter.enqueued_at)
+            waiter.notify()
+
+    def _schedule(self, delay: float):
+        """Token dolunca veya backoff bitince kuyruğu yeniden işlemek için zamanlayıcı kurar"""
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(max(delay, 0.01), self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _report_failure(self, priority: int, error: BaseException):
+        name = PRIORITY_NAMES[priority]
+        if not is_rate_limit_error(error):
+            self.stats[name]["errors"] += 1
+            return
+        with self._lock:
+            self.stats[name]["rate_limited"] += 1
+            self._backoff = min(Config.LLM_BACKOFF_MAX, self._backoff * 2 if self._backoff else Config.LLM_BACKOFF_BASE)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + self._backoff)
+            # Kota doluyken biriken token'lar ani bir yeniden deneme dalgasına yol açmasın
+            self._tokens = min(self._tokens, 1.0)
+        logger.warning(f"⏳ Gemini kota sınırı ({name}) - yeni çağrılar {self._backoff:.1f}s bekletiliyor")
+
+    def _report_success(self):
+        if self._backoff:
+            with self._lock:
+                self._backoff = self._backoff / 2 if self._backoff / 2 >= Config.LLM_BACKOFF_BASE else 0.0
+
+
+governor = LLMGovernor()
+
+_governed_llm_class = None
+
+
+def create_governed_crew_llm(**kwargs):
+    """CrewAI LLM'inin her çağrısı arka plan önceliğiyle governor'dan geçer"""
+    global _governed_llm_class
+    if _governed_llm_class is None:
+        from crewai import LLM
+
+        class GovernedLLM(LLM):
+            def call(self, *args, **call_kwargs):
+                with governor.slot_sync(BACKGROUND):
+                    return super().call(*args, **call_kwargs)
+
+        _governed_llm_class = GovernedLLM
+    return _governed_llm_class(**kwargs)
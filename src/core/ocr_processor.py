@@ -2,75 +2,167 @@ import os
 from PIL import Image
 import cv2
 import numpy as np
-from transformers import TrOCRProcessor, VisionEncoderDecoderModel
-import torch
+
+from .config import Config
+from .ocr_service import ocr_service
+
+
+def segment_lines(gray, min_height=None):
+    """Gri tonlamalı sayfadaki metin satırlarını bulur; okuma sırasında (x, y, w, h) kutuları döner.
+
+    Mürekkep ikili hale getirilip yatay olarak genişletilir, böylece aynı
+    satırdaki kelimeler tek bir bölgede birleşir. Birbirine değen satırlar
+    yatay izdüşümdeki boşluklardan bölünür.
+    """
+    min_height = min_height or Config.OCR_MIN_LINE_HEIGHT
+    height, width = gray.shape[:2]
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 31, 15)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(15, width // 40), 3))
+    merged = cv2.dilate(binary, kernel, iterations=1)
+    contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = [cv2.boundingRect(c) for c in contours]
+    boxes = [b for b in boxes if b[3] >= min_height and b[2] >= min_height]
+    if not boxes:
+        return []
+
+    # Normalden çok yüksek bölgeler birden fazla satır içeriyor olabilir
+    typical_height = float(np.median([b[3] for b in boxes]))
+    split_boxes = []
+    for x, y, w, h in boxes:
+        if h > 1.8 * typical_height:
+            split_boxes.extend(_split_by_projection(binary, x, y, w, h, min_height))
+        else:
+            split_boxes.append((x, y, w, h))
+
+    # Okuma sırası: dikey merkezi aynı bandda kalan kutular aynı satır sayılır, satır içinde soldan sağa
+    split_boxes.sort(key=lambda b: b[1])
+    rows = []
+    for box in split_boxes:
+        center = box[1] + box[3] / 2
+        if rows and rows[-1]["top"] <= center <= rows[-1]["bottom"]:
+            rows[-1]["boxes"].append(box)
+            rows[-1]["bottom"] = max(rows[-1]["bottom"], box[1] + box[3])
+        else:
+            rows.append({"top": box[1], "bottom": box[1] + box[3], "boxes": [box]})
+    return [box for row in rows for box in sorted(row["boxes"], key=lambda b: b[0])]
+
+
+def _split_by_projection(binary, x, y, w, h, min_height):
+    """Yüksek bölgeyi mürekkep olmayan satırlardan dikey olarak böler"""
+    profile = binary[y:y + h, x:x + w].sum(axis=1)
+    threshold = profile.max() * 0.05
+    pieces, start = [], None
+    for row, value in enumerate(profile):
+        if value > threshold and start is None:
+            start = row
+        elif value <= threshold and start is not None:
+            if row - start >= min_height:
+                pieces.append((x, y + start, w, row - start))
+            start = None
+    if start is not None and h - start >= min_height:
+        pieces.append((x, y + start, w, h - start))
+    return pieces or [(x, y, w, h)]
+
+
+def crop_lines(gray, padding=4):
+    """Satır kutularını kırpıp TrOCR'a uygun RGB PIL görüntüleri döner"""
+    height, width = gray.shape[:2]
+    crops = []
+    for x, y, w, h in segment_lines(gray):
+        top, bottom = max(0, y - padding), min(height, y + h + padding)
+        left, right = max(0, x - padding), min(width, x + w + padding)
+        crops.append(Image.fromarray(gray[top:bottom, left:right]).convert('RGB'))
+    return crops
+
+
+# Basılı/el yazısı ayrımı için sezgisel eşikler: basılı metinde vuruş kalınlığı ve
+# karakter yükseklikleri tekdüzedir, el yazısında ikisi de belirgin şekilde değişir.
+_STROKE_CV_PIVOT = 0.35
+_HEIGHT_CV_PIVOT = 0.45
+
+
+def classify_script(gray):
+    """Satırın el yazısı mı basılı mı olduğunu tahmin eder; (tür, el yazısı olasılığı) döner"""
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if cv2.countNonZero(ink) < 30:
+        return "printed", 0.5
+
+    # Vuruş genişliği: mesafe dönüşümünün yerel maksimumları (vuruşun orta çizgisi)
+    dist = cv2.distanceTransform(ink, cv2.DIST_L2, 3)
+    ridge = dist[(dist >= cv2.dilate(dist, np.ones((3, 3), np.uint8))) & (ink > 0)]
+    stroke_cv = float(ridge.std() / ridge.mean()) if ridge.size and ridge.mean() > 0 else 0.0
+
+    # Bağlı bileşen (harf/harf grubu) yüksekliklerinin değişkenliği
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    heights = heights[heights >= 3]
+    height_cv = float(heights.std() / heights.mean()) if heights.size >= 3 else _HEIGHT_CV_PIVOT
+
+    score = 4.0 * (stroke_cv - _STROKE_CV_PIVOT) + 3.0 * (height_cv - _HEIGHT_CV_PIVOT)
+    probability = 1.0 / (1.0 + np.exp(-score))
+    return ("handwritten" if probability >= 0.5 else "printed"), round(float(probability), 3)
+
+
+def page_lines(gray):
+    """Sayfanın satır görüntüleri; bölütleme kapalıysa veya satır bulunamazsa tüm sayfa tek parça"""
+    lines = crop_lines(gray) if Config.OCR_SEGMENT_LINES else []
+    return lines or [Image.fromarray(gray).convert('RGB')]
+
+
+def enhance_image(image):
+    """BGR veya gri ndarray'i OCR için iyileştirilmiş gri tonlamaya çevirir"""
+    # Gri tonlamaya çevir
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    
+    # Kontrast artırma
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    enhanced = clahe.apply(gray)
+    
+    # Gürültü azaltma
+    return cv2.medianBlur(enhanced, 3)
+
 
 class HandwritingOCR:
-    def __init__(self):
-        """TrOCR modelini başlat"""
-        print("🔄 El yazısı OCR modeli yükleniyor...")
-        
-        # Handwritten text için özel eğitilmiş model
-        self.processor = TrOCRProcessor.from_pretrained("microsoft/trocr-base-handwritten")
-        self.model = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-handwritten")
-        
-        # Printed text için de model (karışık metinler için)
-        try:
-            self.processor_printed = TrOCRProcessor.from_pretrained("microsoft/trocr-base-printed")
-            self.model_printed = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-printed")
-            self.has_printed_model = True
-        except:
-            self.has_printed_model = False
-            
-        print("✅ OCR modeli hazır!")
+    def __init__(self, service=None):
+        """Paylaşılan OCR servisine bağlan - TrOCR modelleri süreç başına bir kez yüklenir"""
+        self.service = service or ocr_service
+        self.has_printed_model = "printed" in self.service.kinds
     
-    def preprocess_image(self, image_path):
-        """Görüntüyü OCR için optimize et"""
+    def load_image(self, image_path):
+        """Görüntüyü okuyup iyileştirilmiş gri tonlamalı ndarray döner"""
         # OpenCV ile görüntüyü oku
         image = cv2.imread(image_path)
         
         if image is None:
             raise ValueError(f"Görüntü okunamadı: {image_path}")
         
-        # Gri tonlamaya çevir
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Kontrast artırma
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
-        
-        # Gürültü azaltma
-        denoised = cv2.medianBlur(enhanced, 3)
-        
-        # PIL formatına çevir
-        pil_image = Image.fromarray(denoised).convert('RGB')
-        
-        return pil_image
+        return enhance_image(image)
+    
+    def preprocess_image(self, image_path):
+        """Görüntüyü OCR için optimize et (tüm sayfa tek görüntü)"""
+        return Image.fromarray(self.load_image(image_path)).convert('RGB')
+    
+    def preprocess_lines(self, image_path):
+        """Görüntüyü satırlara böler; satır bulunamazsa tüm sayfa tek parça döner"""
+        return page_lines(self.load_image(image_path))
+    
+    def recognize_lines(self, lines, kind):
+        """Sayfanın tüm satırlarını aynı anda kuyruğa verir (tek batch); {"text", "confidence"} döner"""
+        futures = [self.service.submit(line, kind) for line in lines]
+        return _join_results([future.result() for future in futures])
     
     def extract_handwritten_text(self, image_path, confidence_threshold=0.8):
         """El yazısı metnini çıkar"""
         try:
-            # Görüntüyü hazırla
-            image = self.preprocess_image(image_path)
-            
-            # TrOCR ile işle
-            pixel_values = self.processor(images=image, return_tensors="pt").pixel_values
-            
-            # Text generation
-            generated_ids = self.model.generate(
-                pixel_values,
-                max_length=256,
-                num_beams=4,
-                early_stopping=True
-            )
-            
-            # Decode et
-            text = self.processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
+            lines = self.preprocess_lines(image_path)
+            result = self.recognize_lines(lines, "handwritten")
             
             return {
-                'text': text.strip(),
-                'confidence': 'high',  # TrOCR confidence score vermez, yaklaşık
-                'method': 'trocr_handwritten'
+                'text': result['text'],
+                'confidence': result['confidence'],  # Token başına ortalama olasılık (0-1)
+                'method': 'trocr_handwritten',
+                'line_count': len(lines)
             }
             
         except Exception as e:
@@ -87,16 +179,14 @@ class HandwritingOCR:
             return self.extract_handwritten_text(image_path)
             
         try:
-            image = self.preprocess_image(image_path)
-            
-            pixel_values = self.processor_printed(images=image, return_tensors="pt").pixel_values
-            generated_ids = self.model_printed.generate(pixel_values, max_length=256)
-            text = self.processor_printed.batch_decode(generated_ids, skip_special_tokens=True)[0]
+            lines = self.preprocess_lines(image_path)
+            result = self.recognize_lines(lines, "printed")
             
             return {
-                'text': text.strip(),
-                'confidence': 'high',
-                'method': 'trocr_printed'
+                'text': result['text'],
+                'confidence': result['confidence'],
+                'method': 'trocr_printed',
+                'line_count': len(lines)
             }
             
         except Exception as e:
@@ -109,32 +199,67 @@ class HandwritingOCR:
     
     def extract_mixed_text(self, image_path):
         """Hem el yazısı hem basılı metin için hibrit yaklaşım"""
-        handwritten_result = self.extract_handwritten_text(image_path)
+        try:
+            lines = self.preprocess_lines(image_path)
+        except Exception as e:
+            return {'text': '', 'confidence': 'error', 'error': str(e), 'method': 'trocr_routed'}
+        return self.recognize_mixed(lines)
+    
+    def recognize_mixed(self, lines):
+        """Her satırı sınıflandırıcının seçtiği tek modelle okur; güven düşükse diğer model denenir"""
+        if not self.has_printed_model:
+            try:
+                result = self.recognize_lines(lines, 'handwritten')
+            except Exception as e:
+                return {'text': '', 'confidence': 'error', 'error': str(e), 'method': 'trocr_routed'}
+            return {**result, 'method': 'trocr_routed', 'line_count': len(lines),
+                    'models': {'handwritten': len(lines), 'printed': 0, 'fallbacks': 0}}
         
-        if self.has_printed_model:
-            printed_result = self.extract_printed_text(image_path)
+        kinds = [classify_script(np.array(line.convert('L')))[0] for line in lines]
+        try:
+            # Tüm satırlar önce kendi modellerinin kuyruğuna verilir (iki batch paralel çalışır)
+            futures = [self.service.submit(line, kind) for line, kind in zip(lines, kinds)]
+            results = [future.result() for future in futures]
             
-            # En uzun sonucu seç (genellikle daha doğru)
-            if len(printed_result['text']) > len(handwritten_result['text']):
-                return {
-                    'text': printed_result['text'],
-                    'confidence': 'mixed_analysis',
-                    'method': 'trocr_hybrid',
-                    'alternatives': {
-                        'handwritten': handwritten_result['text'],
-                        'printed': printed_result['text']
-                    }
-                }
+            # Güveni düşük satırlar diğer modelle toplu halde yeniden okunur
+            retry = [i for i, result in enumerate(results) if result['confidence'] < Config.OCR_FALLBACK_CONFIDENCE]
+            retry_futures = {i: self.service.submit(lines[i], _other_kind(kinds[i])) for i in retry}
+            for i, future in retry_futures.items():
+                alternative = future.result()
+                if alternative['confidence'] > results[i]['confidence']:
+                    results[i] = alternative
+                    kinds[i] = _other_kind(kinds[i])
+        except Exception as e:
+            return {'text': '', 'confidence': 'error', 'error': str(e), 'method': 'trocr_routed'}
         
         return {
-            'text': handwritten_result['text'],
-            'confidence': 'handwritten_only',
-            'method': 'trocr_hybrid'
+            **_join_results(results),
+            'method': 'trocr_routed',
+            'line_count': len(lines),
+            'models': {
+                'handwritten': kinds.count('handwritten'),
+                'printed': kinds.count('printed'),
+                'fallbacks': len(retry),
+            }
         }
 
+
+def _other_kind(kind):
+    return 'printed' if kind == 'handwritten' else 'handwritten'
+
+
+def _join_results(results):
+    """Satır sonuçlarını okuma sırasında birleştirir; güven karakter sayısıyla ağırlıklı ortalamadır"""
+    texts = [result['text'] for result in results if result['text']]
+    weight = sum(len(result['text']) for result in results)
+    confidence = (sum(result['confidence'] * len(result['text']) for result in results) / weight) if weight else 0.0
+    return {'text': "\n".join(texts), 'confidence': round(confidence, 3)}
+
+
 def supported_image_formats():
     """Desteklenen görüntü formatları"""
-    return ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif']
+    from .document_processor import IMAGE_EXTENSIONS
+    return list(IMAGE_EXTENSIONS)
 
 def is_image_file(file_path):
     """Dosyanın görüntü dosyası olup olmadığını kontrol et"""
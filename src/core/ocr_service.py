@@ -0,0 +1,152 @@
+# src/core/ocr_service.py
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, List
+
+from .config import Config
+from . import resource_pool
+
+logger = logging.getLogger(__name__)
+
+
+class _BatchWorker:
+    """Tek bir TrOCR modeli için istekleri toplayıp tek generate çağrısında çalıştıran thread"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=200)
+        self._latencies = deque(maxlen=200)
+        self.stats = {"images": 0, "batches": 0, "errors": 0}
+
+    def submit(self, image) -> Future:
+        future = Future()
+        self._ensure_started()
+        self._queue.put((image, future, time.perf_counter()))
+        return future
+
+    def get_stats(self) -> Dict[str, Any]:
+        def avg(samples, scale=1.0):
+            return round(sum(samples) / len(samples) * scale, 2) if samples else None
+        return {
+            **self.stats,
+            "queued": self._queue.qsize(),
+            "avg_batch_size": avg(self._batch_sizes),
+            "avg_latency_ms": avg(self._latencies, 1000),
+        }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"ocr-{self.kind}", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # İlk istekten sonra kısa bir süre aynı anda gelenler beklenir
+            deadline = time.perf_counter() + Config.OCR_BATCH_WAIT_MS / 1000
+            while len(batch) < Config.OCR_MAX_BATCH_SIZE:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch):
+        try:
+            results = self._generate([image for image, _, _ in batch])
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ OCR toplu çıkarım hatası ({self.kind}, {len(batch)} görüntü): {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        self.stats["images"] += len(batch)
+        self.stats["batches"] += 1
+        self._batch_sizes.append(len(batch))
+        for (_, future, enqueued_at), result in zip(batch, results):
+            self._latencies.append(finished - enqueued_at)
+            future.set_result(result)
+
+    def _generate(self, images) -> List[Dict[str, Any]]:
+        """Her görüntü için {"text", "confidence"} döner; güven = token başına ortalama olasılık"""
+        import torch
+
+        processor, model = resource_pool.get_ocr_model(self.kind)
+        pixel_values = processor(images=images, return_tensors="pt").pixel_values
+        generate_kwargs = {
+            "max_length": Config.OCR_MAX_LENGTH,
+            "num_beams": Config.OCR_NUM_BEAMS,
+            "output_scores": True,
+            "return_dict_in_generate": True,
+        }
+        if Config.OCR_NUM_BEAMS > 1:
+            generate_kwargs["early_stopping"] = True
+        with torch.inference_mode():
+            output = model.generate(pixel_values, **generate_kwargs)
+            if Config.OCR_NUM_BEAMS > 1:
+                # Beam search uzunlukla normalize edilmiş log-olasılığı zaten verir
+                confidences = output.sequences_scores.exp()
+            else:
+                token_scores = model.compute_transition_scores(output.sequences, output.scores, normalize_logits=True)
+                generated = output.sequences[:, 1:]  # İlk token decoder başlangıcı, skoru yok
+                pad_id = model.generation_config.pad_token_id
+                mask = (generated != pad_id) if pad_id is not None else torch.ones_like(generated, dtype=torch.bool)
+                mask = mask[:, :token_scores.shape[1]]
+                # EOS sonrası pad skorları -inf olabilir; çarpma -inf * 0 = NaN verir, bu yüzden maskelenir
+                mean_log_prob = token_scores.masked_fill(~mask, 0.0).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                confidences = mean_log_prob.exp()
+        texts = processor.batch_decode(output.sequences, skip_special_tokens=True)
+        return [{"text": text.strip(), "confidence": round(float(confidence), 4)}
+                for text, confidence in zip(texts, confidences)]
+
+
+class OCRService:
+    """Süreç genelinde paylaşılan TrOCR servisi.
+
+    Her model (el yazısı / basılı) bir kez yüklenir ve kendi toplayıcı
+    thread'ine sahiptir; eşzamanlı gelen görüntüler tek bir batch halinde
+    işlenir. submit() Future döner, recognize() sonucu bekler.
+    """
+
+    def __init__(self):
+        self._workers = {kind: _BatchWorker(kind) for kind in Config.OCR_MODELS}
+
+    @property
+    def kinds(self) -> List[str]:
+        return list(self._workers)
+
+    def submit(self, image, kind: str = "handwritten") -> Future:
+        """PIL görüntüsünü kuyruğa ekler; Future sonucu {"text", "confidence"}"""
+        return self._workers[kind].submit(image)
+
+    def recognize(self, image, kind: str = "handwritten", timeout: float = None) -> str:
+        return self.submit(image, kind).result(timeout=timeout)["text"]
+
+    def recognize_many(self, images, kind: str = "handwritten", timeout: float = None) -> List[str]:
+        futures = [self.submit(image, kind) for image in images]
+        return [future.result(timeout=timeout)["text"] for future in futures]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "quantized": Config.OCR_QUANTIZE,
+            "num_beams": Config.OCR_NUM_BEAMS,
+            "max_batch_size": Config.OCR_MAX_BATCH_SIZE,
+            "models": {kind: worker.get_stats() for kind, worker in self._workers.items()},
+        }
+
+
+ocr_service = OCRService()
@@ -0,0 +1,77 @@
+# src/core/rag_prefetch.py
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Süreç genelindeki spekülatif arama sayaçları (/metrics)
+_stats = {"started": 0, "used": 0, "discarded": 0, "errors": 0}
+_search_times = deque(maxlen=200)  # Aramanın toplam süresi
+_wait_times = deque(maxlen=200)  # rag_search düğümünün sonucu beklediği süre (kritik yolda kalan kısım)
+
+
+class RagPrefetch:
+    """Niyet analiziyle paralel başlatılan tek seferlik vektör araması.
+
+    Mesaj geldiği anda arama bir thread'de başlar; yönlendirici rag_search
+    seçerse sonuç take() ile alınır, seçmezse discard() ile bırakılır.
+    Thread'deki arama iptal edilemez, sadece sonucu kullanılmaz.
+    """
+
+    def __init__(self, query: str, future: "asyncio.Future"):
+        self.query = query
+        self.future = future
+        self.finished = False
+
+    @classmethod
+    def start(cls, vector_store, query: str, n_results: int) -> "RagPrefetch":
+        def search():
+            start = time.perf_counter()
+            results = vector_store.search_similar(query=query, n_results=n_results)
+            _search_times.append(time.perf_counter() - start)
+            return results
+
+        # run_in_executor işi hemen thread'e verir; niyet düğümü loop'u bloklasa da arama başlamış olur
+        future = asyncio.get_running_loop().run_in_executor(None, search)
+        # Kullanılmayan aramanın hatası "never retrieved" uyarısı üretmesin
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        _stats["started"] += 1
+        return cls(query, future)
+
+    async def take(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Aynı sorgu için başlatılmışsa sonucunu döner; aksi halde None (normal arama yapılır)"""
+        if self.finished or query != self.query:
+            return None
+        self.finished = True
+        start = time.perf_counter()
+        try:
+            results = await self.future
+        except Exception as e:
+            _stats["errors"] += 1
+            logger.warning(f"⚠️ Spekülatif RAG araması başarısız, normal arama yapılacak: {e}")
+            return None
+        _wait_times.append(time.perf_counter() - start)
+        _stats["used"] += 1
+        return results
+
+    def discard(self):
+        """Tur rag_search'e uğramadan bittiyse sonucu çöpe atar"""
+        if not self.finished:
+            self.finished = True
+            _stats["discarded"] += 1
+
+
+def get_stats() -> Dict[str, Any]:
+    def avg_ms(samples):
+        return round(sum(samples) / len(samples) * 1000, 1) if samples else None
+    resolved = _stats["used"] + _stats["discarded"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["used"] / resolved, 3) if resolved else None,
+        "avg_search_ms": avg_ms(_search_times),
+        "avg_wait_ms": avg_ms(_wait_times),
+    }
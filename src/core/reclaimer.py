@@ -0,0 +1,241 @@
+# src/core/reclaimer.py
+"""Disk alanı geri kazanımı - silinmiş sohbetlerden kalan vektör/yükleme dosyaları ve yarım kalmış geçici dosyalar.
+
+Kullanım (proje kök dizininden):
+    python run.py reclaim --dry-run
+"""
+
+import argparse
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Aynı anda tek geri kazanım çalışır (admin uç noktası + zamanlanmış görev)
+_run_lock = threading.Lock()
+
+# Yarım kalmış yazımların desenleri: yükleme (.part), önbellek (.tmp), yt-dlp indirmesi (.download*)
+TEMP_PATTERNS = ("*.part", "*.tmp", "*.download*")
+
+# Sohbet kaydı olmadan kullanılan depolar (sohbet oluşturulamazsa server.py 'default'a düşer)
+PROTECTED_STORES = {"default"}
+
+
+def _tree_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _age_seconds(path: Path) -> float:
+    """Dizinler için içindeki en yeni dosyaya göre yaş (dizin mtime'ı alt dosya yazımlarında değişmez)"""
+    newest = path.stat().st_mtime
+    if path.is_dir():
+        for p in path.rglob("*"):
+            try:
+                newest = max(newest, p.stat().st_mtime)
+            except OSError:
+                continue
+    return time.time() - newest
+
+
+class StorageReclaimer:
+    """Sahipsiz verileri bulur, siler ve SQLite dosyalarını küçültür.
+
+    Canlı trafikle birlikte çalışabilir: yalnızca kayıtlı olmayan ve açık diyaloğu
+    olmayan sohbetlerin dizinleri silinir, her şey RECLAIM_MIN_AGE_SECONDS'tan eski
+    olmalıdır (süren yüklemeler/indirmeler korunur). VACUUM kilit alamazsa o dosya atlanır.
+    """
+
+    def __init__(self, chat_manager, is_active: Optional[Callable[[str], bool]] = None,
+                 min_age_seconds: int = None):
+        self.chat_manager = chat_manager
+        self.is_active = is_active or (lambda chat_id: False)
+        self.min_age_seconds = Config.RECLAIM_MIN_AGE_SECONDS if min_age_seconds is None else min_age_seconds
+        self.vector_root = Path(Config.VECTOR_STORE_PATH)
+        self.upload_root = Path(Config.UPLOAD_DIR)
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Geri kazanımı çalıştırır; başka bir çalışma sürüyorsa beklemeden 'busy' döner"""
+        if not _run_lock.acquire(blocking=False):
+            return {"status": "busy"}
+        try:
+            return self._run(dry_run)
+        finally:
+            _run_lock.release()
+
+    def _run(self, dry_run: bool) -> Dict[str, Any]:
+        start = time.perf_counter()
+        report = {"status": "ok", "dry_run": dry_run, "removed": [], "vacuumed": [], "skipped": [], "errors": []}
+        known = set(self.chat_manager.chats_metadata.copy())  # copy() GIL altında atomik - canlı ekleme/silme ile yarışmaz
+
+        def is_orphan(chat_id: str) -> bool:
+            return chat_id not in known and not self.is_active(chat_id)
+
+        # 1) Silinmiş sohbetlerin vektör depoları, sohbet klasörleri ve eski yükleme klasörleri
+        for path in self._chat_stores(report):
+            if is_orphan(path.name):
+                self._remove(path, "vector_store", report, dry_run)
+        for kind, root in (("chat_data", self.chat_manager.base_data_dir),
+                           ("uploads", self.upload_root / "chats")):
+            for path in self._subdirs(root):
+                if is_orphan(path.name):
+                    self._remove(path, kind, report, dry_run)
+
+        # 2) Canlı sohbetlerde koleksiyonu silinmiş (clear_all_documents) HNSW segment klasörleri
+        for store in self._subdirs(self.vector_root):
+            if (store.name in known or store.name in PROTECTED_STORES) and (store / "chroma.sqlite3").exists():
+                for segment in self._orphan_segments(store, report):
+                    self._remove(segment, "hnsw_segment", report, dry_run)
+
+        # 3) Yarım kalmış yüklemeler, önbellek yazımları ve ses indirmeleri
+        temp_roots = [self.chat_manager.base_data_dir, Path(Config.EXTRACTION_CACHE_DIR),
+                      Path(Config.TRANSCRIPT_CACHE_DIR) / "audio"]
+        for path in self._temp_files(temp_roots):
+            self._remove(path, "temp", report, dry_run)
+
+        # 4) SQLite dosyalarını küçült: yumuşak silinmiş sohbetleri temizle + VACUUM
+        if not dry_run:
+            self._purge_soft_deleted(report)
+            for db_path in self._sqlite_files(known):
+                self._vacuum(db_path, report)
+
+        report["reclaimed_bytes"] = (sum(item["bytes"] for item in report["removed"])
+                                     + sum(item["before"] - item["after"] for item in report["vacuumed"]))
+        report["reclaimed_mb"] = round(report["reclaimed_bytes"] / (1024 * 1024), 2)
+        report["elapsed_s"] = round(time.perf_counter() - start, 2)
+        logger.info(
+            f"🧹 Disk geri kazanımı{' (deneme)' if dry_run else ''}: {len(report['removed'])} öğe, "
+            f"{len(report['vacuumed'])} VACUUM, {report['reclaimed_mb']}MB, {report['elapsed_s']}s"
+        )
+        return report
+
+    # --- İç yardımcılar ---
+
+    def _subdirs(self, root: Path) -> List[Path]:
+        return [p for p in root.iterdir() if p.is_dir()] if root.exists() else []
+
+    def _remove(self, path: Path, kind: str, report: Dict[str, Any], dry_run: bool):
+        try:
+            age = _age_seconds(path)
+            if age < self.min_age_seconds:
+                report["skipped"].append({"kind": kind, "path": str(path), "reason": "recent"})
+                return
+            size = _tree_size(path)
+            if not dry_run:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink(missing_ok=True)
+            report["removed"].append({"kind": kind, "path": str(path), "bytes": size})
+        except Exception as e:
+            report["errors"].append({"path": str(path), "error": str(e)})
+
+    def _chat_stores(self, report: Dict[str, Any]) -> List[Path]:
+        """VECTOR_STORE_PATH altındaki sohbet depoları - kendi chroma.sqlite3'ü olan klasörler.
+
+        Kök dizindeki global deponun HNSW segment klasörleri de aynı yerde durur; bunlar ve
+        korunan depolar asla sohbet deposu sayılmaz.
+        """
+        root_segments = set()
+        if (self.vector_root / "chroma.sqlite3").exists():
+            root_segments = self._live_segments(self.vector_root, report)
+            if root_segments is None:
+                return []  # Global deponun segmentleri bilinmeden hiçbir klasöre dokunulmaz
+        return [p for p in self._subdirs(self.vector_root)
+                if (p / "chroma.sqlite3").exists()
+                and p.name not in root_segments
+                and p.name not in PROTECTED_STORES]
+
+    def _live_segments(self, store: Path, report: Dict[str, Any]) -> Optional[set]:
+        """sqlite'taki segments tablosundaki segment id'leri; okunamazsa None"""
+        try:
+            with sqlite3.connect(f"file:{store / 'chroma.sqlite3'}?mode=ro", uri=True, timeout=5) as conn:
+                return {row[0] for row in conn.execute("SELECT id FROM segments")}
+        except sqlite3.Error as e:
+            report["errors"].append({"path": str(store), "error": f"segments okunamadı: {e}"})
+            return None
+
+    def _orphan_segments(self, store: Path, report: Dict[str, Any]) -> List[Path]:
+        """sqlite'taki segments tablosunda karşılığı olmayan segment klasörleri"""
+        live = self._live_segments(store, report)
+        if live is None:
+            return []
+        return [p for p in self._subdirs(store) if p.name not in live]
+
+    def _temp_files(self, roots: Iterable[Path]) -> List[Path]:
+        found = set()
+        for root in roots:
+            if root.exists():
+                for pattern in TEMP_PATTERNS:
+                    found.update(p for p in root.rglob(pattern) if p.is_file())
+        return sorted(found)
+
+    def _sqlite_files(self, known: set) -> List[Path]:
+        files = [store / "chroma.sqlite3" for store in self._subdirs(self.vector_root)
+                 if store.name in known or store.name in PROTECTED_STORES]
+        files.append(self.vector_root / "chroma.sqlite3")  # chat_id'siz global depo
+        files.append(Path(Config.DATABASE_PATH))
+        return [p for p in files if p.exists()]
+
+    def _purge_soft_deleted(self, report: Dict[str, Any]):
+        db_path = Path(Config.DATABASE_PATH)
+        if not db_path.exists():
+            return
+        try:
+            from .database import DatabaseManager
+            purged = DatabaseManager(str(db_path)).purge_deleted_chats()
+            report["purged_chats"] = purged
+        except Exception as e:
+            report["errors"].append({"path": str(db_path), "error": str(e)})
+
+    def _vacuum(self, db_path: Path, report: Dict[str, Any]):
+        before = db_path.stat().st_size
+        try:
+            # Chroma aynı dosyayı açık tutuyor olabilir; kilit alınamazsa beklemeden atlanır
+            conn = sqlite3.connect(str(db_path), timeout=Config.RECLAIM_VACUUM_TIMEOUT, isolation_level=None)
+            try:
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+        except sqlite3.OperationalError as e:
+            report["skipped"].append({"kind": "vacuum", "path": str(db_path), "reason": str(e)})
+            return
+        after = db_path.stat().st_size
+        report["vacuumed"].append({"path": str(db_path), "before": before, "after": after})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Silinmiş sohbetlerden kalan verileri temizle")
+    parser.add_argument("--dry-run", action="store_true", help="Silmeden yalnızca raporla")
+    parser.add_argument("--min-age", type=int, default=None, help="Saniye - bundan yeni dosyalara dokunulmaz")
+    args = parser.parse_args(argv)
+
+    from .chat_manager import ChatManager
+    report = StorageReclaimer(ChatManager(), min_age_seconds=args.min_age).run(dry_run=args.dry_run)
+
+    by_kind: Dict[str, List[int]] = {}
+    for item in report["removed"]:
+        by_kind.setdefault(item["kind"], []).append(item["bytes"])
+    print(f"🧹 {'Silinecek' if args.dry_run else 'Silinen'}: {len(report['removed'])} öğe")
+    for kind, sizes in sorted(by_kind.items()):
+        print(f"   • {kind}: {len(sizes)} öğe, {sum(sizes) / (1024 * 1024):.1f}MB")
+    for item in report["vacuumed"]:
+        print(f"   • VACUUM {item['path']}: {item['before'] / 1024:.0f}KB → {item['after'] / 1024:.0f}KB")
+    print(f"💾 Geri kazanılan: {report['reclaimed_mb']}MB ({report['elapsed_s']}s)")
+    if report["skipped"]:
+        print(f"⏭️ Atlanan: {len(report['skipped'])}")
+    for error in report["errors"]:
+        print(f"❌ {error['path']}: {error['error']}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,187 @@
+# src/core/research_cache.py
+
+import json
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import Config
+from . import resource_pool
+
+logger = logging.getLogger(__name__)
+
+# Konu karşılaştırmasında anlam taşımayan istek kalıpları
+_TOPIC_STOPWORDS = {
+    "araştır", "araştırır", "araştırma", "araştırması", "yap", "yapar", "mısın", "misin",
+    "hakkında", "ile", "ilgili", "bilgi", "ver", "verir", "nedir", "ne", "bana", "lütfen",
+    "detaylı", "kapsamlı", "bir", "ve", "konusunu", "konusu", "web", "de", "da", "internette",
+}
+
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+
+
+def normalize_topic(text: str) -> str:
+    """Konu metnini karşılaştırma için normalize eder (küçük harf, noktalama ve dolgu kelimeler temizlenir)"""
+    text = (text or "").translate(_TURKISH_LOWER).lower()
+    words = re.findall(r"\w+", text)
+    seen = []
+    for word in words:
+        if word not in _TOPIC_STOPWORDS and word not in seen:
+            seen.append(word)
+    return " ".join(seen)
+
+
+class ResearchCache:
+    """research_data/ altındaki CrewAI araştırmalarını konu bazında yeniden kullanır.
+
+    Önce normalize edilmiş konu ile birebir eşleşme, sonra önceki konular
+    üzerinde embedding benzerliği aranır. TTL'den eski sonuçlar sunulmaz.
+    """
+
+    def __init__(self, data_dir: str = None, ttl_hours: float = None, similarity_threshold: float = None):
+        self.data_dir = Path(data_dir or Config.RESEARCH_DATA_DIR)
+        self.ttl = timedelta(hours=ttl_hours if ttl_hours is not None else Config.RESEARCH_CACHE_TTL_HOURS)
+        self.similarity_threshold = similarity_threshold or Config.RESEARCH_CACHE_SIMILARITY
+
+        self._entries: Dict[str, Dict[str, Any]] = {}  # normalize konu -> en yeni araştırma
+        self._embeddings: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "stale": 0}
+
+    def index_directory(self) -> int:
+        """Kayıtlı araştırma JSON dosyalarını indeksler (startup'ta arka planda çağrılır)"""
+        if not self.data_dir.exists():
+            return 0
+        count = 0
+        for path in sorted(self.data_dir.glob("crew_research_*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("topic") and data.get("subtopics"):
+                    self.add(data["topic"], str(path), data.get("timestamp"))
+                    count += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Araştırma dosyası indekslenemedi ({path.name}): {e}")
+        logger.info(f"📚 Araştırma önbelleği: {count} kayıt indekslendi")
+        return count
+
+    def add(self, topic: str, path: str, timestamp: Optional[str] = None):
+        """Yeni kaydedilen bir araştırmayı önbelleğe ekler"""
+        key = normalize_topic(topic)
+        if not key:
+            return
+        created_at = self._parse_timestamp(timestamp)
+        with self._lock:
+            current = self._entries.get(key)
+            if current and current["created_at"] >= created_at:
+                return
+            self._entries[key] = {"topic": topic, "path": path, "created_at": created_at}
+            self._embeddings.pop(key, None)
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Konuya uyan taze bir araştırma varsa kayıtlı veriyi ve eşleşme bilgisini döner"""
+        key = normalize_topic(query)
+        if not key:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+        similarity = 1.0 if entry else None
+
+        if entry is None:
+            entry, similarity = self._semantic_match(key)
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        age = datetime.utcnow() - entry["created_at"]
+        if age > self.ttl:
+            self._stats["stale"] += 1
+            return None
+
+        try:
+            with open(entry["path"], 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Önbellekteki araştırma okunamadı ({entry['path']}): {e}")
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+
+        self._stats["hits" if similarity == 1.0 else "semantic_hits"] += 1
+        return {
+            "data": data,
+            "path": entry["path"],
+            "matched_topic": entry["topic"],
+            "similarity": round(similarity, 3),
+            "age_seconds": int(age.total_seconds()),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._entries), "ttl_hours": self.ttl.total_seconds() / 3600}
+
+    # --- İç yardımcılar ---
+
+    def _semantic_match(self, key: str):
+        """Önceki konular arasında embedding benzerliği en yüksek olanı bulur"""
+        # index_directory başlangıç thread'inde add() çağırırken sözlükler değişebilir: kopyalarla çalışılır
+        with self._lock:
+            candidates = list(self._entries.items())
+            embeddings = dict(self._embeddings)
+        if not candidates:
+            return None, None
+        try:
+            model = resource_pool.get_embedding_model()
+            missing = [k for k, _ in candidates if k not in embeddings]
+            if missing:
+                computed = dict(zip(missing, model.encode(missing, normalize_embeddings=True)))
+                embeddings.update(computed)
+                with self._lock:
+                    self._embeddings.update(computed)
+            query_vector = model.encode([key], normalize_embeddings=True)[0]
+        except Exception as e:
+            logger.warning(f"⚠️ Anlamsal araştırma eşleştirmesi yapılamadı: {e}")
+            return None, None
+
+        best_entry, best_score = None, 0.0
+        for k, entry in candidates:
+            score = float(embeddings[k] @ query_vector)
+            if score > best_score:
+                best_entry, best_score = entry, score
+        if best_score >= self.similarity_threshold:
+            return best_entry, best_score
+        return None, None
+
+    @staticmethod
+    def _parse_timestamp(timestamp: Optional[str]) -> datetime:
+        """Zaman damgası yoksa şimdi; okunamıyorsa en eski tarih (bozuk kayıt hiç taze sayılmasın)"""
+        if not timestamp:
+            return datetime.utcnow()
+        try:
+            return datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Araştırma zaman damgası okunamadı, eski sayılıyor: {timestamp!r}")
+            return datetime.min
+
+    @staticmethod
+    def format_age(seconds: int) -> str:
+        if seconds < 3600:
+            return f"{max(1, seconds // 60)} dakika"
+        if seconds < 86400:
+            return f"{seconds // 3600} saat"
+        return f"{seconds // 86400} gün"
+
+
+research_cache = ResearchCache()
+
+
+def is_refresh_request(message: str) -> bool:
+    """Kullanıcı önbellek yerine yeni araştırma istiyor mu"""
+    text = (message or "").translate(_TURKISH_LOWER).lower()
+    # Tam kelime eşleşmesi: "güncelle" anahtarı "güncellenmiş müfredat" konusunda tetiklenmesin
+    return any(re.search(rf"(?<!\w){re.escape(keyword)}(?!\w)", text)
+               for keyword in Config.RESEARCH_REFRESH_KEYWORDS)
@@ -0,0 +1,193 @@
+# src/core/resource_pool.py
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Süreç genelinde paylaşılan ağır kaynaklar. Her kaynak ilk kullanımda bir kez
+# oluşturulur; diyalog ve CrewAI örnekleri bu kaynakları kendileri üretmez.
+_resources: Dict[str, Any] = {}
+_load_times: Dict[str, float] = {}
+_lock = threading.Lock()
+_key_locks: Dict[str, threading.Lock] = {}
+
+
+def _get_or_create(key: str, factory: Callable[[], Any]) -> Any:
+    """Kaynağı döner, yoksa thread-safe şekilde bir kez oluşturur"""
+    resource = _resources.get(key)
+    if resource is not None:
+        return resource
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Farklı kaynaklar birbirini beklemeden paralel yüklenebilsin
+    with key_lock:
+        resource = _resources.get(key)
+        if resource is None:
+            start = time.perf_counter()
+            resource = factory()
+            _load_times[key] = time.perf_counter() - start
+            _resources[key] = resource
+            logger.info(f"📦 Paylaşılan kaynak yüklendi: {key} ({_load_times[key]:.2f}s)")
+    return resource
+
+
+def get_whisper_model():
+    """faster-whisper modelini döner"""
+    def factory():
+        from faster_whisper import WhisperModel
+        return WhisperModel(
+            Config.WHISPER_MODEL_SIZE,
+            device="cpu",
+            compute_type=Config.WHISPER_COMPUTE_TYPE,
+            num_workers=Config.WHISPER_WORKERS,
+        )
+    return _get_or_create("whisper", factory)
+
+
+def configure_torch_threads():
+    """TORCH_NUM_THREADS verilmişse torch'un CPU thread sayısını bir kez ayarlar"""
+    def factory():
+        import torch
+        if Config.TORCH_NUM_THREADS > 0:
+            torch.set_num_threads(Config.TORCH_NUM_THREADS)
+        return torch.get_num_threads()
+    return _get_or_create("torch_threads", factory)
+
+
+def get_ocr_model(kind: str):
+    """TrOCR işlemci ve modelini döner (CPU'da Linear katmanlar int8'e çevrilir)"""
+    def factory():
+        import torch
+        from transformers import TrOCRProcessor, VisionEncoderDecoderModel
+
+        configure_torch_threads()
+        name = Config.OCR_MODELS[kind]
+        processor = TrOCRProcessor.from_pretrained(name)
+        model = VisionEncoderDecoderModel.from_pretrained(name).eval()
+        if Config.OCR_QUANTIZE:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return processor, model
+    return _get_or_create(f"ocr:{kind}", factory)
+
+
+def get_crew_llm(temperature: float = 0.6):
+    """CrewAI ajanları için Gemini LLM istemcisini döner"""
+    def factory():
+        from .llm_governor import create_governed_crew_llm
+        return create_governed_crew_llm(
+            model=f"gemini/{Config.GEMINI_MODEL}",
+            api_key=Config.GOOGLE_API_KEY,
+            temperature=temperature
+        )
+    return _get_or_create(f"crew_llm:{temperature}", factory)
+
+
+def get_chat_llm():
+    """LangGraph diyalogları için ChatGoogleGenerativeAI istemcisini döner"""
+    def factory():
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model=Config.GEMINI_MODEL,
+            google_api_key=Config.GOOGLE_API_KEY,
+            temperature=Config.GEMINI_TEMPERATURE,
+        )
+    return _get_or_create("chat_llm", factory)
+
+
+def get_embedding_model():
+    """Sentence transformer embedding modelini döner"""
+    def factory():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(Config.EMBEDDING_MODEL)
+    return _get_or_create("embedding_model", factory)
+
+
+def get_web_search_tool():
+    """SerperDevTool örneğini döner"""
+    def factory():
+        from crewai_tools import SerperDevTool
+        return SerperDevTool()
+    return _get_or_create("web_search_tool", factory)
+
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """İsimlendirilmiş paylaşılan thread havuzunu döner"""
+    max_workers = Config.SHARED_EXECUTOR_WORKERS.get(name, 4)
+    return _get_or_create(
+        f"executor:{name}",
+        lambda: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+    )
+
+
+def build_agents(templates: Dict[str, Dict[str, Any]], llms: Dict[str, Any], tools: Dict[str, Any]) -> Dict[str, Any]:
+    """Ajan şablonlarından CrewAI ajanları oluşturur.
+
+    CrewAI ajanları çalıştıkları Crew'a bağlandığı için örnekler arasında
+    paylaşılmaz; yalnızca şablonlar, LLM istemcileri ve araçlar paylaşılır.
+    """
+    from crewai import Agent
+
+    agents = {}
+    for name, template in templates.items():
+        spec = dict(template)
+        spec["llm"] = llms[spec.get("llm", "default")]
+        spec["tools"] = [tools[tool_name] for tool_name in spec.get("tools", [])]
+        agents[name] = Agent(**spec)
+    return agents
+
+
+def warm_up(components=None):
+    """Ağır kütüphaneleri ve modelleri önceden yükler (arka plan thread'inde çağrılır)"""
+    import importlib
+
+    components = components or Config.PRELOAD_COMPONENTS
+    steps = {
+        "conversation": lambda: importlib.import_module("core.conversation"),
+        "vector_store": lambda: importlib.import_module("chromadb"),
+        "llm": get_chat_llm,
+        "crew": lambda: (
+            importlib.import_module("agents.research_crew"),
+            importlib.import_module("agents.crew_agents"),
+            get_crew_llm(temperature=0.6),
+            get_crew_llm(temperature=0.7),
+        ),
+        "whisper": get_whisper_model,
+        "ocr": lambda: [get_ocr_model(kind) for kind in Config.OCR_MODELS],
+        "intent": lambda: importlib.import_module("core.intent_router").intent_router.build(),
+    }
+    for name in components:
+        step = steps.get(name)
+        if step is None:
+            logger.warning(f"⚠️ Bilinmeyen ön yükleme bileşeni: {name}")
+            continue
+        start = time.perf_counter()
+        try:
+            step()
+            _load_times.setdefault(f"preload:{name}", time.perf_counter() - start)
+            logger.info(f"🔥 Ön yükleme tamamlandı: {name} ({time.perf_counter() - start:.2f}s)")
+        except Exception as e:
+            logger.error(f"❌ Ön yükleme hatası ({name}): {e}")
+
+
+def get_stats() -> Dict[str, Any]:
+    """Yüklenmiş kaynakları ve yükleme sürelerini döner"""
+    return {
+        "loaded": sorted(_resources.keys()),
+        "load_times": {key: round(value, 3) for key, value in _load_times.items()}
+    }
+
+
+def shutdown():
+    """Paylaşılan thread havuzlarını kapatır"""
+    for key, resource in list(_resources.items()):
+        if isinstance(resource, ThreadPoolExecutor):
+            resource.shutdown(wait=False)
+            _resources.pop(key, None)
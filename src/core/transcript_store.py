@@ -0,0 +1,201 @@
+# src/core/transcript_store.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .config import Config
+from . import resource_pool
+
+logger = logging.getLogger(__name__)
+
+_VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|shorts/|embed/|live/)([A-Za-z0-9_-]{11})")
+
+
+def extract_video_id(video_url: str) -> Optional[str]:
+    """YouTube linkinden 11 karakterlik video kimliğini çıkarır"""
+    match = _VIDEO_ID_PATTERN.search(video_url or "")
+    if match:
+        return match.group(1)
+    candidate = (video_url or "").strip()
+    return candidate if re.fullmatch(r"[A-Za-z0-9_-]{11}", candidate) else None
+
+
+class TranscriptStore:
+    """Video kimliğine göre diskte tutulan transkript ve ses deposu.
+
+    Aynı video tekrar istendiğinde ne indirme ne de Whisper çalışır. Ses
+    dosyaları da ayrıca saklanır; transkript ayarları değişse bile video
+    yeniden indirilmez. Whisper ayrı bir thread havuzunda çalışır.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = Path(root or Config.TRANSCRIPT_CACHE_DIR)
+        self.transcript_dir = self.root / "transcripts"
+        self.audio_dir = self.root / "audio"
+
+        self._lock = threading.Lock()
+        self._video_locks: Dict[str, threading.Lock] = {}
+        self._seconds_per_minute = deque(maxlen=50)
+        self.stats = {"transcript_hits": 0, "transcript_misses": 0, "audio_hits": 0, "audio_downloads": 0, "errors": 0}
+
+    def get_transcript(self, video_url: str, on_segment: Callable = None, model: Any = None) -> Dict[str, Any]:
+        """Videonun transkriptini döner; yoksa indirir, çözer ve kaydeder"""
+        video_id = extract_video_id(video_url) or hashlib.sha1(video_url.encode("utf-8")).hexdigest()[:16]
+
+        # Aynı video için eşzamanlı istekler tek bir transkripsiyonu bekler
+        with self._video_lock(video_id):
+            cached = self._load_transcript(video_id)
+            if cached is not None:
+                self.stats["transcript_hits"] += 1
+                return cached
+
+            self.stats["transcript_misses"] += 1
+            try:
+                audio_path = self._fetch_audio(video_url, video_id)
+                future = resource_pool.get_executor("whisper").submit(self._transcribe, audio_path, on_segment, model)
+                record = future.result()
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+
+            record.update({"video_id": video_id, "url": video_url, "created_at": datetime.utcnow().isoformat()})
+            if record["text"]:
+                self._write_json(self.transcript_dir / f"{video_id}.json", record)
+            return record
+
+    def get_stats(self) -> Dict[str, Any]:
+        samples = list(self._seconds_per_minute)
+        return {
+            **self.stats,
+            "avg_seconds_per_audio_minute": round(sum(samples) / len(samples), 2) if samples else None,
+            "beam_size": Config.WHISPER_BEAM_SIZE,
+            "compute_type": Config.WHISPER_COMPUTE_TYPE,
+        }
+
+    # --- İç yardımcılar ---
+
+    def _video_lock(self, video_id: str) -> threading.Lock:
+        with self._lock:
+            return self._video_locks.setdefault(video_id, threading.Lock())
+
+    def _load_transcript(self, video_id: str) -> Optional[Dict[str, Any]]:
+        path = self.transcript_dir / f"{video_id}.json"
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Kayıtlı transkript okunamadı ({video_id}): {e}")
+            return None
+
+    def _fetch_audio(self, video_url: str, video_id: str) -> Path:
+        """Ses dosyasını önbellekten döner, yoksa yt-dlp ile indirir"""
+        audio_path = self.audio_dir / f"{video_id}.mp3"
+        if audio_path.exists():
+            self.stats["audio_hits"] += 1
+            os.utime(audio_path)  # LRU temizliği için son kullanım zamanı
+            return audio_path
+
+        import yt_dlp
+
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        partial_base = self.audio_dir / f"{video_id}.download"
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'}],
+            'outtmpl': str(partial_base), 'quiet': True, 'no_warnings': True,
+            'updatetime': False,  # mtime sunucunun Last-Modified'ı olmasın (LRU sırası bozulur)
+        }
+        partial_path = partial_base.with_name(partial_base.name + ".mp3")
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([video_url])
+            if not partial_path.exists():
+                raise FileNotFoundError("Ses dosyası indirilemedi")
+            # Yarım kalmış indirmeler önbellekte görünmesin
+            os.replace(partial_path, audio_path)
+            os.utime(audio_path)  # Yeni indirilen dosya en son kullanılan sayılır
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+
+        self.stats["audio_downloads"] += 1
+        self._evict_audio(keep=audio_path)
+        return audio_path
+
+    def _evict_audio(self, keep: Path = None):
+        """Ses önbelleği sınırı aşarsa en uzun süredir kullanılmayan dosyaları siler (keep henüz çözümlenmedi)"""
+        limit = Config.AUDIO_CACHE_MAX_MB * 1024 * 1024
+        files = sorted(self.audio_dir.glob("*.mp3"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= limit:
+                break
+            if path == keep:
+                continue
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            logger.info(f"🧹 Ses önbelleğinden silindi: {path.name}")
+
+    def _transcribe(self, audio_path: Path, on_segment: Callable = None, model: Any = None) -> Dict[str, Any]:
+        """Whisper ile çözümler; segmentler çözüldükçe on_segment ile bildirilir"""
+        model = model or resource_pool.get_whisper_model()
+        start = time.perf_counter()
+        segments, info = model.transcribe(str(audio_path), beam_size=Config.WHISPER_BEAM_SIZE, vad_filter=True)
+
+        parts = []
+        first_segment_seconds = None
+        for segment in segments:
+            if first_segment_seconds is None:
+                first_segment_seconds = time.perf_counter() - start
+            text = segment.text.strip()
+            parts.append({"start": round(segment.start, 2), "end": round(segment.end, 2), "text": text})
+            if on_segment:
+                try:
+                    on_segment(segment.start, segment.end, text, info.duration)
+                except Exception as e:
+                    logger.debug(f"Segment bildirimi başarısız: {e}")
+
+        elapsed = time.perf_counter() - start
+        audio_minutes = (info.duration or 0) / 60
+        seconds_per_minute = elapsed / audio_minutes if audio_minutes else None
+        if seconds_per_minute is not None:
+            self._seconds_per_minute.append(seconds_per_minute)
+        logger.info(
+            f"🎙️ Transkript: {audio_path.stem} {audio_minutes:.1f}dk ses {elapsed:.1f}s'de çözüldü"
+            + (f" ({seconds_per_minute:.2f}s/dk)" if seconds_per_minute else "")
+        )
+
+        return {
+            "text": " ".join(part["text"] for part in parts).strip(),
+            "segments": parts,
+            "language": getattr(info, "language", None),
+            "duration": info.duration,
+            "transcribe_seconds": round(elapsed, 2),
+            "first_segment_seconds": round(first_segment_seconds, 2) if first_segment_seconds is not None else None,
+            "seconds_per_audio_minute": round(seconds_per_minute, 2) if seconds_per_minute else None,
+            "model": Config.WHISPER_MODEL_SIZE,
+            "beam_size": Config.WHISPER_BEAM_SIZE,
+            "compute_type": Config.WHISPER_COMPUTE_TYPE,
+        }
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+transcript_store = TranscriptStore()
@@ -3,19 +3,28 @@
 import os
 import logging
 from typing import List, Dict, Any, Optional
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-import PyPDF2
 from pathlib import Path
 import json
 from datetime import datetime
 import hashlib
-from .document_processor import DocumentProcessor # YENİ: DocumentProcessor import edildi
+from .ingestion import extract_document_blocks
+from .document_processor import blocks_to_text
+from .config import Config
+from . import resource_pool
 
 
 logger = logging.getLogger(__name__)
 
+# Sohbetin etkin koleksiyon adını tutan dosya - migration yeni koleksiyonu bu dosyayı değiştirerek devreye alır
+ACTIVE_COLLECTION_FILE = "active_collection.json"
+
+
+def index_version() -> str:
+    """Embedding modeli + parçalama ayarları; biri değişince eski kayıtlar farklı sürümde görünür"""
+    model = Config.EMBEDDING_MODEL.rsplit("/", 1)[-1]
+    return f"{model}:{Config.CHUNK_SIZE}:{Config.CHUNK_OVERLAP}:{Config.EXTRACTOR_VERSION}"
+
+
 class VectorStore:
     def __init__(self, persist_directory: str = "chroma_db", chat_id: str = None):
         """ChromaDB tabanlı vektör deposu başlatır - Chat ID ile izole edilmiş"""
@@ -28,7 +37,9 @@ class VectorStore:
         
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
-        # ChromaDB istemcisini başlat
+        # ChromaDB istemcisini başlat - import ilk vector store oluşturulurken yapılır
+        import chromadb
+        from chromadb.config import Settings
         self.client = chromadb.PersistentClient(
             path=str(self.persist_directory),
             settings=Settings(
@@ -37,23 +48,59 @@ class VectorStore:
             )
         )
         
-        # Sentence transformer modelini yükle
-        self.embedding_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        
         # Collection adı - chat ID varsa ona göre
-        collection_name = f"pdf_documents_{chat_id}" if chat_id else "pdf_documents"
+        self.base_collection_name = f"pdf_documents_{chat_id}" if chat_id else "pdf_documents"
+        self.pointer_path = self.persist_directory / ACTIVE_COLLECTION_FILE
+        self._pointer_mtime = None
+        self._collection = None
+        self._resolve_collection()
+        
+        logger.info(f"✅ VectorStore başlatıldı (Chat: {chat_id or 'global'}). Koleksiyon: {self.collection.count()} doküman")
+
+    @property
+    def collection(self):
+        """Etkin koleksiyon - migration koleksiyonu değiştirdiyse açık örnekler de bir sonraki erişimde geçer"""
+        try:
+            mtime = self.pointer_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._pointer_mtime:
+            self._resolve_collection()
+        return self._collection
+
+    def _resolve_collection(self):
+        name = self.base_collection_name
+        try:
+            self._pointer_mtime = self.pointer_path.stat().st_mtime
+            with open(self.pointer_path, "r", encoding="utf-8") as f:
+                name = json.load(f)["collection"]
+        except FileNotFoundError:
+            self._pointer_mtime = None
+        except Exception as e:
+            logger.warning(f"⚠️ Etkin koleksiyon dosyası okunamadı, varsayılan kullanılıyor: {e}")
         
         # Koleksiyonu al veya oluştur
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
+        self._collection = self.client.get_or_create_collection(
+            name=name,
             metadata={"hnsw:space": "cosine"}
         )
-        
-        logger.info(f"✅ VectorStore başlatıldı (Chat: {chat_id or 'global'}). Koleksiyon: {self.collection.count()} doküman")
+
+    @property
+    def embedding_model(self):
+        """Sentence transformer modeli - paylaşılan havuzdan ilk kullanımda yüklenir"""
+        return resource_pool.get_embedding_model()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Parçaları/sorguları Config.EMBEDDING_MODEL ile vektörleştirir (Chroma'nın varsayılan modeli yerine)"""
+        vectors = self.embedding_model.encode(
+            texts, batch_size=Config.EMBEDDING_BATCH_SIZE, normalize_embeddings=True, show_progress_bar=False
+        )
+        return vectors.tolist()
 
     def extract_text_from_pdf(self, pdf_file) -> str:
         """PDF dosyasından metin çıkarır"""
         try:
+            import PyPDF2
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             text = ""
             
@@ -98,15 +145,120 @@ class VectorStore:
         
         return chunks
 
-    def add_document_from_path(self, file_path: str, filename: str, metadata: Optional[Dict] = None) -> bool:
-        """Verilen yoldaki dökümanı işler ve vektör deposuna ekler"""
+    def chunk_blocks(self, blocks: List[Dict[str, Any]], chunk_size: int = 1000, overlap: int = 200) -> List[Dict[str, Any]]:
+        """Yapısal blokları parçalara böler: başlıklar yeni parça başlatır, paragraf/tablo ortadan kesilmez.
 
-        try:
-            # PDF'den metin çıkar
-            text = DocumentProcessor.read_document(file_path)
+        Her parça {"text", "section"?, "page"?} döner; chunk_size'ı aşan tek blok chunk_text ile bölünür.
+        """
+        chunks: List[Dict[str, Any]] = []
+        headings: List[str] = []
+        parts: List[tuple] = []  # (metin, sayfa)
+        carried = 0  # parts başındaki, önceki parçada zaten yer alan blok sayısı
+        heading_parts = 0  # parts başındaki başlık sayısı - parts yalnızca başlıksa tek başına parça olmaz
+        size = 0
+
+        def emit(text: str, page):
+            chunk = {"text": text}
+            if headings:
+                chunk["section"] = " > ".join(h for h in headings if h)
+            if page is not None:
+                chunk["page"] = page
+            chunks.append(chunk)
+
+        def flush(keep_tail: bool = False):
+            nonlocal parts, carried, heading_parts, size
+            if len(parts) > max(carried, heading_parts):
+                emit("\n".join(text for text, _ in parts), parts[0][1])
+            # Bağlam kopmasın diye kısa son blok bir sonraki parçaya da taşınır (tek bloklu parça tekrar edilmez)
+            parts = parts[-1:] if keep_tail and len(parts) > 1 and len(parts[-1][0]) <= overlap else []
+            carried = len(parts)
+            heading_parts = 0
+            size = sum(len(text) + 1 for text, _ in parts)
+
+        for block in blocks:
+            text = block["text"].strip()
             if not text:
-                logger.error(f"❌ Dökümandan metin çıkarılamadı: {filename}")
+                continue
+            page = block.get("page")
+
+            if block["type"] == "heading":
+                # Art arda başlıklar (Bölüm 1 > Alt 1.1) ilk paragrafla aynı parçada kalır
+                if not parts or heading_parts < len(parts):
+                    flush()
+                    parts, size = [], 0
+                level = block.get("level", 1)
+                headings = headings[:level - 1] + [""] * (level - 1 - len(headings)) + [text]
+                parts.append((text, page))
+                heading_parts += 1
+                size += len(text) + 1
+                continue
+
+            if len(text) > chunk_size:
+                # Bekleyen başlıklar uzun bloğun ilk parçasının metninde kalır
+                pending_headings = [t for t, _ in parts] if parts and heading_parts == len(parts) else []
+                flush()
+                for piece in self.chunk_text("\n".join(pending_headings + [text]), chunk_size, overlap):
+                    emit(piece, page)
+                continue
+
+            if size + len(text) > chunk_size:
+                flush(keep_tail=True)
+            parts.append((text, page))
+            size += len(text) + 1
+
+        if parts and heading_parts == len(parts):
+            # Yalnızca başlıktan oluşan döküman ya da sondaki başlık(lar) kaybolmasın
+            emit("\n".join(text for text, _ in parts), parts[0][1])
+        else:
+            flush()
+        return chunks
+
+    def add_document_from_path(self, file_path: str, filename: str, metadata: Optional[Dict] = None,
+                               progress=None) -> str:
+        """Verilen yoldaki dökümanı işler ve vektör deposuna ekler (görüntü ve taranmış sayfalar OCR'dan geçer).
+
+        Dönen durum: 'added', 'duplicate' (içerik zaten kayıtlı, dosya eklenmedi) veya 'failed'.
+        """
+        prepared = self.prepare_document(file_path, filename, metadata, progress=progress)
+        if prepared["status"] != "ready":
+            return prepared["status"]
+        return "added" if self.add_prepared([prepared]) else "failed"
+
+    def discard_unreferenced(self, file_path) -> bool:
+        """Yinelenen/başarısız yüklemenin dosyasını siler - hiçbir kayıt o yolu göstermiyorsa.
+
+        Aynı saniyede aynı adla gelen ikinci yükleme ilk dosyanın üzerine yazılmış olabilir; o durumda silinmez.
+        """
+        try:
+            if self.collection.get(where={"upload_path": str(file_path)}, limit=1, include=[])['ids']:
                 return False
+            Path(file_path).unlink(missing_ok=True)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Yüklenen dosya silinemedi ({file_path}): {e}")
+            return False
+
+    def prepare_document(self, file_path: str, filename: str, metadata: Optional[Dict] = None,
+                         progress=None) -> Dict[str, Any]:
+        """Metni çıkarır ve parçaları hazırlar, depoya yazmaz.
+
+        status: 'ready' (ids/documents/metadatas dolu), 'duplicate' veya 'failed' (error ile).
+        Toplu içe aktarma birden fazla hazır dökümanı tek add_prepared çağrısında yazar.
+        metadata['content_sha256'] (yükleme sırasında hesaplanan ham dosya özeti) varsa aynı
+        dosya metin çıkarılmadan yinelenen sayılır.
+        """
+        try:
+            content_hash = (metadata or {}).get("content_sha256")
+            if content_hash and self.collection.get(where={"content_sha256": content_hash}, limit=1)['ids']:
+                logger.info(f"📄 Doküman zaten mevcut (aynı dosya): {filename}")
+                return {"status": "duplicate", "filename": filename, "file_hash": content_hash}
+            
+            # Dökümandan yapısal blokları çıkar - progress(olay) sayfa başına çağrılır
+            blocks = extract_document_blocks(file_path, progress=progress, digest=content_hash)
+            text = blocks_to_text(blocks)
+            if not text.strip():
+                logger.error(f"❌ Dökümandan metin çıkarılamadı: {filename}")
+                return {"status": "failed", "filename": filename, "error": "Metin çıkarılamadı"}
             
             # Dosya hash'i oluştur (tekrar kontrol için)
             file_hash = hashlib.md5(text.encode()).hexdigest()
@@ -118,51 +270,78 @@ class VectorStore:
             
             if existing['ids']:
                 logger.info(f"📄 Doküman zaten mevcut: {filename}")
-                return True
+                return {"status": "duplicate", "filename": filename, "file_hash": file_hash}
             
             # Metni parçalara böl
-            chunks = self.chunk_text(text)
+            chunks = self.chunk_blocks(blocks, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP)
             if not chunks:
                 logger.error(f"❌ Metin parçalanmadı: {filename}")
-                return False
+                return {"status": "failed", "filename": filename, "error": "Metin parçalanmadı"}
             
             # Metadata hazırla
             doc_metadata = {
                 "filename": filename,
-                "file_hash": file_hash,
                 "chat_id": self.chat_id,  # Chat ID'yi ekle
                 "upload_date": datetime.now().isoformat(),
-                "chunk_count": len(chunks),
                 **(metadata or {})
             }
             
-            # Her parça için ID ve metadata oluştur
-            ids = []
-            metadatas = []
-            documents = []
+            return {"status": "ready", "filename": filename, "file_hash": file_hash,
+                    **self.build_records(file_hash, chunks, doc_metadata)}
             
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{file_hash}_{i}"
-                chunk_metadata = {
-                    **doc_metadata,
-                    "chunk_index": i,
-                    "chunk_id": chunk_id
-                }
-                
-                ids.append(chunk_id)
-                metadatas.append(chunk_metadata)
-                documents.append(chunk)
+        except Exception as e:
+            logger.error(f"❌ PDF hazırlama hatası: {e}")
+            return {"status": "failed", "filename": filename, "error": str(e)}
+
+    def build_records(self, file_hash: str, chunks: List[Dict[str, Any]], doc_metadata: Dict[str, Any]) -> Dict[str, List]:
+        """Parçalardan Chroma kayıtlarını (ids/documents/metadatas) oluşturur"""
+        doc_metadata = {
+            **doc_metadata,
+            "file_hash": file_hash,
+            "chunk_count": len(chunks),
+            "index_version": index_version()  # Karışık (eski/yeni ayarlı) indeksler tespit edilebilsin
+        }
+        
+        # Her parça için ID ve metadata oluştur
+        ids = []
+        metadatas = []
+        documents = []
+        
+        for i, chunk in enumerate(chunks):
+            chunk_id = f"{file_hash}_{i}"
+            chunk_metadata = {
+                **doc_metadata,
+                "chunk_index": i,
+                "chunk_id": chunk_id
+            }
+            # Başlık yolu / sayfa numarası varsa kaynak gösterimi için saklanır
+            for key in ("section", "page"):
+                if key in chunk:
+                    chunk_metadata[key] = chunk[key]
             
-            # Vektör deposuna ekle
-            self.collection.add(
-                ids=ids,
+            ids.append(chunk_id)
+            metadatas.append(chunk_metadata)
+            documents.append(chunk["text"])
+        
+        return {"ids": ids, "documents": documents, "metadatas": metadatas}
+
+    def add_prepared(self, prepared: List[Dict[str, Any]]) -> bool:
+        """Hazırlanmış dökümanları tek Chroma çağrısında yazar (upsert - yarıda kalan deneme tekrarlanabilir)"""
+        if not prepared:
+            return True
+        try:
+            documents = [text for doc in prepared for text in doc["documents"]]
+            embeddings = self.embed(documents)
+            # Koleksiyon embedding'den sonra çözülür: uzun embedding sırasında etkin koleksiyon değişmiş olabilir
+            self.collection.upsert(
+                ids=[chunk_id for doc in prepared for chunk_id in doc["ids"]],
                 documents=documents,
-                metadatas=metadatas
+                embeddings=embeddings,
+                metadatas=[meta for doc in prepared for meta in doc["metadatas"]]
             )
-            
-            logger.info(f"✅ PDF eklendi: {filename} ({len(chunks)} parça) - Chat: {self.chat_id}")
+            for doc in prepared:
+                logger.info(f"✅ PDF eklendi: {doc['filename']} ({len(doc['ids'])} parça) - Chat: {self.chat_id}")
             return True
-            
         except Exception as e:
             logger.error(f"❌ PDF ekleme hatası: {e}")
             return False
@@ -171,7 +350,7 @@ class VectorStore:
         """Sorguya benzer dokümanları arar"""
         try:
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=self.embed([query]),
                 n_results=n_results,
                 include=["documents", "metadatas", "distances"]
             )
@@ -261,15 +440,30 @@ class VectorStore:
             logger.error(f"❌ İstatistik alma hatası: {e}")
             return {"error": str(e), "chat_id": self.chat_id}
 
+    def index_state(self) -> Dict[str, Any]:
+        """Kayıtların index_version dağılımı - 'mixed' True ise koleksiyon migration bekliyor"""
+        current = index_version()
+        total = self.collection.count()
+        up_to_date = len(self.collection.get(where={"index_version": current}, include=[])['ids']) if total else 0
+        return {
+            "index_version": current,
+            "collection": self.collection.name,
+            "total_chunks": total,
+            "current_chunks": up_to_date,
+            "stale_chunks": total - up_to_date,
+            "mixed": 0 < up_to_date < total,
+        }
+
     def clear_all_documents(self) -> bool:
         """Bu chat'e ait tüm dokümanları siler"""
         try:
             # Tüm collection'ı sıfırla
-            self.client.delete_collection(self.collection.name)
+            name = self.collection.name
+            self.client.delete_collection(name)
             
             # Yeniden oluştur
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection.name,
+            self._collection = self.client.get_or_create_collection(
+                name=name,
                 metadata={"hnsw:space": "cosine"}
             )
             
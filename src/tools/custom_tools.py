@@ -2,9 +2,7 @@
 
 import json
 import os
-import time
-import yt_dlp
-from faster_whisper import WhisperModel
+from typing import Any
 from crewai.tools import BaseTool
 from googleapiclient.discovery import build
 
@@ -15,27 +13,17 @@ class YouTubeTranscriptTool(BaseTool):
         "Bir YouTube video linkini girdi olarak alır ve videonun tam metin transkriptini döndürür. "
         "Girdi mutlaka geçerli bir YouTube video URL'si olmalıdır."
     )
-    model: WhisperModel
+    model: Any = None  # Verilmezse paylaşılan Whisper modeli kullanılır
+    on_segment: Any = None  # (start, end, text, duration) - segmentler çözüldükçe çağrılır
 
     def _run(self, video_url: str) -> str:
-        output_filename = f"temp_audio_{int(time.time() * 1000)}.mp3"
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'}],
-            'outtmpl': output_filename.replace('.mp3', ''), 'quiet': True, 'no_warnings': True,
-        }
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
-            if not os.path.exists(output_filename): return "HATA: Ses dosyası indirilemedi."
-            
-            segments, _ = self.model.transcribe(output_filename, beam_size=5, vad_filter=True)
-            transcript_text = "".join(segment.text for segment in segments).strip()
+            from core.transcript_store import transcript_store
+            record = transcript_store.get_transcript(video_url, on_segment=self.on_segment, model=self.model)
+            transcript_text = record.get("text", "")
             return transcript_text if transcript_text else "Transkript boş veya oluşturulamadı."
         except Exception as e:
             return f"HATA: Transkript oluşturulurken bir hata oluştu - {e}"
-        finally:
-            if os.path.exists(output_filename): os.remove(output_filename)
 
 # --- YOUTUBE ARAMA ARACI ---
 class YouTubeSearchTool(BaseTool):
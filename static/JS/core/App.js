@@ -161,8 +161,22 @@ class App {
         this.ui.removeTypingIndicator();
 
         switch(data.type) {
+            case 'ai_response_delta':
+                // Token akışı: parçaları biriktir ve aynı mesaj kutusunda göster
+                this.streamBuffers = this.streamBuffers || {};
+                this.streamBuffers[data.stream_id] = (this.streamBuffers[data.stream_id] || '') + data.delta;
+                this.ui.updateStreamingMessage(data.stream_id, this.streamBuffers[data.stream_id]);
+                this.ui.hideWelcomeMessage();
+                break;
+
             case 'ai_response':
-                // AI mesajını direkt göster
+                // Akıtılan mesaj varsa tam metinle sonlandır, yoksa AI mesajını direkt göster
+                if (data.stream_id && this.streamBuffers?.[data.stream_id] !== undefined) {
+                    delete this.streamBuffers[data.stream_id];
+                    if (this.ui.finalizeStreamingMessage(data.stream_id, data.message)) {
+                        break;
+                    }
+                }
                 if (data.message && data.message.trim()) {
                     this.ui.addMessage(data.message, 'ai');
                     this.ui.hideWelcomeMessage();
@@ -218,6 +232,15 @@ class App {
                 }
                 break;
 
+            case 'ingestion_progress':
+                // Sadece OCR'dan geçen sayfalar bildirilir; metin katmanlı sayfalar zaten anlık okunur
+                if (data.stage === 'ocr' && data.status !== 'started' && this.pdfManager) {
+                    const status = data.status === 'done' ? 'success' : 'error';
+                    const label = data.status === 'done' ? `${data.chars} karakter` : data.status === 'timeout' ? 'zaman aşımı' : 'hata';
+                    this.pdfManager.showToast(`📷 ${data.filename}: sayfa ${data.page}/${data.total_pages} OCR (${label})`, status);
+                }
+                break;
+
             case 'rag_found':
                 if (data.message) {
                     this.ui.addMessage(data.message, 'system');
@@ -91,6 +91,7 @@ export class WebSocketHandler {
         
         switch (data.type) {
             case 'ai_response':
+            case 'ai_response_delta':
                 this.onMessage(data);
                 break;
                 
@@ -99,6 +100,7 @@ export class WebSocketHandler {
             case 'crew_research_error':
             case 'crew_progress':
             case 'workflow_message':
+            case 'ingestion_progress':
                 this.onMessage(data);
                 break;
                 
@@ -143,6 +145,19 @@ export class WebSocketHandler {
                 this.handleLLMEvaluationResponse(data);
                 break;
                 
+            case 'batch':
+                // Sunucu art arda gelen ilerleme mesajlarını tek çerçevede gönderir
+                (data.messages || []).forEach(message => this.handleMessage(message));
+                break;
+                
+            case 'cancelled':
+                this.onMessage({
+                    type: 'system',
+                    content: `🛑 ${data.message}`,
+                    timestamp: data.timestamp || new Date().toISOString()
+                });
+                break;
+                
             default:
                 console.warn('⚠️ Bilinmeyen mesaj türü:', data.type);
                 this.onMessage(data);
@@ -1311,6 +1326,11 @@ export class WebSocketHandler {
         }
     }
 
+    cancelCurrentOperation() {
+        // Sunucudaki araştırma / test üretimi gibi uzun süren işlemleri iptal et
+        this.sendMessage({ type: 'cancel' });
+    }
+
     startPing() {
         this.pingInterval = setInterval(() => {
             if (this.isConnected()) {
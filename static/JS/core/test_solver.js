@@ -11,6 +11,13 @@ document.addEventListener('DOMContentLoaded', () => {
     let answeredQuestions = 0;
     let score = 0;
     let userAnswers = [];
+    const classicResults = {}; // questionIndex -> LLM değerlendirmesine göre doğru mu
+
+    // Klasik cevaplar kısa bir pencerede toplanıp sunucuya tek istekte gönderilir
+    const EVALUATION_BATCH_WINDOW_MS = 400;
+    const pendingEvaluations = new Map(); // questionIndex -> { resolve, reject, timeout }
+    let evaluationQueue = [];
+    let evaluationFlushTimer = null;
 
     function loadTest() {
         try {
@@ -294,6 +301,9 @@ document.addEventListener('DOMContentLoaded', () => {
             }
         }
 
+        // Kuyrukta bekleyen klasik cevaplar beklemeden gönderilsin
+        flushEvaluationQueue();
+
         // Test sonuçlarını hesapla
         const results = calculateTestResults();
         
@@ -325,10 +335,14 @@ document.addEventListener('DOMContentLoaded', () => {
                 isCorrect = userAnswer && 
                            userAnswer.toLowerCase().trim() === correctAnswer.toLowerCase().trim();
             } else if (question.type === 'klasik') {
-                // Klasik sorular için manuel değerlendirme gerekir
-                // Şimdilik otomatik "doğru" kabul ediyoruz
-                isCorrect = userAnswer && userAnswer.trim().length > 10;
-                correctAnswer = "Manuel değerlendirme gerekli";
+                // LLM değerlendirmesi geldiyse onu kullan, gelmediyse uzunluk kontrolü
+                if (classicResults[index] !== undefined) {
+                    isCorrect = classicResults[index];
+                    correctAnswer = question.ornek_cevap || question.cevap || '';
+                } else {
+                    isCorrect = userAnswer && userAnswer.trim().length > 10;
+                    correctAnswer = "Manuel değerlendirme gerekli";
+                }
             } else if (question.type === 'dogru_yanlis') {
                 correctAnswer = question.dogru_cevap === 'true' ? 'Doğru' : 'Yanlış';
                 isCorrect = userAnswer === correctAnswer;
@@ -576,16 +590,14 @@ document.addEventListener('DOMContentLoaded', () => {
         const question = allQuestions[questionIndex];
         
         try {
-            // LLM değerlendirme prompt'unu oluştur
-            const evaluationPrompt = createEvaluationPrompt(question, userAnswer);
-            
             // WebSocket üzerinden LLM değerlendirme isteği gönder
             if (window.testWebSocket && window.testWebSocket.readyState === WebSocket.OPEN) {
-                // Promise ile LLM yanıtını bekle
-                const evaluationResult = await requestLLMEvaluation(evaluationPrompt, questionIndex);
+                // Promise ile LLM yanıtını bekle (istek diğer klasik cevaplarla birlikte gönderilir)
+                const evaluationResult = await requestLLMEvaluation(questionIndex, userAnswer);
                 
                 // LLM yanıtını parse et
                 const parsedResult = parseLLMEvaluation(evaluationResult);
+                classicResults[questionIndex] = parsedResult.isCorrect;
                 
                 if (parsedResult.isCorrect) {
                     score++;
@@ -634,81 +646,75 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // LLM değerlendirme prompt'u oluştur
-    function createEvaluationPrompt(question, userAnswer) {
-        const sampleAnswer = question.ornek_cevap || question.cevap || '';
-        const criteria = question.degerlendirme_kriterleri || '';
-        
-        return `
-Sen bir eğitim uzmanısın. Aşağıdaki açık uçlu soruya verilen cevabı değerlendirmen gerekiyor.
-
-**SORU:**
-${question.soru}
-
-**ÖĞRENCİNİN CEVABI:**
-${userAnswer}
-
-**ÖRNEK CEVAP (Referans):**
-${sampleAnswer || 'Örnek cevap belirtilmemiş'}
-
-**DEĞERLENDİRME KRİTERLERİ:**
-${criteria || 'Genel değerlendirme kriterleri kullanılacak'}
-
-**GÖREV:**
-Öğrencinin cevabını değerlendirip aşağıdaki formatta yanıt ver:
-
-DOĞRU/YANLIŞ: [Doğru/Yanlış]
-PUAN: [0-100 arası puan]
-GERİ BİLDİRİM: [Detaylı açıklama - öğrencinin nerde doğru yaptığı, nerede eksik kaldığı, nasıl geliştirebileceği]
-
-**DEĞERLENDİRME KURALLARI:**
-- Eğer cevap temel kavramları doğru içeriyorsa "Doğru" ver
-- Tamamen yanlış veya ilgisiz cevaplar "Yanlış"
-- Puan verirken: İçerik doğruluğu (%60), detay seviyesi (%25), açıklık (%15)
-- Geri bildirimde yapıcı ve teşvik edici ol
-- Öğrencinin doğru yaptığı kısımları da belirt`;
-    }
-
-    // WebSocket üzerinden LLM değerlendirme isteği gönder
-    async function requestLLMEvaluation(prompt, questionIndex) {
+    // Klasik cevabı değerlendirme kuyruğuna ekler; sonuç sunucudan soru bazında gelir
+    function requestLLMEvaluation(questionIndex, userAnswer) {
         return new Promise((resolve, reject) => {
+            const question = allQuestions[questionIndex];
             const timeout = setTimeout(() => {
+                pendingEvaluations.delete(questionIndex);
                 reject(new Error('LLM değerlendirmesi zaman aşımına uğradı'));
-            }, 30000); // 30 saniye timeout
+            }, 40000); // Sunucu 30 saniyede yedek sonuç gönderir
 
-            // Yanıt dinleyicisi
-            const messageHandler = (event) => {
-                try {
-                    const data = JSON.parse(event.data);
-                    
-                    if (data.type === 'llm_evaluation_response' && 
-                        data.questionIndex === questionIndex) {
-                        clearTimeout(timeout);
-                        window.testWebSocket.removeEventListener('message', messageHandler);
-                        resolve(data.evaluation);
-                    }
-                } catch (error) {
-                    console.error('LLM yanıt parse hatası:', error);
-                }
-            };
-
-            window.testWebSocket.addEventListener('message', messageHandler);
-
-            // İsteği gönder
-            window.testWebSocket.send(JSON.stringify({
-                type: 'llm_evaluation_request',
-                prompt: prompt,
+            pendingEvaluations.set(questionIndex, { resolve, reject, timeout });
+            evaluationQueue.push({
                 questionIndex: questionIndex,
+                userAnswer: userAnswer,
+                question: {
+                    soru: question.soru,
+                    ornek_cevap: question.ornek_cevap || question.cevap || '',
+                    degerlendirme_kriterleri: question.degerlendirme_kriterleri || ''
+                },
                 metadata: {
-                    questionText: allQuestions[questionIndex].soru,
+                    questionText: question.soru,
                     timestamp: new Date().toISOString()
                 }
-            }));
+            });
 
-            console.log(`📤 LLM değerlendirme isteği gönderildi (Soru ${questionIndex + 1})`);
+            if (!evaluationFlushTimer) {
+                evaluationFlushTimer = setTimeout(flushEvaluationQueue, EVALUATION_BATCH_WINDOW_MS);
+            }
         });
     }
 
+    // Bekleyen klasik cevapları tek bir toplu istekte gönderir
+    function flushEvaluationQueue() {
+        clearTimeout(evaluationFlushTimer);
+        evaluationFlushTimer = null;
+        if (evaluationQueue.length === 0) return;
+
+        const items = evaluationQueue;
+        evaluationQueue = [];
+
+        if (!window.testWebSocket || window.testWebSocket.readyState !== WebSocket.OPEN) {
+            items.forEach(item => rejectEvaluation(item.questionIndex, new Error('WebSocket bağlantısı yok')));
+            return;
+        }
+
+        window.testWebSocket.send(JSON.stringify({
+            type: 'llm_evaluation_batch_request',
+            batch_id: Date.now().toString(),
+            items: items
+        }));
+        console.log(`📤 ${items.length} klasik cevap için toplu değerlendirme isteği gönderildi`);
+    }
+
+    function rejectEvaluation(questionIndex, error) {
+        const pending = pendingEvaluations.get(questionIndex);
+        if (!pending) return;
+        clearTimeout(pending.timeout);
+        pendingEvaluations.delete(questionIndex);
+        pending.reject(error);
+    }
+
+    // Sunucudan gelen soru bazlı değerlendirme sonucunu bekleyen isteğe iletir
+    function handleEvaluationResponse(data) {
+        const pending = pendingEvaluations.get(data.questionIndex);
+        if (!pending) return;
+        clearTimeout(pending.timeout);
+        pendingEvaluations.delete(data.questionIndex);
+        pending.resolve(data.evaluation);
+    }
+
     // LLM değerlendirme yanıtını parse et
     function parseLLMEvaluation(evaluation) {
         try {
@@ -1091,7 +1097,18 @@ GERİ BİLDİRİM: [Detaylı açıklama - öğrencinin nerde doğru yaptığı,
             };
             
             window.testWebSocket.onmessage = function(event) {
-                // Mesajlar requestLLMEvaluation fonksiyonunda dinleniyor
+                try {
+                    const data = JSON.parse(event.data);
+                    if (data.type === 'llm_evaluation_response') {
+                        handleEvaluationResponse(data);
+                    } else if (data.type === 'batch') {
+                        (data.messages || [])
+                            .filter(message => message.type === 'llm_evaluation_response')
+                            .forEach(handleEvaluationResponse);
+                    }
+                } catch (error) {
+                    console.error('LLM yanıt parse hatası:', error);
+                }
             };
             
             window.testWebSocket.onclose = function(event) {
@@ -22,6 +22,35 @@ export class UIManager {
         this.scrollToBottom();
     }
 
+    // Akıtılan (streaming) AI cevabı - delta geldikçe aynı mesaj kutusu güncellenir
+    updateStreamingMessage(streamId, content) {
+        let messageElement = DOM.messagesContainer.querySelector(`[data-stream-id="${streamId}"]`);
+        if (!messageElement) {
+            this.removeTypingIndicator();
+            messageElement = document.createElement('div');
+            messageElement.className = 'message ai';
+            messageElement.dataset.streamId = streamId;
+            messageElement.innerHTML = `
+                <div class="message-avatar"><i class="fas fa-robot"></i></div>
+                <div class="message-content"></div>
+            `;
+            DOM.messagesContainer.appendChild(messageElement);
+        }
+        messageElement.querySelector('.message-content').textContent = content;
+        this.scrollToBottom();
+    }
+
+    finalizeStreamingMessage(streamId, content) {
+        const messageElement = DOM.messagesContainer.querySelector(`[data-stream-id="${streamId}"]`);
+        if (!messageElement) return false;
+        // Akış bitince tam metin normal mesaj gibi biçimlendirilir
+        messageElement.querySelector('.message-content').innerHTML =
+            this.progressUI.formatContent(content).replace(/<p>|<\/p>/g, "");
+        delete messageElement.dataset.streamId;
+        this.scrollToBottom();
+        return true;
+    }
+
     showTypingIndicator() {
         if (document.getElementById('typingIndicator')) return;
         const typingElement = document.createElement('div');
@@ -0,0 +1,18 @@
+# tests/test_outbox.py
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from api.outbox import TELEMETRY_TYPES, _message_type  # noqa: E402
+
+
+def test_every_telemetry_type_is_classified():
+    for message_type in TELEMETRY_TYPES:
+        message = json.dumps({"type": message_type, "data": "x"}, ensure_ascii=False)
+        assert _message_type(message) == message_type
+
+
+def test_type_must_be_first_key():
+    assert _message_type(json.dumps({"data": "x", "type": "crew_progress"})) is None